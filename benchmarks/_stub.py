@@ -0,0 +1,291 @@
+"""
+基准测试使用的本地 http 桩服务.
+"""
+import json
+import random
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    body = json.dumps({'code': 200, 'message': 'OK', 'data': []}).encode()
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+
+    def __init__(self, handler=StubHandler, host='127.0.0.1', port=0):
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@dataclass
+class Faults:
+    # 每个请求的固定延迟(秒)
+    latency: float = 0.0
+    # 在 [0, jitter] 内随机追加的延迟(秒)
+    jitter: float = 0.0
+    # 返回平台业务错误的比例
+    error_rate: float = 0.0
+    # 返回限流错误(如 requestTooFast)的比例
+    too_fast_rate: float = 0.0
+    # 随机种子, 保证多次运行的注入序列一致
+    seed: int = 0
+
+
+def _record(i: int) -> dict:
+    return {
+        'id': 10000000 + i,
+        'userId': 20000 + i,
+        'userName': f'员工{i:04d}',
+        'deviceName': '一楼大门闸机',
+        'direction': 1,
+        'signTime': 1650000000000 + i * 1000,
+        'recScore': '0.9312',
+        'signAvatar': f'https://link.bi.sensetime.com/storage/{i:032x}.jpg',
+    }
+
+
+class PlatformStubHandler(BaseHTTPRequestHandler):
+    """
+    模拟钉钉(/gettoken, /topapi/*, /v1.0/*, /sns/*)、SenseLink(/api/v3/*)
+    及微信(/sns/oauth2/*, /sns/userinfo)接口的桩服务, 支持延迟、错误及限流注入.
+    """
+    protocol_version = 'HTTP/1.1'
+    # 响应头与响应体分两次写出, 避免 Nagle 与延迟确认叠加出约 40ms 的额外延迟
+    disable_nagle_algorithm = True
+    faults = Faults()
+    # 分页接口的总条数
+    total = 1000
+    _random = random.Random(0)
+    _lock = threading.Lock()
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(body) if body else {}
+        except ValueError:
+            return {}
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _draw(self) -> t.Optional[str]:
+        faults = self.faults
+        with self._lock:
+            delay = faults.latency + self._random.random() * faults.jitter
+            value = self._random.random()
+        if delay:
+            time.sleep(delay)
+        if value < faults.too_fast_rate:
+            return 'too_fast'
+        if value < faults.too_fast_rate + faults.error_rate:
+            return 'error'
+        return None
+
+    def _reply(self):
+        parsed = urlparse(self.path)
+        path, query = parsed.path, parse_qs(parsed.query)
+        data = self._read_json()
+        fault = None if path == '/gettoken' else self._draw()
+        if path.startswith('/api/v3/'):
+            self._senselink(path, query, fault)
+        elif path.startswith('/v1.0/'):
+            self._dingtalk_v1(path, data, fault)
+        elif path.startswith('/sns/oauth2/') or path == '/sns/userinfo':
+            self._wechat(path, query, fault)
+        else:
+            self._dingtalk_oapi(path, data, fault)
+
+    def _dingtalk_oapi(self, path, data, fault):
+        if fault == 'too_fast':
+            return self._send({'errcode': 90018, 'errmsg': '调用频率过快'})
+        if fault == 'error':
+            return self._send({'errcode': 15, 'errmsg': '钉钉远程调用异常'})
+        if path == '/gettoken':
+            return self._send({
+                'errcode': 0,
+                'access_token': 'stub-token',
+                'expires_in': 7200
+            })
+        if path == '/topapi/smartwork/hrm/employee/v2/list':
+            userids = str(data.get('userid_list', '')).split(',')
+            return self._send({
+                'errcode':
+                    0,
+                'result': [{
+                    'userid':
+                        userid,
+                    'field_data_list': [{
+                        'field_code': 'sys00-name',
+                        'field_value_list': [{
+                            'value': f'员工{userid}'
+                        }]
+                    }]
+                } for userid in userids if userid]
+            })
+        if path == '/sns/getuserinfo_bycode':
+            return self._send({
+                'errcode': 0,
+                'user_info': {
+                    'nick': '员工',
+                    'unionid': 'stub-unionid',
+                    'openid': 'stub-openid'
+                }
+            })
+        return self._send({'errcode': 0, 'errmsg': 'ok', 'result': {}})
+
+    def _dingtalk_v1(self, path, data, fault):
+        if fault == 'too_fast':
+            return self._send(
+                {
+                    'code': 'failure.operation.requestTooFast',
+                    'message': '请求过快'
+                }, 429)
+        if fault == 'error':
+            return self._send({
+                'code': 'ServiceUnavailable',
+                'message': '服务不可用'
+            }, 503)
+        if path == '/v1.0/yida/forms/instances/search':
+            page = int(data.get('currentPage') or 1)
+            size = int(data.get('pageSize') or 10)
+            start = (page - 1) * size
+            return self._send({
+                'totalCount':
+                    self.total,
+                'currentPage':
+                    page,
+                'data': [{
+                    'formInstanceId': f'FINST-{i:08d}',
+                    'formData': {
+                        'textField_1': f'记录{i}'
+                    }
+                } for i in range(start, min(start + size, self.total))]
+            })
+        return self._send({'nick': '员工', 'unionId': 'stub-unionid'})
+
+    def _senselink(self, path, query, fault):
+        if fault == 'too_fast':
+            return self._send({
+                'code': 429,
+                'message': 'Too Many Requests'
+            }, 429)
+        if fault == 'error':
+            return self._send({'code': 500, 'message': '服务异常'})
+        if path == '/api/v3/record/list':
+            page = int(query.get('page', ['1'])[0])
+            size = int(query.get('size', ['20'])[0])
+            start = (page - 1) * size
+            return self._send({
+                'code': 200,
+                'data': {
+                    'total':
+                        self.total,
+                    'data': [
+                        _record(i)
+                        for i in range(start, min(start + size, self.total))
+                    ]
+                }
+            })
+        return self._send({'code': 200, 'data': {}})
+
+    def _wechat(self, path, query, fault):
+        if fault == 'too_fast':
+            return self._send({
+                'errcode': 45009,
+                'errmsg': 'reach max api daily quota limit'
+            })
+        if fault == 'error':
+            return self._send({'errcode': -1, 'errmsg': 'system error'})
+        if path == '/sns/oauth2/access_token':
+            code = query.get('code', [''])[0]
+            return self._send({
+                'access_token': f'stub-access-{code}',
+                'expires_in': 7200,
+                'refresh_token': f'stub-refresh-{code}',
+                'openid': f'openid-{code}',
+                'scope': 'snsapi_userinfo',
+                'unionid': f'unionid-{code}'
+            })
+        if path == '/sns/oauth2/refresh_token':
+            token = query.get('refresh_token', [''])[0]
+            return self._send({
+                'access_token': f'stub-access-{token}',
+                'expires_in': 7200,
+                'refresh_token': token,
+                'openid': f'openid-{token[len("stub-refresh-"):]}',
+                'scope': 'snsapi_userinfo'
+            })
+        openid = query.get('openid', [''])[0]
+        return self._send({
+            'openid': openid,
+            'nickname': '微信用户',
+            'sex': 0,
+            'unionid': f'unionid-{openid}'
+        })
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def platform_handler(faults: Faults = None, total: int = 1000):
+    """
+    生成带故障注入配置的桩服务处理类.
+    Args:
+        faults: 故障注入配置
+        total: 分页接口的总条数
+
+    """
+    faults = faults or Faults()
+    return type(
+        'ConfiguredPlatformStubHandler', (PlatformStubHandler,), {
+            'faults': faults,
+            'total': total,
+            '_random': random.Random(faults.seed),
+            '_lock': threading.Lock(),
+        })
@@ -0,0 +1,90 @@
+"""
+DingtalkCallbackCrypto 单条与批量解密的吞吐(条/秒)对比.
+
+运行: python benchmarks/bench_callback_crypto.py [--messages 20000]
+"""
+import argparse
+import base64
+import json
+import os
+import struct
+import time
+
+from cryptography.hazmat.primitives.ciphers import algorithms
+from cryptography.hazmat.primitives.ciphers import Cipher
+from cryptography.hazmat.primitives.ciphers import modes
+
+from lesoon_third_sdk.dingtalk.base import DingtalkCallbackCrypto
+
+
+def legacy_decrypt(crypto, msg_signature, timestamp, nonce, ciphertext):
+    # 优化前: 每条消息新建 Cipher 并多次复制切片
+    sign = crypto.generate_signature(nonce, timestamp, ciphertext)
+    if sign != msg_signature:
+        raise ValueError('钉钉事件回调签名验证失败')
+    ciphertext = base64.b64decode(ciphertext)
+    cipher = Cipher(algorithm=algorithms.AES(crypto.aes_key),
+                    mode=modes.CBC(crypto.aes_key[:16]))
+    decryptor = cipher.decryptor()
+    decrypted_input = decryptor.update(ciphertext) + decryptor.finalize()
+    pad = int(decrypted_input[-1])
+    decrypted_input = decrypted_input[:-pad]
+    msg_len = struct.unpack('!i', decrypted_input[16:20])[0]
+    if decrypted_input[(20 + msg_len):].decode() != crypto.app_key:
+        raise ValueError('钉钉应用密钥不匹配!')
+    return decrypted_input[20:(20 + msg_len)].decode()
+
+
+def build_messages(crypto, count):
+    event = json.dumps({
+        'EventType':
+            'attendance_check_record',
+        'CorpId':
+            'ding0000000000000000',
+        'DataList': [{
+            'userId': '0123456789',
+            'checkTime': 1650000000000,
+            'bizId': 'x' * 32
+        }]
+    })
+    messages = []
+    for i in range(count):
+        ciphertext = crypto.encrypt(event)
+        timestamp, nonce = str(1650000000 + i), f'nonce{i:08d}'
+        signature = crypto.generate_signature(nonce, timestamp, ciphertext)
+        messages.append((signature, timestamp, nonce, ciphertext))
+    return messages
+
+
+def measure(func, count):
+    start = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+
+    aes_key = base64.b64encode(os.urandom(32)).decode()[:43]
+    crypto = DingtalkCallbackCrypto(app_key='dingbenchmark',
+                                    token='token',
+                                    aes_key=aes_key)
+    messages = build_messages(crypto, args.messages)
+    results = {
+        'legacy':
+            measure(lambda: [legacy_decrypt(crypto, *m) for m in messages],
+                    args.messages),
+        'single':
+            measure(lambda: [crypto.decrypt(*m) for m in messages],
+                    args.messages),
+        'batch':
+            measure(lambda: crypto.decrypt_many(messages), args.messages),
+    }
+    for name, rate in results.items():
+        print(f'{name:<8}{rate:>12.0f} msg/s')
+
+
+if __name__ == '__main__':
+    main()
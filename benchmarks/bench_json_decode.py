@@ -0,0 +1,100 @@
+"""
+SenseLink 100 条识别记录分页响应的解析耗时及峰值内存对比.
+
+运行: python benchmarks/bench_json_decode.py [--rounds 2000]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from dingtalk.core.utils import json_loads
+
+from lesoon_third_sdk.core.decoder import JsonDecoder
+from lesoon_third_sdk.core.decoder import orjson
+
+
+def build_page(size=100):
+    records = [{
+        'id': 10000000 + i,
+        'userId': 20000 + i,
+        'userName': f'员工{i:04d}',
+        'groups': [{
+            'id': 3,
+            'name': '总部',
+            'type': 1
+        }],
+        'deviceId': 1024,
+        'deviceName': '一楼大门闸机',
+        'deviceLdid': 'SPS-7f0c1a2b3c4d5e6f',
+        'direction': 1,
+        'type': 1,
+        'signTime': 1650000000000 + i * 1000,
+        'signTimeZone': '+08:00',
+        'entryMode': 1,
+        'recScore': '0.9312',
+        'verifyScore': '0.8845',
+        'mobile': '',
+        'icNumber': '',
+        'jobNumber': f'A{i:06d}',
+        'signAvatar': f'https://link.bi.sensetime.com/storage/{i:032x}.jpg',
+        'avatar': f'https://link.bi.sensetime.com/storage/{i:031x}a.jpg',
+        'abnormalType': 0,
+        'bodyTemperature': '36.5',
+    } for i in range(size)]
+    page = {
+        'code': 200,
+        'message': 'OK',
+        'data': {
+            'total': 5000,
+            'page': 1,
+            'size': size,
+            'data': records
+        }
+    }
+    return json.dumps(page, ensure_ascii=False).encode('utf-8')
+
+
+def legacy_loads(content):
+    # 优化前: 先解码为 str, 再以 ObjectDict 解析
+    return json_loads(content.decode('utf-8', 'ignore'), strict=False)
+
+
+def measure(loads, content, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        loads(content)
+    elapsed = (time.perf_counter() - start) / rounds
+    tracemalloc.start()
+    result = loads(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    content = build_page()
+    decoders = {
+        'legacy': legacy_loads,
+        'json+ObjectDict': JsonDecoder(backend='json').loads,
+        'json+dict': JsonDecoder(backend='json', object_dict=False).loads,
+    }
+    if orjson is not None:
+        decoders['orjson+dict'] = JsonDecoder(backend='orjson',
+                                              object_dict=False).loads
+    print(f'page size: {len(content)} bytes')
+    baseline = None
+    for name, loads in decoders.items():
+        elapsed, peak = measure(loads, content, args.rounds)
+        baseline = baseline or elapsed
+        print(f'{name:<18}{elapsed * 1e6:>10.1f} us/page'
+              f'{baseline / elapsed:>8.2f}x{peak / 1024:>10.1f} KiB peak')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+AppKeyClient.request 参数过滤的单次开销对比.
+
+运行: python benchmarks/bench_request_kwargs.py [--number N]
+"""
+import argparse
+import inspect
+import timeit
+
+import requests
+
+from lesoon_third_sdk.dingtalk.client import filter_request_kwargs
+
+KWARGS = {
+    'data': {
+        'userid_list': '1,2,3'
+    },
+    'params': {},
+    'api_base_url': 'https://oapi.dingtalk.com/',
+    'retry_times': 2,
+}
+
+
+def legacy_filter(http, kwargs):
+    # 优化前: 每次调用都解析 http.request 的函数签名
+    allow_request_param_key = set(
+        inspect.signature(http.request).parameters.keys())
+    super_param_key = {'api_base_url', 'result_processor', 'top_response_key'}
+    return {
+        k: v
+        for k, v in kwargs.items()
+        if k in allow_request_param_key | super_param_key
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args()
+
+    http = requests.Session()
+    assert legacy_filter(http, KWARGS) == filter_request_kwargs(http, KWARGS)
+    for name, func in (('legacy', legacy_filter), ('cached',
+                                                   filter_request_kwargs)):
+        cost = timeit.timeit(lambda: func(http, KWARGS), number=args.number)
+        print(f'{name:<8}{cost / args.number * 1e6:>10.3f} us/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+BaseSenseLinkClient 在 32 线程并发下不同 http 传输配置的吞吐对比.
+
+运行: python benchmarks/bench_senselink_transport.py [--threads 32] [--requests 200]
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _stub import StubServer
+from lesoon_third_sdk.core.transport import HttpConfig
+from lesoon_third_sdk.senselink.client import SenseLinkClient
+
+
+def run(client, threads: int, requests_per_thread: int) -> float:
+
+    def worker(_):
+        for _ in range(requests_per_thread):
+            client.get('/api/v3/record/list')
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    return threads * requests_per_thread / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+    # 默认连接池满时 urllib3 会逐条打印丢弃连接的警告
+    logging.getLogger('urllib3').setLevel(logging.ERROR)
+
+    configs = {
+        'class-session': None,
+        'pooled': HttpConfig(pool_maxsize=args.threads),
+        'per-thread': HttpConfig(per_thread=True),
+    }
+    with StubServer() as server:
+        for name, config in configs.items():
+            client = SenseLinkClient(app_key='bench',
+                                     app_secret='bench',
+                                     http_config=config)
+            client.API_BASE_URL = server.url
+            qps = run(client, args.threads, args.requests)
+            print(f'{name:<15}{qps:>10.0f} req/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+离线基准测试套件.
+启动模拟钉钉、SenseLink 及微信接口的本地桩服务, 以典型负载驱动各客户端,
+输出吞吐、p50/p99 延迟及峰值内存, 结果为 JSON 以便在发布前比对.
+
+运行: python benchmarks/bench_suite.py [--latency 0.005] [--error-rate 0.01]
+      [--too-fast-rate 0.01] [--output result.json]
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+from _stub import Faults
+from _stub import platform_handler
+from _stub import StubServer
+from lesoon_third_sdk.core.instrument import Instrumentation
+from lesoon_third_sdk.core.instrument import RequestInfo
+from lesoon_third_sdk.dingtalk.base import DingtalkCallbackCrypto
+from lesoon_third_sdk.dingtalk.client import AppKeyClient
+from lesoon_third_sdk.dingtalk.client import NewAppKeyClient
+from lesoon_third_sdk.dingtalk.retry import RetryPolicy
+from lesoon_third_sdk.senselink.client import SenseLinkClient
+from lesoon_third_sdk.wechat.client import WeChatClient
+
+
+class LatencyRecorder(Instrumentation):
+    """
+    记录每次 http 请求的耗时及失败数.
+    """
+
+    def __init__(self):
+        self.latencies: t.List[float] = []
+        self.errors = 0
+        self.retries = 0
+        # 已完成的业务操作数, 负载中途失败时保留已完成的部分
+        self.operations = 0
+        self._lock = threading.Lock()
+
+    def done(self, count: int = 1):
+        with self._lock:
+            self.operations += count
+
+    def after_response(self, info: RequestInfo):
+        with self._lock:
+            self.latencies.append(info.latency)
+            if info.exception is not None:
+                self.errors += 1
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        with self._lock:
+            self.retries += 1
+
+
+def percentile(values: t.List[float], q: float) -> t.Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q * (len(values) - 1))))
+    return values[index]
+
+
+class Bench:
+
+    def __init__(self, url: str, args):
+        self.url = url
+        self.args = args
+        # 基准测试中不等待退避, 只统计重试次数
+        self.retry_policy = RetryPolicy(base_delay=0, jitter=False)
+
+    def dingtalk_client(self, cls, recorder):
+        client = cls(corp_id='bench',
+                     app_key='bench',
+                     app_secret='bench',
+                     agent_id=1,
+                     retry_policy=self.retry_policy,
+                     instrumentation=recorder)
+        client.API_BASE_URL = self.url
+        return client
+
+    def dingtalk_roster(self, recorder):
+        client = self.dingtalk_client(AppKeyClient, recorder)
+        userids = [f'{i:08d}' for i in range(self.args.users)]
+        bulk = client.employeerm.list_v2_bulk(userids, ['sys00-name'],
+                                              max_workers=self.args.workers)
+        recorder.done(len(bulk.result))
+
+    def yida_paging(self, recorder):
+        client = self.dingtalk_client(NewAppKeyClient, recorder)
+        for _ in client.yida.iter_form_datas('APP_BENCH', 'token', 'user',
+                                             'FORM-BENCH'):
+            recorder.done()
+
+    def senselink_paging(self, recorder):
+        client = SenseLinkClient('bench', 'bench', instrumentation=recorder)
+        client.API_BASE_URL = self.url
+        for _ in client.event.iter_identity_records('2022-01-01 00:00:00',
+                                                    '2022-01-01 23:59:59',
+                                                    order=1,
+                                                    prefetch=True):
+            recorder.done()
+
+    def wechat_login(self, recorder):
+        client = WeChatClient(appid='bench',
+                              secret='bench',
+                              access_token='bench',
+                              instrumentation=recorder)
+        client.oauth2.API_BASE_URL = f'{self.url}/'
+
+        def login(i):
+            try:
+                token = client.oauth2.get_user_access_token(f'code{i}')
+                client.oauth2.get_user_info(token['access_token'],
+                                            token['openid'])
+            except Exception:
+                # 单次登录失败不影响其余登录, 失败数由 errors 体现
+                return
+            recorder.done()
+
+        with ThreadPoolExecutor(max_workers=self.args.workers) as executor:
+            list(executor.map(login, range(self.args.logins)))
+
+    def callback_decrypt(self, recorder):
+        aes_key = base64.b64encode(os.urandom(32)).decode()[:43]
+        crypto = DingtalkCallbackCrypto(app_key='bench',
+                                        token='token',
+                                        aes_key=aes_key)
+        event = json.dumps({
+            'EventType': 'attendance_check_record',
+            'DataList': [{
+                'userId': '0123456789',
+                'checkTime': 1650000000000
+            }]
+        })
+        messages = []
+        for i in range(self.args.messages):
+            ciphertext = crypto.encrypt(event)
+            timestamp, nonce = str(1650000000 + i), f'nonce{i:08d}'
+            signature = crypto.generate_signature(nonce, timestamp, ciphertext)
+            messages.append((signature, timestamp, nonce, ciphertext))
+        for message in messages:
+            start = time.perf_counter()
+            crypto.decrypt(*message)
+            recorder.latencies.append(time.perf_counter() - start)
+            recorder.done()
+
+    WORKLOADS = ('dingtalk_roster', 'yida_paging', 'senselink_paging',
+                 'wechat_login', 'callback_decrypt')
+
+    def run(self, name: str) -> t.Dict[str, t.Any]:
+        workload = getattr(self, name)
+        recorder = LatencyRecorder()
+        start = time.perf_counter()
+        error = None
+        try:
+            workload(recorder)
+        except Exception as e:
+            error = repr(e)
+        seconds = time.perf_counter() - start
+        operations = recorder.operations
+        result = {
+            'workload': name,
+            'operations': operations,
+            'requests': len(recorder.latencies),
+            'errors': recorder.errors,
+            'retries': recorder.retries,
+            'seconds': round(seconds, 6),
+            'throughput': round(operations / seconds, 2) if seconds else None,
+            'p50_ms': _ms(percentile(recorder.latencies, 0.5)),
+            'p99_ms': _ms(percentile(recorder.latencies, 0.99)),
+            'error': error,
+        }
+        if self.args.memory:
+            # 单独再跑一轮统计峰值内存, 避免 tracemalloc 影响耗时数据
+            tracemalloc.start()
+            try:
+                workload(LatencyRecorder())
+            except Exception:
+                pass
+            result['peak_memory_kib'] = round(
+                tracemalloc.get_traced_memory()[1] / 1024, 1)
+            tracemalloc.stop()
+        return result
+
+
+def _ms(value: t.Optional[float]) -> t.Optional[float]:
+    return None if value is None else round(value * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--too-fast-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--total', type=int, default=1000, help='分页接口总条数')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--logins', type=int, default=500)
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--workload',
+                        action='append',
+                        choices=Bench.WORKLOADS,
+                        help='只运行指定负载, 可重复')
+    parser.add_argument('--no-memory', dest='memory', action='store_false')
+    parser.add_argument('--output', help='结果写入文件, 默认输出到标准输出')
+    args = parser.parse_args()
+    # 注入的错误会产生大量错误日志
+    logging.disable(logging.CRITICAL)
+
+    faults = Faults(latency=args.latency,
+                    jitter=args.jitter,
+                    error_rate=args.error_rate,
+                    too_fast_rate=args.too_fast_rate,
+                    seed=args.seed)
+    with StubServer(platform_handler(faults, args.total)) as server:
+        bench = Bench(server.url, args)
+        results = [bench.run(name) for name in args.workload or Bench.WORKLOADS]
+
+    report = {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'faults': asdict(faults),
+        'results': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+from .breaker import CircuitBreaker
+from .breaker import CircuitBreakerGroup
+from .breaker import CircuitOpenError
+from .cache import LRUCache
+from .cache import ResponseCache
+from .cache import StorageCache
+from .checkpoint import Checkpoint
+from .coalesce import RequestCoalescer
+from .concurrent import BulkResult
+from .concurrent import chunked
+from .concurrent import fan_out
+from .concurrent import fan_out_grouped
+from .decoder import JsonDecoder
+from .instrument import CompositeInstrumentation
+from .instrument import HistogramAggregator
+from .instrument import Instrumentation
+from .instrument import RequestInfo
+from .pagination import AsyncPaginator
+from .pagination import Paginator
+from .payload import PayloadLogConfig
+from .ratelimit import RateLimiter
+from .ratelimit import RateLimitRule
+from .ratelimit import RateLimitTimeout
+from .registry import client_registry
+from .registry import ClientRegistry
+from .transport import AsyncHttpTransport
+from .transport import HttpConfig
+from .transport import HttpTransport
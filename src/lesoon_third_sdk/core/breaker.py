@@ -0,0 +1,208 @@
+import threading
+import time
+import typing as t
+from urllib.parse import urlparse
+
+from lesoon_third_sdk.core.utils import endpoint_template
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态, 请求未发出."""
+
+    def __init__(self, key: t.Hashable, retry_after: float):
+        super().__init__(f'接口已熔断: {key}, {retry_after:.1f}秒后重试')
+        self.key = key
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    单个接口的熔断器.
+    连续失败 failure_threshold 次后打开, 打开期间请求直接抛出 CircuitOpenError;
+    recovery_timeout 秒后进入半开状态, 放行至多 half_open_max_calls 个探测请求,
+    探测成功则关闭, 失败则重新打开; 未得出结果的探测(如被取消、限流超时)须调用 release 归还名额.
+    """
+
+    def __init__(self,
+                 key: t.Hashable = None,
+                 failure_threshold: int = 5,
+                 recovery_timeout: float = 30,
+                 half_open_max_calls: int = 1,
+                 clock: t.Callable[[], float] = time.monotonic):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: t.Optional[float] = None
+        self._state = CLOSED
+        self._half_open_calls = 0
+        # 每次进入半开状态时递增, 用于识别探测名额所属的半开周期
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _refresh(self, now: float) -> str:
+        if (self._state == OPEN and self.opened_at is not None and
+                now - self.opened_at >= self.recovery_timeout):
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            self._generation += 1
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._refresh(self.clock())
+
+    def _retry_after(self, now: float) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.recovery_timeout - now)
+
+    def before_call(self) -> t.Optional[int]:
+        """
+        请求前调用, 熔断时抛出 CircuitOpenError.
+
+        Returns:
+            半开状态下占用的探测名额, 请求结束后交给 release; 未占用名额时为 None
+
+        """
+        with self._lock:
+            now = self.clock()
+            state = self._refresh(now)
+            if state == OPEN:
+                raise CircuitOpenError(self.key, self._retry_after(now))
+            if state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError(self.key, 0)
+                self._half_open_calls += 1
+                return self._generation
+            return None
+
+    def release(self, slot: t.Optional[int]):
+        """
+        归还 before_call 占用的探测名额.
+        已通过 on_success/on_failure 得出结果或已进入新的半开周期时不做处理,
+        可在 finally 中无条件调用.
+        Args:
+            slot: before_call 的返回值
+
+        """
+        if slot is None:
+            return
+        with self._lock:
+            if (self._state == HALF_OPEN and self._generation == slot and
+                    self._half_open_calls > 0):
+                self._half_open_calls -= 1
+
+    def raise_if_open(self):
+        """
+        熔断器打开时抛出 CircuitOpenError, 用于重试等待前提前退出.
+
+        """
+        with self._lock:
+            now = self.clock()
+            if self._refresh(now) == OPEN:
+                raise CircuitOpenError(self.key, self._retry_after(now))
+
+    def on_success(self):
+        with self._lock:
+            self.failures = 0
+            self._state = CLOSED
+            self._half_open_calls = 0
+
+    def on_failure(self):
+        with self._lock:
+            now = self.clock()
+            self.failures += 1
+            if (self._refresh(now) == HALF_OPEN or
+                    self.failures >= self.failure_threshold):
+                self._state = OPEN
+                self.opened_at = now
+
+    def snapshot(self) -> t.Dict[str, t.Any]:
+        with self._lock:
+            now = self.clock()
+            state = self._refresh(now)
+            return {
+                'state': state,
+                'failures': self.failures,
+                'retry_after': self._retry_after(now) if state == OPEN else 0,
+            }
+
+
+class CircuitBreakerGroup:
+    """
+    按 (host, 接口路径模板) 管理熔断器, 可在多个客户端间共享.
+    """
+
+    def __init__(self,
+                 failure_threshold: int = 5,
+                 recovery_timeout: float = 30,
+                 half_open_max_calls: int = 1,
+                 clock: t.Callable[[], float] = time.monotonic):
+        """
+        Args:
+            failure_threshold: 打开熔断器的连续失败次数
+            recovery_timeout: 打开后进入半开状态的秒数
+            half_open_max_calls: 半开状态下放行的探测请求数
+            clock: 单调时钟
+
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._breakers: t.Dict[t.Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(base_url: str, uri: str) -> t.Tuple[str, str]:
+        """
+        Args:
+            base_url: 接口域名, uri 为完整地址时忽略
+            uri: 请求路径或完整地址
+
+        """
+        host = urlparse(uri).netloc or urlparse(base_url or '').netloc
+        return host, endpoint_template(uri)
+
+    def get(self, base_url: str, uri: str) -> CircuitBreaker:
+        key = self.make_key(base_url, uri)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = self._breakers[key] = CircuitBreaker(
+                        key,
+                        failure_threshold=self.failure_threshold,
+                        recovery_timeout=self.recovery_timeout,
+                        half_open_max_calls=self.half_open_max_calls,
+                        clock=self.clock)
+        return breaker
+
+    def health(self) -> t.Dict[str, t.Dict[str, t.Any]]:
+        """
+        各接口熔断器的状态, 键为 host + 路径模板, 供健康检查使用.
+
+        """
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {
+            f'{host}{template}': breaker.snapshot()
+            for (host, template), breaker in breakers
+        }
+
+    @property
+    def healthy(self) -> bool:
+        return all(item['state'] != OPEN for item in self.health().values())
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+from dingtalk.storage import BaseStorage
+
+from lesoon_third_sdk.core.utils import get_path
+from lesoon_third_sdk.core.utils import match_path
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    线程安全的有界 LRU 缓存.
+    超出 maxsize 时淘汰最久未访问的条目, 条目可单独设置过期时间.
+    """
+
+    def __init__(self,
+                 maxsize: int = 1024,
+                 clock: t.Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._data: 'OrderedDict[t.Hashable, t.Tuple[t.Any, t.Optional[float]]]' = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: t.Hashable, default: t.Any = None) -> t.Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= self.clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: t.Hashable, value: t.Any, ttl: float = None):
+        expires_at = None if ttl is None else self.clock() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: t.Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: t.Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class StorageCache:
+    """
+    基于 BaseStorage(或接口相同的 wechatpy SessionStorage)的缓存, 可在多进程间共享.
+    BaseStorage 无法按前缀删除, clear 通过递增命名空间版本使旧条目失效.
+    """
+
+    def __init__(self, storage: BaseStorage, prefix: str = 'cache'):
+        self.storage = storage
+        self.prefix = prefix
+
+    @property
+    def _version_key(self) -> str:
+        return f'{self.prefix}:version'
+
+    def _key_name(self, key: t.Hashable) -> str:
+        version = self.storage.get(self._version_key, 0)
+        return f'{self.prefix}:{version}:{key}'
+
+    def get(self, key: t.Hashable, default: t.Any = None) -> t.Any:
+        return self.storage.get(self._key_name(key), default)
+
+    def set(self, key: t.Hashable, value: t.Any, ttl: float = None):
+        # dingtalk 的 storage 实现均要求 ttl
+        self.storage.set(self._key_name(key), value, int(ttl or 7200))
+
+    def delete(self, key: t.Hashable):
+        self.storage.delete(self._key_name(key))
+
+    def clear(self):
+        version = self.storage.get(self._version_key, 0)
+        self.storage.set(self._version_key, version + 1, 86400 * 365)
+
+
+class ResponseCache:
+    """
+    接口响应缓存.
+    仅缓存命中 ttls 中路径通配的接口, 缓存键由请求方法、路径及参数生成;
+    按通配失效时递增该通配的版本号, 不需要遍历缓存.
+    """
+
+    def __init__(self,
+                 ttls: t.Mapping[str, float],
+                 backend: t.Union[LRUCache, StorageCache] = None):
+        """
+        Args:
+            ttls: 路径通配 -> 缓存秒数, 如 {'/topapi/attendance/getattcolumns': 3600}
+            backend: 缓存后端, 默认为容量 1024 的 LRUCache
+
+        """
+        self.ttls = list(ttls.items())
+        self.backend = backend if backend is not None else LRUCache()
+        self.hits = 0
+        self.misses = 0
+        # 共享后端的版本号存于后端以便跨进程失效, 否则存于本地避免被 LRU 淘汰
+        self._shared = isinstance(self.backend, StorageCache)
+        self._versions: t.Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def match(self, uri: str) -> t.Optional[t.Tuple[str, float]]:
+        return match_path(
+            uri, ((pattern, (pattern, ttl)) for pattern, ttl in self.ttls))
+
+    def _version(self, pattern: str) -> int:
+        if self._shared:
+            return self.backend.get(f'version:{pattern}', 0)
+        return self._versions.get(pattern, 0)
+
+    def make_key(self,
+                 pattern: str,
+                 method: str,
+                 uri: str,
+                 kwargs: t.Mapping[str, t.Any],
+                 scope: str = '') -> str:
+        payload = json.dumps(
+            [kwargs.get('params'), kwargs.get('data')],
+            sort_keys=True,
+            default=str)
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        return (f'{scope}:{method.upper()}:{get_path(uri)}:'
+                f'{self._version(pattern)}:{digest}')
+
+    def get_or_call(self,
+                    method: str,
+                    uri: str,
+                    kwargs: t.Mapping[str, t.Any],
+                    func: t.Callable[[], t.Any],
+                    scope: str = '') -> t.Any:
+        """
+        命中缓存时直接返回, 否则调用 func 并缓存其结果.
+        缓存的结果对象会被多次返回, 调用方不应修改.
+        Args:
+            method: 请求方法
+            uri: 请求路径
+            kwargs: 请求参数
+            func: 实际发起请求的函数
+            scope: 缓存隔离标识, 如应用的 app_key
+
+        """
+        matched = self.match(uri)
+        if matched is None:
+            return func()
+        pattern, ttl = matched
+        key = self.make_key(pattern, method, uri, kwargs, scope)
+        result = self.backend.get(key, _MISSING)
+        with self._lock:
+            if result is not _MISSING:
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = func()
+        if result is not None:
+            self.backend.set(key, result, ttl)
+        return result
+
+    def invalidate(self, pattern: str = None):
+        """
+        使缓存失效.
+        Args:
+            pattern: ttls 中的路径通配, 为空时清空全部缓存
+
+        """
+        if pattern is None:
+            self.backend.clear()
+            return
+        version = self._version(pattern) + 1
+        if self._shared:
+            self.backend.set(f'version:{pattern}', version, 86400 * 365)
+        else:
+            self._versions[pattern] = version
+
+    def stats(self) -> t.Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,64 @@
+import threading
+import typing as t
+
+from dingtalk.storage import BaseStorage
+
+
+class Checkpoint:
+    """
+    批量任务的断点记录.
+    保存已完成的任务标识, 中断后以相同 key 重新执行时跳过已完成的任务;
+    每完成 flush_every 个任务写入一次 storage, 中断时至多重复执行这部分任务.
+    """
+
+    def __init__(self,
+                 storage: BaseStorage,
+                 key: str,
+                 ttl: int = 86400 * 7,
+                 flush_every: int = 100):
+        """
+        Args:
+            storage: 断点存储
+            key: 断点键名, 同一批任务需保持一致
+            ttl: 断点保存秒数
+            flush_every: 写入 storage 的间隔任务数
+
+        """
+        self.storage = storage
+        self.key = key
+        self.ttl = ttl
+        self.flush_every = flush_every
+        self._done: t.Set[t.Hashable] = set(storage.get(key) or ())
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, item: t.Hashable) -> bool:
+        return item in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def add(self, item: t.Hashable):
+        with self._lock:
+            self._done.add(item)
+            self._unsaved += 1
+            if self._unsaved < self.flush_every:
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._unsaved:
+                return
+            done, self._unsaved = list(self._done), 0
+        self.storage.set(self.key, done, self.ttl)
+
+    def clear(self):
+        """
+        全部任务完成后清除断点.
+
+        """
+        with self._lock:
+            self._done.clear()
+            self._unsaved = 0
+        self.storage.delete(self.key)
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import json
+import threading
+import typing as t
+from concurrent.futures import Future
+
+from lesoon_third_sdk.core.utils import get_path
+from lesoon_third_sdk.core.utils import match_path
+
+# 每次请求都会变化的签名参数, 不参与合并键
+DEFAULT_IGNORE_PARAMS = frozenset({'timestamp', 'signature', 'sign'})
+
+
+class RequestCoalescer:
+    """
+    合并相同的并发请求.
+    命中 endpoints 中路径通配的接口, 请求方法、路径、参数、请求体及请求头均相同的并发调用
+    共享同一个进行中的请求, 所有调用方都得到该请求的结果或异常;
+    请求结束后即移除, 不缓存结果.
+    """
+
+    def __init__(self,
+                 endpoints: t.Iterable[str],
+                 ignore_params: t.Iterable[str] = DEFAULT_IGNORE_PARAMS):
+        """
+        Args:
+            endpoints: 需要合并的接口路径通配, 如 ['/topapi/v2/user/getbymobile']
+            ignore_params: 不参与合并键的查询参数, 如随时间变化的签名
+
+        """
+        self.endpoints = [(pattern, True) for pattern in endpoints]
+        self.ignore_params = frozenset(ignore_params)
+        self.leaders = 0
+        self.followers = 0
+        self._inflight: t.Dict[str, Future] = {}
+        self._async_inflight: t.Dict[t.Tuple[int, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def make_key(self,
+                 method: str,
+                 uri: str,
+                 kwargs: t.Mapping[str, t.Any],
+                 scope: str = '') -> t.Optional[str]:
+        """
+        生成合并键, 未命中 endpoints 时返回 None.
+
+        """
+        if match_path(uri, self.endpoints) is None:
+            return None
+        params = kwargs.get('params') or {}
+        if isinstance(params, dict):
+            params = {
+                k: v for k, v in params.items() if k not in self.ignore_params
+            }
+        # 请求头中可能带有用户 token, 需参与合并键以免不同用户共享结果
+        payload = json.dumps(
+            [params, kwargs.get('data'),
+             kwargs.get('headers')],
+            sort_keys=True,
+            default=str)
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        return f'{scope}:{method.upper()}:{get_path(uri)}:{digest}'
+
+    def call(self,
+             method: str,
+             uri: str,
+             kwargs: t.Mapping[str, t.Any],
+             func: t.Callable[[], t.Any],
+             scope: str = '') -> t.Any:
+        """
+        发起或加入进行中的相同请求.
+        合并的结果对象会返回给多个调用方, 调用方不应修改.
+        Args:
+            method: 请求方法
+            uri: 请求路径
+            kwargs: 请求参数
+            func: 实际发起请求的函数
+            scope: 合并隔离标识, 如应用的 app_key
+
+        """
+        key = self.make_key(method, uri, kwargs, scope)
+        if key is None:
+            return func()
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                future: Future = Future()
+                self._inflight[key] = future
+                self.leaders += 1
+            else:
+                self.followers += 1
+        if inflight is not None:
+            return inflight.result()
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+    async def acall(self,
+                    method: str,
+                    uri: str,
+                    kwargs: t.Mapping[str, t.Any],
+                    func: t.Callable[[], t.Awaitable[t.Any]],
+                    scope: str = '') -> t.Any:
+        """
+        call 的协程版本, 仅合并同一事件循环中的请求.
+        某个调用方被取消时不影响进行中的请求及其他调用方.
+        Args:
+            func: 返回实际请求协程的函数
+
+        """
+        key = self.make_key(method, uri, kwargs, scope)
+        if key is None:
+            return await func()
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._async_inflight.get(loop_key)
+            if task is None:
+                task = self._async_inflight[loop_key] = \
+                    asyncio.ensure_future(func())
+                task.add_done_callback(
+                    lambda _: self._async_inflight.pop(loop_key, None))
+                self.leaders += 1
+            else:
+                self.followers += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> t.Dict[str, int]:
+        """
+        leaders 为实际发出的请求数, followers 为被合并的调用数.
+
+        """
+        return {'leaders': self.leaders, 'followers': self.followers}
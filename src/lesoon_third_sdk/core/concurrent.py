@@ -0,0 +1,128 @@
+import itertools
+import typing as t
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
+from dataclasses import field
+
+T = t.TypeVar('T')
+
+
+def chunked(iterable: t.Iterable[T], size: int) -> t.Iterator[t.List[T]]:
+    """
+    按 size 切分可迭代对象.
+    Args:
+        iterable: 可迭代对象
+        size: 每块大小
+
+    """
+    if size < 1:
+        raise ValueError('size 必须大于0')
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@dataclass
+class ChunkError:
+    chunk: t.List[t.Any]
+    exception: BaseException
+
+
+@dataclass
+class BulkResult:
+    result: t.List[t.Any] = field(default_factory=list)
+    errors: t.List[ChunkError] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
+
+def fan_out(func: t.Callable[[t.List[T]], t.Iterable[t.Any]],
+            chunks: t.Iterable[t.List[T]],
+            max_workers: int = 4) -> BulkResult:
+    """
+    在有界线程池中并发执行各分块, 按分块顺序合并结果.
+    单个分块失败不影响其余分块, 异常记录在 BulkResult.errors 中.
+    Args:
+        func: 处理单个分块的函数, 返回该分块的结果列表
+        chunks: 分块
+        max_workers: 最大并发数
+
+    """
+    bulk = BulkResult()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(chunk, executor.submit(func, chunk)) for chunk in chunks]
+        for chunk, future in futures:
+            try:
+                bulk.result.extend(future.result() or ())
+            except Exception as e:
+                bulk.errors.append(ChunkError(chunk=chunk, exception=e))
+    return bulk
+
+
+def fan_out_grouped(
+        func: t.Callable[[T], t.Any],
+        groups: t.Iterable[t.Tuple[t.Hashable, t.List[T]]],
+        max_workers: int = 4,
+        max_pending: int = None) -> t.Iterator[t.Tuple[t.Hashable, BulkResult]]:
+    """
+    在有界线程池中并发执行各组任务, 某组任务全部完成后立即产出该组结果.
+    同时在途的组数不超过 max_pending, 避免一次性提交全部任务.
+    Args:
+        func: 处理单个任务的函数
+        groups: (组标识, 任务列表)
+        max_workers: 最大并发数
+        max_pending: 最大在途组数, 默认为 max_workers 的两倍
+
+    Returns:
+        按完成顺序产出 (组标识, BulkResult), result 按任务顺序排列
+
+    """
+    max_pending = max_pending or max_workers * 2
+    groups = iter(groups)
+    # 组标识 -> [结果, 异常, 剩余任务数]
+    pending: t.Dict[t.Hashable, list] = {}
+    futures: t.Dict[Future, t.Tuple[t.Hashable, int, T]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    group = next(groups, None)
+                    if group is None:
+                        exhausted = True
+                        break
+                    key, tasks = group
+                    if not tasks:
+                        yield key, BulkResult()
+                        continue
+                    pending[key] = [[None] * len(tasks), [], len(tasks)]
+                    for index, task in enumerate(tasks):
+                        futures[executor.submit(func,
+                                                task)] = (key, index, task)
+                if not futures:
+                    return
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, index, task = futures.pop(future)
+                    state = pending[key]
+                    try:
+                        state[0][index] = future.result()
+                    except Exception as e:
+                        state[1].append(ChunkError(chunk=[task], exception=e))
+                    state[2] -= 1
+                    if not state[2]:
+                        del pending[key]
+                        results = [r for r in state[0] if r is not None]
+                        yield key, BulkResult(result=results, errors=state[1])
+        finally:
+            # 调用方提前结束迭代时取消尚未开始的任务
+            for future in futures:
+                future.cancel()
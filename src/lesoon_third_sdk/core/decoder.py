@@ -0,0 +1,53 @@
+import json
+import typing as t
+
+from dingtalk.core.utils import ObjectDict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+BACKENDS = ('auto', 'orjson', 'json')
+
+
+class JsonDecoder:
+    """
+    响应体 JSON 解码器.
+    object_dict 为 False 时返回普通 dict, 省去 ObjectDict 的构造开销,
+    并在安装了 orjson 时直接解析 bytes, 不再复制出中间 str;
+    orjson 解析失败(如非法 UTF-8 或字符串中含控制字符)时回退为与原实现一致的宽松解析.
+    """
+
+    def __init__(self, backend: str = 'auto', object_dict: bool = True):
+        """
+        Args:
+            backend: auto-有 orjson 时使用 orjson, orjson, json-标准库
+            object_dict: 是否返回支持属性访问的 ObjectDict, orjson 不支持 object_hook,
+                此时仍使用标准库解析
+
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f'backend 必须为 {BACKENDS} 之一')
+        if backend == 'orjson' and orjson is None:
+            raise ImportError('未安装 orjson, 请安装 lesoon-third-sdk[fast]')
+        self.backend = backend
+        self.object_dict = object_dict
+        self.use_orjson = (not object_dict and orjson is not None and
+                           backend != 'json')
+        self._object_hook = ObjectDict if object_dict else None
+
+    def loads(self, content: t.Union[bytes, str]) -> t.Any:
+        if self.use_orjson:
+            try:
+                return orjson.loads(content)
+            except ValueError:
+                pass
+        # 标准库解析 bytes 时同样需要先解码, 直接解码并沿用宽松模式
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', 'ignore')
+        return json.loads(content, object_hook=self._object_hook, strict=False)
+
+
+# 与 dingtalk.core.utils.json_loads 行为一致的默认解码器
+default_decoder = JsonDecoder()
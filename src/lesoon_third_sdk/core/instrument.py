@@ -0,0 +1,271 @@
+import bisect
+import collections
+import contextlib
+import contextvars
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+
+from lesoon_third_sdk.core.utils import endpoint_template
+
+
+@dataclass
+class RequestInfo:
+    # 客户端类型, 如 dingtalk/senselink/wechat
+    client: str
+    method: str
+    # 接口路径模板, 路径中的id段替换为 {id}
+    endpoint: str
+    # 本次请求前已重试的次数
+    retries: int = 0
+    # 耗时(秒)
+    latency: float = 0.0
+    status_code: t.Optional[int] = None
+    bytes_out: int = 0
+    bytes_in: int = 0
+    # 业务错误码, 请求成功时为空
+    errcode: t.Any = None
+    exception: t.Optional[BaseException] = None
+
+
+class Instrumentation:
+    """
+    http 请求埋点钩子, 子类按需覆盖.
+    钩子在请求线程中同步执行, 应避免耗时操作.
+    """
+
+    def before_request(self, info: RequestInfo):
+        pass
+
+    def after_response(self, info: RequestInfo):
+        pass
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        pass
+
+
+class CompositeInstrumentation(Instrumentation):
+    """
+    依次调用多个埋点钩子.
+    """
+
+    def __init__(self, *instrumentations: Instrumentation):
+        self.instrumentations = instrumentations
+
+    def before_request(self, info: RequestInfo):
+        for instrumentation in self.instrumentations:
+            instrumentation.before_request(info)
+
+    def after_response(self, info: RequestInfo):
+        for instrumentation in self.instrumentations:
+            instrumentation.after_response(info)
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        for instrumentation in self.instrumentations:
+            instrumentation.on_retry(info, delay)
+
+
+# 当前线程/协程正在执行的请求, 供解析响应时回填状态码及字节数
+_current: 'contextvars.ContextVar[t.Optional[RequestInfo]]' = \
+    contextvars.ContextVar('lesoon_third_sdk_request', default=None)
+
+
+def record_response(res, body: t.Any = None):
+    """
+    将响应的状态码及收发字节数记录到当前请求.
+    Args:
+        res: requests.Response 或 AsyncResponse
+        body: 请求体, 为空时从 res.request 中获取
+
+    """
+    info = _current.get()
+    if info is None or res is None:
+        return
+    info.status_code = res.status_code
+    info.bytes_in = len(res.content or b'')
+    if body is None:
+        body = getattr(getattr(res, 'request', None), 'body', None)
+    if body:
+        info.bytes_out = len(body)
+
+
+@contextlib.contextmanager
+def _instrument(instrumentation: Instrumentation, info: RequestInfo,
+                get_errcode: t.Optional[t.Callable[[Exception], t.Any]]):
+    token = _current.set(info)
+    instrumentation.before_request(info)
+    started_at = time.perf_counter()
+    try:
+        yield info
+    except Exception as e:
+        info.exception = e
+        info.errcode = get_errcode(e) if get_errcode is not None \
+            else getattr(e, 'errcode', None)
+        if info.status_code is None:
+            record_response(getattr(e, 'response', None))
+        raise
+    finally:
+        info.latency = time.perf_counter() - started_at
+        _current.reset(token)
+        instrumentation.after_response(info)
+
+
+def instrument(
+    instrumentation: t.Optional[Instrumentation],
+    client: str,
+    method: str,
+    uri: str,
+    retries: int = 0,
+    get_errcode: t.Callable[[Exception], t.Any] = None
+) -> t.ContextManager[t.Optional[RequestInfo]]:
+    """
+    包裹一次 http 请求, 未配置埋点时不产生额外开销.
+    Args:
+        instrumentation: 埋点钩子
+        client: 客户端类型
+        method: 请求方法
+        uri: 请求路径
+        retries: 已重试次数
+        get_errcode: 从异常中获取业务错误码, 默认取异常的 errcode 属性
+
+    """
+    if instrumentation is None:
+        return contextlib.nullcontext()
+    info = RequestInfo(client=client,
+                       method=method.upper(),
+                       endpoint=endpoint_template(uri),
+                       retries=retries)
+    return _instrument(instrumentation, info, get_errcode)
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class _Series:
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.errors: t.Counter[str] = collections.Counter()
+
+
+class HistogramAggregator(Instrumentation):
+    """
+    按 (客户端, 方法, 接口) 聚合耗时直方图、收发字节数、错误码及重试次数,
+    可导出为 Prometheus 文本格式.
+    """
+
+    def __init__(self,
+                 buckets: t.Sequence[float] = DEFAULT_BUCKETS,
+                 prefix: str = 'lesoon_third_sdk'):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._series: t.Dict[t.Tuple[str, str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _get_series(self, info: RequestInfo) -> _Series:
+        key = (info.client, info.method, info.endpoint)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series.setdefault(key, _Series(len(self.buckets)))
+        return series
+
+    def after_response(self, info: RequestInfo):
+        index = bisect.bisect_left(self.buckets, info.latency)
+        with self._lock:
+            series = self._get_series(info)
+            series.counts[index] += 1
+            series.sum += info.latency
+            series.count += 1
+            series.bytes_in += info.bytes_in
+            series.bytes_out += info.bytes_out
+            if info.exception is not None:
+                series.errors[str(info.errcode)] += 1
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        with self._lock:
+            self._get_series(info).retries += 1
+
+    def snapshot(self) -> t.Dict[t.Tuple[str, str, str], t.Dict[str, t.Any]]:
+        """
+        各接口的聚合数据.
+
+        """
+        with self._lock:
+            return {
+                key: {
+                    'count':
+                        series.count,
+                    'sum':
+                        series.sum,
+                    'buckets':
+                        dict(zip(self.buckets + (float('inf'),),
+                                 series.counts)),
+                    'bytes_in':
+                        series.bytes_in,
+                    'bytes_out':
+                        series.bytes_out,
+                    'retries':
+                        series.retries,
+                    'errors':
+                        dict(series.errors),
+                } for key, series in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def to_prometheus(self) -> str:
+        """
+        导出为 Prometheus 文本格式.
+
+        """
+        name = f'{self.prefix}_request_duration_seconds'
+        lines = [
+            f'# HELP {name} SDK http request latency.',
+            f'# TYPE {name} histogram'
+        ]
+        totals = []
+        for (client, method, endpoint), data in sorted(self.snapshot().items()):
+            labels = (f'client="{client}",method="{method}",'
+                      f'endpoint="{_escape(endpoint)}"')
+            cumulative = 0
+            for bound, count in data['buckets'].items():
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} '
+                             f'{cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {data["sum"]}')
+            lines.append(f'{name}_count{{{labels}}} {data["count"]}')
+            totals.append((labels, data))
+
+        for metric, key, help_text in (
+            ('request_bytes_in_total', 'bytes_in', 'Response bytes.'),
+            ('request_bytes_out_total', 'bytes_out', 'Request bytes.'),
+            ('request_retries_total', 'retries', 'Retried requests.'),
+        ):
+            metric = f'{self.prefix}_{metric}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} counter')
+            for labels, data in totals:
+                lines.append(f'{metric}{{{labels}}} {data[key]}')
+
+        metric = f'{self.prefix}_request_errors_total'
+        lines.append(f'# HELP {metric} Failed requests by errcode.')
+        lines.append(f'# TYPE {metric} counter')
+        for labels, data in totals:
+            for errcode, count in sorted(data['errors'].items()):
+                lines.append(
+                    f'{metric}{{{labels},errcode="{_escape(errcode)}"}} '
+                    f'{count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,204 @@
+import asyncio
+import collections
+import logging
+import math
+import typing as t
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def skip_after(items: t.List[t.Any], after: t.Any, key: str,
+               page: int) -> t.List[t.Any]:
+    """
+    返回起始页中断点记录之后的数据.
+    标识统一按字符串比较, 兼容 str/int 混用; 起始页中没有断点记录时(记录已删除、起始页有误等)
+    记录警告并返回整页数据, 宁可重复也不丢数据.
+    Args:
+        items: 起始页数据
+        after: 断点记录标识
+        key: 记录标识字段
+        page: 起始页号
+
+    """
+    after = str(after)
+    for index, item in enumerate(items):
+        if str(item.get(key)) == after:
+            return items[index + 1:]
+    logger.warning('起始页%s中未找到断点记录 %s=%s, 从起始页开始返回全部数据', page, key, after)
+    return items
+
+
+class Paginator:
+    """
+    惰性分页迭代器.
+    逐页调用 fetch_page, 同一时刻最多持有当前页及预取的下一页;
+    返回条数不足 page_size 或累计条数达到总数时停止.
+    """
+
+    def __init__(self,
+                 fetch_page: t.Callable[[int], t.Any],
+                 page_size: int,
+                 get_items: t.Callable[[t.Any], t.List[t.Any]],
+                 get_total: t.Callable[[t.Any], t.Optional[int]] = None,
+                 start_page: int = 1,
+                 prefetch: bool = False):
+        """
+        Args:
+            fetch_page: 根据页号获取单页原始结果
+            page_size: 每页条数
+            get_items: 从单页结果中取出数据列表
+            get_total: 从单页结果中取出总条数, 为空时仅按页大小判断是否结束
+            start_page: 起始页号, 用于断点续传
+            prefetch: 是否在消费当前页时于后台预取下一页
+
+        """
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.get_items = get_items
+        self.get_total = get_total
+        self.start_page = start_page
+        self.prefetch = prefetch
+
+    def _is_last(self, page: int, items: t.List[t.Any], result) -> bool:
+        if len(items) < self.page_size:
+            return True
+        total = self.get_total(result) if self.get_total else None
+        return total is not None and page * self.page_size >= total
+
+    def pages(self) -> t.Iterator[t.Tuple[int, t.List[t.Any]]]:
+        """
+        逐页返回 (页号, 数据列表).
+
+        """
+        page = self.start_page
+        if not self.prefetch:
+            while True:
+                result = self.fetch_page(page)
+                items = self.get_items(result)
+                yield page, items
+                if self._is_last(page, items, result):
+                    return
+                page += 1
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        future: t.Optional[Future] = executor.submit(self.fetch_page, page)
+        try:
+            while future is not None:
+                result = future.result()
+                items = self.get_items(result)
+                future = None
+                if not self._is_last(page, items, result):
+                    future = executor.submit(self.fetch_page, page + 1)
+                yield page, items
+                page += 1
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def items(self, after: t.Any = None, key: str = 'id') -> t.Iterator[t.Any]:
+        """
+        逐条返回数据.
+        Args:
+            after: 断点续传时上次处理到的记录标识, 跳过起始页中该记录及其之前的数据,
+                起始页中没有该记录时返回全部数据
+            key: 记录标识字段
+
+        """
+        for page, items in self.pages():
+            if after is not None and page == self.start_page:
+                items = skip_after(items, after, key, page)
+            yield from items
+
+    def __iter__(self):
+        return self.items()
+
+
+class AsyncPaginator:
+    """
+    asyncio 分页迭代器.
+    首页返回总条数时, 其余页在信号量限制下并发获取并按页号顺序返回,
+    同一时刻最多持有 2 * concurrency 页; 否则逐页顺序获取.
+    """
+
+    def __init__(self,
+                 fetch_page: t.Callable[[int], t.Awaitable[t.Any]],
+                 page_size: int,
+                 get_items: t.Callable[[t.Any], t.List[t.Any]],
+                 get_total: t.Callable[[t.Any], t.Optional[int]] = None,
+                 start_page: int = 1,
+                 concurrency: int = 8):
+        """
+        Args:
+            fetch_page: 根据页号获取单页原始结果的协程函数
+            page_size: 每页条数
+            get_items: 从单页结果中取出数据列表
+            get_total: 从单页结果中取出总条数
+            start_page: 起始页号, 用于断点续传
+            concurrency: 最大并发请求数
+
+        """
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.get_items = get_items
+        self.get_total = get_total
+        self.start_page = start_page
+        self.concurrency = concurrency
+
+    async def pages(self) -> t.AsyncIterator[t.Tuple[int, t.List[t.Any]]]:
+        page = self.start_page
+        result = await self.fetch_page(page)
+        items = self.get_items(result)
+        yield page, items
+        if len(items) < self.page_size:
+            return
+        total = self.get_total(result) if self.get_total else None
+        if total is None:
+            while len(items) >= self.page_size:
+                page += 1
+                items = self.get_items(await self.fetch_page(page))
+                yield page, items
+            return
+
+        last_page = math.ceil(total / self.page_size)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(number):
+            async with semaphore:
+                return self.get_items(await self.fetch_page(number))
+
+        pending: t.Deque[t.Tuple[int, asyncio.Task]] = collections.deque()
+        next_page = page + 1
+        try:
+            while next_page <= last_page or pending:
+                while (next_page <= last_page and
+                       len(pending) < 2 * self.concurrency):
+                    pending.append(
+                        (next_page, asyncio.ensure_future(fetch(next_page))))
+                    next_page += 1
+                number, task = pending.popleft()
+                yield number, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def items(self,
+                    after: t.Any = None,
+                    key: str = 'id') -> t.AsyncIterator[t.Any]:
+        """
+        逐条返回数据, 同 Paginator.items.
+        Args:
+            after: 断点续传时上次处理到的记录标识
+            key: 记录标识字段
+
+        """
+        async for page, items in self.pages():
+            if after is not None and page == self.start_page:
+                items = skip_after(items, after, key, page)
+            for item in items:
+                yield item
+
+    def __aiter__(self):
+        return self.items()
@@ -0,0 +1,140 @@
+import json
+import random
+import re
+import typing as t
+from dataclasses import dataclass
+
+from lesoon_third_sdk.core.utils import match_path
+
+# 默认脱敏的字段, 匹配时不区分大小写
+DEFAULT_REDACT_KEYS = frozenset({
+    'sign', 'signature', 'app_secret', 'appSecret', 'secret', 'secret_key',
+    'secretKey', 'access_token', 'password', 'mobile', 'phone', 'id_number',
+    'idNumber', 'idCard', 'id_card'
+})
+REDACTED = '***'
+
+
+@dataclass
+class PayloadLogConfig:
+    # 单个请求参数/响应数据格式化后的最大长度
+    max_length: int = 1024
+    # 容器类型只展开前 max_items 项
+    max_items: int = 20
+    # 展开的最大嵌套层数
+    max_depth: int = 5
+    # 需脱敏的字段名, 不区分大小写
+    redact_keys: t.FrozenSet[str] = DEFAULT_REDACT_KEYS
+    # 响应数据整体脱敏的接口路径通配, 如解密接口返回的明文
+    redact_endpoints: t.Tuple[str, ...] = ()
+    # 成功请求的 debug 日志采样率, 错误日志不采样
+    success_sample_rate: float = 1.0
+
+    def __post_init__(self):
+        self._redact_keys = frozenset(key.lower() for key in self.redact_keys)
+        keys = '|'.join(map(re.escape, sorted(self._redact_keys)))
+        self._pattern = re.compile(
+            rf'(["\']?(?:{keys})["\']?\s*[:=]\s*["\']?)[^"\'&,\s}}]*',
+            re.IGNORECASE)
+
+    def is_redacted_key(self, key: t.Any) -> bool:
+        return isinstance(key, str) and key.lower() in self._redact_keys
+
+    def sample(self) -> bool:
+        return (self.success_sample_rate >= 1 or
+                random.random() < self.success_sample_rate)
+
+    def is_redacted_endpoint(self, url: str) -> bool:
+        return bool(self.redact_endpoints) and match_path(
+            url, ((p, True) for p in self.redact_endpoints)) is not None
+
+    def redact_text(self, text: str) -> str:
+        return self._pattern.sub(rf'\g<1>{REDACTED}', text)
+
+
+def _truncate(text: str, max_length: int, size: int) -> str:
+    if len(text) <= max_length:
+        return text
+    return f'{text[:max_length]}...(总长度{size})'
+
+
+def _shrink(obj: t.Any,
+            config: PayloadLogConfig,
+            depth: int = 0,
+            budget: t.List[int] = None) -> t.Any:
+    """
+    复制出仅包含前 max_items 项且已脱敏的结构, 避免格式化整个大对象.
+    每个节点序列化后至少占若干字符, 展开的节点数超出 max_length 可容纳的数量后不再展开.
+
+    """
+    if budget is None:
+        budget = [config.max_length // 4]
+    budget[0] -= 1
+    if budget[0] < 0:
+        return '...'
+    if isinstance(obj, dict):
+        if depth >= config.max_depth:
+            return f'<{len(obj)} keys>'
+        shrunk: t.Dict[t.Any, t.Any] = {}
+        for index, (key, value) in enumerate(obj.items()):
+            if index >= config.max_items:
+                shrunk['...'] = f'共{len(obj)}项'
+                break
+            shrunk[key] = REDACTED if config.is_redacted_key(key) else _shrink(
+                value, config, depth + 1, budget)
+        return shrunk
+    if isinstance(obj, (list, tuple)):
+        if depth >= config.max_depth:
+            return f'<{len(obj)} items>'
+        items = [
+            _shrink(value, config, depth + 1, budget)
+            for value in obj[:config.max_items]
+        ]
+        if len(obj) > config.max_items:
+            items.append(f'...共{len(obj)}项')
+        return items
+    if isinstance(obj, bytes):
+        return obj[:config.max_length + 1].decode('utf-8', 'ignore')
+    if isinstance(obj, str) and len(obj) > config.max_length:
+        return obj[:config.max_length] + '...'
+    return obj
+
+
+def format_payload(payload: t.Any, config: PayloadLogConfig) -> str:
+    """
+    将请求参数或响应数据格式化为截断且脱敏的文本.
+    Args:
+        payload: dict/list/str/bytes 等
+        config: 日志配置
+
+    """
+    if payload is None or payload == '' or payload == b'':
+        return ''
+    if isinstance(payload, (str, bytes)):
+        size = len(payload)
+        text = _shrink(payload, config) if isinstance(payload, bytes) \
+            else payload[:config.max_length + 1]
+        return _truncate(config.redact_text(text), config.max_length, size)
+    if isinstance(payload, (dict, list, tuple)):
+        text = json.dumps(_shrink(payload, config),
+                          ensure_ascii=False,
+                          default=str)
+        return _truncate(text, config.max_length, len(text))
+    return _truncate(config.redact_text(str(payload)), config.max_length,
+                     len(str(payload)))
+
+
+class LazyPayload:
+    """
+    延迟格式化的日志参数, 仅在日志真正输出时才截断、脱敏及序列化.
+    """
+    __slots__ = ('payload', 'config')
+
+    def __init__(self, payload: t.Any, config: PayloadLogConfig):
+        self.payload = payload
+        self.config = config
+
+    def __str__(self) -> str:
+        return format_payload(self.payload, self.config)
+
+    __repr__ = __str__
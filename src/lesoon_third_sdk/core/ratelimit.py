@@ -0,0 +1,196 @@
+import math
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+
+from dingtalk.storage import BaseStorage
+
+from lesoon_third_sdk.core.utils import match_path
+
+
+class RateLimitTimeout(Exception):
+    """在超时时间内未能获取到请求令牌."""
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶.
+    令牌以 rate 个/秒的速度补充, 最多积累 capacity 个.
+    """
+
+    def __init__(self,
+                 rate: float,
+                 capacity: float = None,
+                 clock: t.Callable[[], float] = time.monotonic,
+                 sleep: t.Callable[[float], t.Any] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """
+        尝试扣减令牌, 返回仍需等待的秒数(0 表示已扣减成功).
+
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    def _check(self, tokens: float):
+        if tokens > self.capacity:
+            raise ValueError(f'请求的令牌数 {tokens} 超出令牌桶容量 {self.capacity}')
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        self._check(tokens)
+        return self._reserve(tokens) == 0
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """
+        获取令牌, 令牌不足时阻塞等待.
+        Args:
+            tokens: 令牌数
+            timeout: 最长等待秒数, None 为一直等待
+
+        Returns:
+            是否获取成功
+
+        """
+        self._check(tokens)
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            wait = self._reserve(tokens)
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self.sleep(wait)
+
+
+class StorageTokenBucket(TokenBucket):
+    """
+    基于 BaseStorage 的令牌桶, 用于多进程共享同一份配额.
+    剩余令牌数及更新时间存于 storage, 按 rate 补充; BaseStorage 不提供原子操作,
+    多进程并发时为近似限流.
+    """
+
+    def __init__(self,
+                 storage: BaseStorage,
+                 key: str,
+                 rate: float,
+                 capacity: float = None,
+                 clock: t.Callable[[], float] = time.time,
+                 sleep: t.Callable[[float], t.Any] = time.sleep):
+        super().__init__(rate, capacity, clock=clock, sleep=sleep)
+        self.storage = storage
+        self.key = key
+        # 空闲超过补满所需时间后令牌桶必然已满, 状态可直接过期
+        self._ttl = int(math.ceil(self.capacity / self.rate)) + 1
+
+    def _reserve(self, tokens: float) -> float:
+        with self._lock:
+            now = self.clock()
+            state = self.storage.get(self.key)
+            if state:
+                available = min(
+                    self.capacity, state['tokens'] +
+                    max(0.0, now - state['updated_at']) * self.rate)
+            else:
+                available = self.capacity
+            if available < tokens:
+                return (tokens - available) / self.rate
+            state = {'tokens': available - tokens, 'updated_at': now}
+            self.storage.set(self.key, state, ttl=self._ttl)
+            return 0
+
+
+@dataclass
+class RateLimitRule:
+    # 接口路径通配, 如 /topapi/attendance/*
+    pattern: str
+    # 每秒请求数
+    rate: float
+    # 突发容量, 默认等于 rate
+    capacity: t.Optional[float] = None
+
+
+# 限流规则, 或按 RateLimitRule 字段顺序给出的参数元组
+RuleSpec = t.Union[RateLimitRule, t.Tuple[t.Any, ...]]
+
+
+class RateLimiter:
+    """
+    按应用及接口分组的客户端限流器.
+    请求路径按顺序匹配 rules, 命中的第一条规则决定所用令牌桶;
+    同一个 RateLimiter 可被多个客户端共享, 令牌桶以 (key, pattern) 区分.
+    """
+
+    def __init__(self,
+                 rules: t.Iterable[RuleSpec] = (),
+                 storage: BaseStorage = None,
+                 prefix: str = 'ratelimit',
+                 timeout: float = None):
+        """
+        Args:
+            rules: 限流规则, 也可为参数元组, 如 ('/topapi/*', 20)
+            storage: 配置后通过该存储在多进程间共享配额
+            prefix: 存储键前缀
+            timeout: 获取令牌的最长等待秒数, None 为一直等待
+
+        """
+        self.rules = [
+            rule if isinstance(rule, RateLimitRule) else RateLimitRule(*rule)
+            for rule in rules
+        ]
+        self.storage = storage
+        self.prefix = prefix
+        self.timeout = timeout
+        self._buckets: t.Dict[t.Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def match(self, uri: str) -> t.Optional[RateLimitRule]:
+        return match_path(uri, ((rule.pattern, rule) for rule in self.rules))
+
+    def _get_bucket(self, key: str, rule: RateLimitRule) -> TokenBucket:
+        bucket_key = (key, rule.pattern)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(bucket_key)
+                if bucket is None:
+                    if self.storage is not None:
+                        bucket = StorageTokenBucket(
+                            self.storage, f'{self.prefix}:{key}:{rule.pattern}',
+                            rule.rate, rule.capacity)
+                    else:
+                        bucket = TokenBucket(rule.rate, rule.capacity)
+                    self._buckets[bucket_key] = bucket
+        return bucket
+
+    def acquire(self, uri: str, key: str = ''):
+        """
+        请求发出前获取令牌.
+        Args:
+            uri: 请求路径或完整地址
+            key: 配额归属, 一般为应用的 app_key
+
+        """
+        rule = self.match(uri)
+        if rule is None:
+            return
+        if not self._get_bucket(key, rule).acquire(timeout=self.timeout):
+            raise RateLimitTimeout(f'{key}:{rule.pattern} 获取请求令牌超时')
@@ -0,0 +1,230 @@
+import abc
+import asyncio
+import atexit
+import inspect
+import logging
+import threading
+import typing as t
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def _count_session_connections(session: requests.Session) -> int:
+    count = 0
+    adapters = {id(a): a for a in session.adapters.values()}
+    for adapter in adapters.values():
+        pool_manager = getattr(adapter, 'poolmanager', None)
+        if pool_manager is None:
+            continue
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+            count += sum(conn is not None for conn in list(pool.pool.queue))
+    return count
+
+
+def count_connections(http) -> int:
+    """
+    统计 http 后端当前缓存的空闲连接数, 无法统计时返回 0.
+    Args:
+        http: requests.Session 或 HttpTransport
+
+    """
+    if isinstance(http, requests.Session):
+        return _count_session_connections(http)
+    sessions = getattr(http, '_sessions', None)
+    if sessions:
+        return sum(_count_session_connections(s) for s in list(sessions))
+    return 0
+
+
+# 同步关闭时交由事件循环执行的关闭任务, 持有引用以免被回收
+_closing_tasks: t.Set['asyncio.Task'] = set()
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def close_client(client):
+    """
+    关闭客户端独占的 http 连接, 类级别共享的 Session 不做处理.
+    异步客户端的关闭协程在运行中的事件循环里调度执行, 没有事件循环时直接运行;
+    在异步代码中应使用 aclose_client 等待关闭完成.
+
+    """
+    http = vars(client).get('_http')
+    close = getattr(http, 'close', None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if not inspect.isawaitable(result):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(_await(result))
+        else:
+            task = loop.create_task(_await(result))
+            _closing_tasks.add(task)
+            task.add_done_callback(_closing_tasks.discard)
+    except Exception:
+        logger.warning('关闭客户端连接失败: %r', client, exc_info=True)
+
+
+async def aclose_client(client):
+    """
+    关闭客户端独占的 http 连接, 同 close_client, 会等待异步客户端关闭完成.
+
+    """
+    http = vars(client).get('_http')
+    close = getattr(http, 'close', None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception:
+        logger.warning('关闭客户端连接失败: %r', client, exc_info=True)
+
+
+class ClientRegistry:
+    """
+    进程级客户端注册表.
+    按配置生成的 key 缓存长期复用的客户端, 多租户以各自的 key 区分.
+    """
+
+    def __init__(self):
+        self._clients: t.Dict[t.Hashable, t.Any] = {}
+        self._lock = threading.RLock()
+
+    def get_or_create(self, key: t.Hashable, factory: t.Callable[[], t.Any]):
+        """
+        获取 key 对应的客户端, 不存在时调用 factory 创建.
+        Args:
+            key: 客户端标识, 如 ('dingtalk', corp_id, app_key, agent_id)
+            factory: 创建客户端的函数
+
+        """
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = factory()
+        return client
+
+    def get(self, key: t.Hashable):
+        return self._clients.get(key)
+
+    def remove(self, key: t.Hashable):
+        """
+        移除并关闭 key 对应的客户端.
+
+        """
+        with self._lock:
+            client = self._clients.pop(key, None)
+        if client is not None:
+            close_client(client)
+
+    async def aremove(self, key: t.Hashable):
+        """
+        移除并关闭 key 对应的客户端, 等待异步客户端关闭完成.
+
+        """
+        with self._lock:
+            client = self._clients.pop(key, None)
+        if client is not None:
+            await aclose_client(client)
+
+    def clear(self):
+        """
+        移除并关闭所有客户端, 用于应用退出或配置重载.
+
+        """
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            close_client(client)
+
+    async def aclear(self):
+        """
+        移除并关闭所有客户端, 等待异步客户端关闭完成.
+
+        """
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await aclose_client(client)
+
+    def stats(self) -> t.Dict[str, int]:
+        """
+        当前存活的客户端数及其缓存的连接数.
+
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+        https = {id(c._http): c._http for c in clients if hasattr(c, '_http')}
+        return {
+            'clients': len(clients),
+            'connections': sum(count_connections(h) for h in https.values()),
+        }
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, key: t.Hashable) -> bool:
+        return key in self._clients
+
+
+# 进程级默认注册表
+client_registry = ClientRegistry()
+atexit.register(client_registry.clear)
+
+
+class RegistryMixin(abc.ABC):
+    """
+    为 Flask 扩展提供基于 ClientRegistry 的客户端复用.
+    未配置 registry 时每次调用都创建新的客户端.
+    """
+    # 扩展可创建的客户端类型
+    CLIENT_KINDS: t.Tuple[str, ...] = ('client',)
+
+    registry: t.Optional[ClientRegistry] = None
+
+    @abc.abstractmethod
+    def _client_key(self, kind: str) -> t.Tuple[t.Any, ...]:
+        """
+        当前配置下 kind 类型客户端在注册表中的 key.
+
+        """
+
+    def _get_client(self, kind: str, factory: t.Callable[[], t.Any]):
+        if self.registry is None:
+            return factory()
+        return self.registry.get_or_create(self._client_key(kind), factory)
+
+    def close_clients(self):
+        """
+        关闭当前配置对应的共享客户端, 配置变更前调用.
+
+        """
+        if self.registry is None or not self.config:
+            return
+        for kind in self.CLIENT_KINDS:
+            self.registry.remove(self._client_key(kind))
+
+    async def aclose_clients(self):
+        """
+        关闭当前配置对应的共享客户端, 同 close_clients, 用于异步客户端.
+
+        """
+        if self.registry is None or not self.config:
+            return
+        for kind in self.CLIENT_KINDS:
+            await self.registry.aremove(self._client_key(kind))
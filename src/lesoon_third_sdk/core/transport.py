@@ -0,0 +1,178 @@
+import threading
+import typing as t
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore[assignment]
+
+
+@dataclass
+class HttpConfig:
+    # 连接池缓存的主机数
+    pool_connections: int = 10
+    # 单个主机的最大连接数, 一般不小于并发线程数
+    pool_maxsize: int = 10
+    # 连接层(urllib3)重试次数
+    max_retries: int = 0
+    # 是否复用长连接
+    keep_alive: bool = True
+    # 建立连接超时(秒)
+    connect_timeout: t.Optional[float] = None
+    # 读取超时(秒)
+    read_timeout: t.Optional[float] = None
+    # 是否每个线程使用独立的 Session
+    per_thread: bool = False
+
+    @property
+    def timeout(self):
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return self.connect_timeout, self.read_timeout
+
+
+def create_session(config: HttpConfig) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=config.pool_connections,
+                          pool_maxsize=config.pool_maxsize,
+                          max_retries=config.max_retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if not config.keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+class HttpTransport:
+    """
+    可配置的 http 传输层, 接口与 requests.Session.request 一致.
+    per_thread 模式下每个线程持有独立的 Session, 否则所有线程共享同一个.
+    """
+
+    def __init__(self, config: HttpConfig = None):
+        self.config = config or HttpConfig()
+        self._local = threading.local()
+        self._sessions: t.List[requests.Session] = []
+        self._lock = threading.Lock()
+        self._shared = None if self.config.per_thread else self._new_session()
+
+    def _new_session(self) -> requests.Session:
+        session = create_session(self.config)
+        with self._lock:
+            self._sessions.append(session)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        if self._shared is not None:
+            return self._shared
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._new_session()
+        return session
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.config.timeout
+        return self.session.request(method=method, url=url, **kwargs)
+
+    def close(self):
+        """
+        关闭所有 Session 持有的连接.
+
+        """
+        with self._lock:
+            sessions = list(self._sessions)
+            if self._shared is None:
+                self._sessions.clear()
+                self._local = threading.local()
+        for session in sessions:
+            session.close()
+
+
+class AsyncResponse:
+    """
+    已读取完毕的 aiohttp 响应, 提供与 requests.Response 一致的常用属性,
+    使同步客户端的结果处理逻辑可直接复用.
+    """
+
+    def __init__(self, method: str, url: str, status_code: int,
+                 headers: t.Mapping[str, str], content: bytes):
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.request = None
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', 'ignore')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            error = requests.HTTPError(
+                f'{self.status_code} Error for url: {self.url}')
+            error.response = self
+            raise error
+
+
+class AsyncHttpTransport:
+    """
+    基于 aiohttp 连接池的异步 http 传输层.
+    ClientSession 在首次请求时于当前事件循环中创建.
+    """
+
+    def __init__(self, config: HttpConfig = None):
+        if aiohttp is None:
+            raise ImportError('异步客户端依赖 aiohttp, 请安装 lesoon-third-sdk[async]')
+        self.config = config or HttpConfig()
+        self._session: t.Optional['aiohttp.ClientSession'] = None
+
+    def _new_session(self) -> 'aiohttp.ClientSession':
+        connector = aiohttp.TCPConnector(
+            limit=self.config.pool_connections * self.config.pool_maxsize,
+            limit_per_host=self.config.pool_maxsize,
+            force_close=not self.config.keep_alive)
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=self.config.connect_timeout,
+            sock_read=self.config.read_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        if self._session is None or self._session.closed:
+            self._session = self._new_session()
+        return self._session
+
+    async def request(self, method, url, **kwargs) -> AsyncResponse:
+        params = kwargs.get('params')
+        if params:
+            # aiohttp 仅接受字符串类型的查询参数
+            kwargs['params'] = {
+                k: v if isinstance(v, str) else str(v)
+                for k, v in params.items()
+            }
+        timeout = kwargs.pop('timeout', None)
+        if isinstance(timeout, tuple):
+            kwargs['timeout'] = aiohttp.ClientTimeout(sock_connect=timeout[0],
+                                                      sock_read=timeout[1])
+        elif timeout is not None:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        async with self.session.request(method, url, **kwargs) as res:
+            content = await res.read()
+            return AsyncResponse(method, str(res.url), res.status, res.headers,
+                                 content)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
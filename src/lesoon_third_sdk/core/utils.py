@@ -0,0 +1,49 @@
+import fnmatch
+import functools
+import re
+import typing as t
+from urllib.parse import urlparse
+
+T = t.TypeVar('T')
+
+# 纯数字, 或含数字的长标识(如 unionId、uuid)视为路径中的 id 段
+_ID_SEGMENT = re.compile(r'^\d+$|^(?=.*\d)[\w-]{16,}$')
+
+
+def get_path(uri: str) -> str:
+    """
+    取出请求地址中的路径部分, 统一以 / 开头.
+    Args:
+        uri: 请求路径或完整地址
+
+    """
+    path = urlparse(uri).path
+    return path if path.startswith('/') else f'/{path}'
+
+
+def match_path(uri: str, patterns: t.Iterable[t.Tuple[str,
+                                                      T]]) -> t.Optional[T]:
+    """
+    按顺序匹配路径通配, 返回第一条命中规则对应的值.
+    Args:
+        uri: 请求路径或完整地址
+        patterns: (通配, 值) 列表
+
+    """
+    path = get_path(uri)
+    for pattern, value in patterns:
+        if fnmatch.fnmatchcase(path, pattern):
+            return value
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def endpoint_template(uri: str) -> str:
+    """
+    生成接口路径模板, 去掉查询参数并将 id 段替换为 {id}, 用于按接口聚合指标.
+    Args:
+        uri: 请求路径或完整地址
+
+    """
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment
+                    for segment in get_path(uri).split('/'))
@@ -1,4 +1,6 @@
 from dingtalk.core.utils import ObjectDict
 
 from .base import DingTalk
+from .callback import CallbackPipeline
 from .client import AppKeyClient
+from .retry import RetryPolicy
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import typing as t
+from urllib.parse import urljoin
+
+import requests
+from dingtalk.core.exceptions import DingTalkClientException
+
+from lesoon_third_sdk.core.instrument import instrument
+from lesoon_third_sdk.core.pagination import AsyncPaginator
+from lesoon_third_sdk.core.transport import aiohttp
+from lesoon_third_sdk.core.transport import AsyncHttpTransport
+from lesoon_third_sdk.core.transport import HttpConfig
+from lesoon_third_sdk.dingtalk.api import BaseYiDaApi
+from lesoon_third_sdk.dingtalk.client import ACCESS_TOKEN_HEADER
+from lesoon_third_sdk.dingtalk.client import NewAppKeyClient
+from lesoon_third_sdk.dingtalk.token import AsyncTokenManager
+
+logger = logging.getLogger(__name__)
+
+# 透传给 AsyncHttpTransport.request 的请求参数
+_REQUEST_PARAM_KEYS = frozenset({
+    'params', 'data', 'json', 'headers', 'timeout', 'api_base_url',
+    'result_processor', 'top_response_key'
+})
+
+
+class AsyncYiDaApi(BaseYiDaApi):
+
+    def iter_form_datas(self,
+                        app_type: str,
+                        system_token: str,
+                        user_id: str,
+                        form_uuid: str,
+                        start_page: int = 1,
+                        after_instance_id: str = None,
+                        concurrency: int = 8,
+                        **kwargs) -> t.AsyncIterator[t.Any]:
+        """
+        逐条遍历宜搭表单实例, 其余页在 concurrency 限制下并发获取.
+        参数同 YiDaApi.iter_form_datas.
+
+        """
+        self._check_page_kwargs(kwargs)
+        paginator = AsyncPaginator(
+            lambda page: self.search_form_datas(app_type,
+                                                system_token,
+                                                user_id,
+                                                form_uuid,
+                                                current_page=page,
+                                                page_size=self.MAX_PAGE_SIZE,
+                                                **kwargs),
+            page_size=self.MAX_PAGE_SIZE,
+            get_items=lambda result: result.get('data') or [],
+            get_total=lambda result: result.get('totalCount'),
+            start_page=start_page,
+            concurrency=concurrency)
+        return paginator.items(after=after_instance_id, key='formInstanceId')
+
+
+class AsyncNewAppKeyClient(NewAppKeyClient):
+    """
+    基于 aiohttp 连接池的钉钉新版接口(api.dingtalk.com)异步客户端.
+    接口与 NewAppKeyClient 一致, 各接口方法返回协程;
+    token 注入、requestTooFast 重试、熔断及请求合并复用 NewAppKeyClient 的实现,
+    不支持 response_cache.
+    """
+    yida = AsyncYiDaApi()
+
+    def __init__(self, *args, http_config: HttpConfig = None, **kwargs):
+        """
+        Args:
+            http_config: http 传输层配置
+            **kwargs: 其余参数同 NewAppKeyClient
+
+        """
+        super().__init__(*args, **kwargs)
+        self._http = AsyncHttpTransport(http_config)
+
+    def _new_token_manager(self, refresh_ahead, storage_lock):
+        # 不支持 storage 锁, 等待锁会阻塞事件循环
+        return AsyncTokenManager(self, refresh_ahead=refresh_ahead)
+
+    @property
+    def access_token(self):
+        """
+        异步客户端无法同步获取 token, 请使用 await client.token_manager.get().
+        抛出 AttributeError 以便基类 __new__ 中的 inspect.getmembers 跳过该属性.
+
+        """
+        raise AttributeError(
+            '异步客户端请使用 await client.token_manager.get() 获取 access_token')
+
+    async def _request(self, method, url_or_endpoint, **kwargs):
+        if not url_or_endpoint.startswith(('http://', 'https://')):
+            api_base_url = kwargs.pop('api_base_url', self.API_BASE_URL)
+            url = urljoin(api_base_url, url_or_endpoint)
+        else:
+            url = url_or_endpoint
+
+        if 'params' not in kwargs:
+            kwargs['params'] = {}
+        if isinstance(kwargs.get('data', ''), dict):
+            body = json.dumps(kwargs['data'], ensure_ascii=False)
+            kwargs['data'] = body.encode('utf-8')
+            if 'headers' not in kwargs:
+                kwargs['headers'] = {}
+            kwargs['headers']['Content-Type'] = 'application/json'
+
+        kwargs['timeout'] = kwargs.get('timeout', self.timeout)
+        result_processor = kwargs.pop('result_processor', None)
+        top_response_key = kwargs.pop('top_response_key', None)
+        res = await self._http.request(method=method, url=url, **kwargs)
+        try:
+            res.raise_for_status()
+        except requests.RequestException as reqe:
+            logger.error('\n【请求地址】: %s\n【请求参数】：%s \n%s\n【异常信息】：%s', url,
+                         kwargs.get('params', ''), kwargs.get('data', ''), reqe)
+            raise DingTalkClientException(errcode=None,
+                                          errmsg=None,
+                                          client=self,
+                                          request=reqe.request,
+                                          response=reqe.response)
+
+        result = self._handle_result(res, method, url, result_processor,
+                                     top_response_key, **kwargs)
+        logger.debug('\n【请求地址】: %s\n【请求参数】：%s \n%s\n【响应数据】：%s', url,
+                     kwargs.get('params', ''), kwargs.get('data', ''), result)
+        return result
+
+    async def request(self, method, uri, **kwargs):
+        if self.coalescer is None:
+            return await self._send(method, uri, **kwargs)
+        return await self.coalescer.acall(
+            method,
+            uri,
+            kwargs,
+            lambda: self._send(method, uri, **kwargs),
+            scope=self.app_key)
+
+    async def _send(self, method, uri, **kwargs):
+        state = self.retry_policy.new_state()
+        breaker = self._get_breaker(uri, kwargs)
+        slot = None
+        try:
+            while True:
+                if breaker is not None:
+                    # 熔断时在获取 token 及限流前直接失败;
+                    # 每个逻辑请求只在首次发送前占用一次半开探测名额
+                    if state.attempts:
+                        breaker.raise_if_open()
+                    else:
+                        slot = breaker.before_call()
+                request_kwargs = dict(kwargs)
+                headers = request_kwargs.get('headers') or {}
+                access_token = None if ACCESS_TOKEN_HEADER in headers \
+                    else await self.token_manager.get()
+                _method, uri_with_access_token, request_kwargs = \
+                    self._handle_pre_request(method, uri, request_kwargs,
+                                             access_token=access_token)
+                if self.rate_limiter:
+                    # 令牌桶为阻塞实现, 放到线程池中等待以免阻塞事件循环
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self.rate_limiter.acquire, uri, self.app_key)
+                try:
+                    with instrument(self.instrumentation,
+                                    'dingtalk',
+                                    method,
+                                    uri,
+                                    len(state.attempts),
+                                    get_errcode=self._get_errcode) as info:
+                        result = await self._request(
+                            _method, uri_with_access_token, **{
+                                k: v
+                                for k, v in request_kwargs.items()
+                                if k in _REQUEST_PARAM_KEYS
+                            })
+                except DingTalkClientException as e:
+                    code, result = self._get_retry_code(e)
+                    if breaker is not None:
+                        self._record_breaker(breaker, e, code, result)
+                    delay = self._get_retry_delay(state, code, result)
+                    if delay is None:
+                        raise self._get_final_exception(e)
+                    if breaker is not None:
+                        breaker.raise_if_open()
+                    if info is not None:
+                        self.instrumentation.on_retry(info, delay)
+                    await asyncio.sleep(delay)
+                except (requests.RequestException, aiohttp.ClientError,
+                        asyncio.TimeoutError):
+                    if breaker is not None:
+                        breaker.on_failure()
+                    raise
+                else:
+                    if breaker is not None:
+                        breaker.on_success()
+                    return result
+        finally:
+            # 被取消或未得出结果即中断时归还探测名额
+            if breaker is not None:
+                breaker.release(slot)
+
+    async def close(self):
+        await self._http.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -12,6 +12,14 @@ from dingtalk.client.api.user import User
 from dingtalk.client.base import BaseClient
 from dingtalk.core.utils import to_text
 
+from lesoon_third_sdk.core.checkpoint import Checkpoint
+from lesoon_third_sdk.core.concurrent import BulkResult
+from lesoon_third_sdk.core.concurrent import chunked
+from lesoon_third_sdk.core.concurrent import fan_out
+from lesoon_third_sdk.core.concurrent import fan_out_grouped
+from lesoon_third_sdk.core.pagination import Paginator
+from lesoon_third_sdk.core.ratelimit import TokenBucket
+
 
 class UserApi(User):
 
@@ -27,6 +35,9 @@ class UserApi(User):
 
 
 class EmployeermApi(Employeerm):
+    # 单次请求允许的最大员工数
+    LIST_V2_MAX_SIZE = 100
+    LIST_DIMISSION_MAX_SIZE = 50
 
     def get_roster_meta(self):
         """
@@ -71,8 +82,55 @@ class EmployeermApi(Employeerm):
         return self._post('topapi/smartwork/hrm/employee/listdimission',
                           {'userid_list': userid_list})
 
+    def list_v2_bulk(self,
+                     userid_list: t.Iterable[str],
+                     field_filter_list=(),
+                     chunk_size: int = LIST_V2_MAX_SIZE,
+                     max_workers: int = 4) -> BulkResult:
+        """
+        批量获取任意数量员工的花名册字段信息
+        按 chunk_size 切分后并发调用 list_v2, 合并各分块的 result.
+        Args:
+            userid_list: 员工id
+            field_filter_list: 需要获取的花名册字段信息
+            chunk_size: 单次请求的员工数, 不超过 LIST_V2_MAX_SIZE
+            max_workers: 最大并发数
+
+        Returns:
+            BulkResult: 合并后的结果及失败的分块
+
+        """
+        chunk_size = min(chunk_size, self.LIST_V2_MAX_SIZE)
+        return fan_out(
+            lambda chunk: self.list_v2(chunk, field_filter_list).get('result'),
+            chunked(userid_list, chunk_size),
+            max_workers=max_workers)
+
+    def listdimission_bulk(self,
+                           userid_list: t.Iterable[str],
+                           chunk_size: int = LIST_DIMISSION_MAX_SIZE,
+                           max_workers: int = 4) -> BulkResult:
+        """
+        批量获取任意数量员工的离职信息
+        按 chunk_size 切分后并发调用 listdimission, 合并各分块的 result.
+        Args:
+            userid_list: 员工id
+            chunk_size: 单次请求的员工数, 不超过 LIST_DIMISSION_MAX_SIZE
+            max_workers: 最大并发数
+
+        Returns:
+            BulkResult: 合并后的结果及失败的分块
+
+        """
+        chunk_size = min(chunk_size, self.LIST_DIMISSION_MAX_SIZE)
+        return fan_out(lambda chunk: self.listdimission(chunk).get('result'),
+                       chunked(userid_list, chunk_size),
+                       max_workers=max_workers)
+
 
 class AttendanceApi(Attendance):
+    # 考勤报表接口单次查询的最大天数
+    REPORT_MAX_DAYS = 31
 
     def get_update_data(self, userid: str,
                         work_date: t.Union[str, datetime.datetime]):
@@ -158,6 +216,117 @@ class AttendanceApi(Attendance):
                               'to_date': to_date
                           })
 
+    def split_date_range(
+        self,
+        from_date: t.Union[str, datetime.datetime],
+        to_date: t.Union[str, datetime.datetime],
+        max_days: int = None
+    ) -> t.List[t.Tuple[datetime.datetime, datetime.datetime]]:
+        """
+        按接口允许的最大跨度切分日期区间.
+        窗口按自然日对齐, 自开始日期 00:00:00 至结束日期 23:59:59, 相邻窗口首尾相接.
+        Args:
+            from_date: 开始日期
+            to_date: 结束日期
+            max_days: 单个窗口的最大天数, 默认为 REPORT_MAX_DAYS
+
+        """
+        max_days = max_days or self.REPORT_MAX_DAYS
+        if isinstance(from_date, str):
+            from_date = datetime.datetime.strptime(from_date,
+                                                   self.DATE_TIME_FORMAT)
+        if isinstance(to_date, str):
+            to_date = datetime.datetime.strptime(to_date, self.DATE_TIME_FORMAT)
+        start = datetime.datetime.combine(from_date.date(), datetime.time.min)
+        last = datetime.datetime.combine(to_date.date(),
+                                         datetime.time(23, 59, 59))
+        windows = []
+        while start <= last:
+            end = min(start + datetime.timedelta(days=max_days, seconds=-1),
+                      last)
+            windows.append((start, end))
+            start = end + datetime.timedelta(seconds=1)
+        return windows
+
+    def get_column_val_bulk(
+            self,
+            userids: t.Iterable[str],
+            column_id_list: t.List[str],
+            from_date: t.Union[str, datetime.datetime],
+            to_date: t.Union[str, datetime.datetime],
+            max_workers: int = 4,
+            qps: float = None,
+            checkpoint: Checkpoint = None
+    ) -> t.Iterator[t.Tuple[str, BulkResult]]:
+        """
+        批量获取多个用户在任意日期区间内的考勤报表列值
+        日期区间按 REPORT_MAX_DAYS 切分, (用户, 窗口) 在有界线程池中并发请求.
+        Args:
+            userids: 钉钉用户ID
+            column_id_list: 报表列ID
+            from_date: 开始日期
+            to_date: 结束日期
+            max_workers: 最大并发数
+            qps: 每秒最大请求数, 为空时仅受客户端限流约束
+            checkpoint: 断点记录, 已完成的用户将被跳过
+
+        Returns:
+            按完成顺序产出 (userid, BulkResult), result 为各窗口的 result
+
+        """
+        return self._bulk_by_user(
+            lambda userid, start, end: self.get_column_val(
+                userid, column_id_list, start, end), userids, from_date,
+            to_date, max_workers, qps, checkpoint)
+
+    def get_leave_time_by_names_bulk(
+            self,
+            userids: t.Iterable[str],
+            leave_names: t.List[str],
+            from_date: t.Union[str, datetime.datetime],
+            to_date: t.Union[str, datetime.datetime],
+            max_workers: int = 4,
+            qps: float = None,
+            checkpoint: Checkpoint = None
+    ) -> t.Iterator[t.Tuple[str, BulkResult]]:
+        """
+        批量获取多个用户在任意日期区间内的假期数据
+        参数及返回值同 get_column_val_bulk.
+
+        """
+        return self._bulk_by_user(
+            lambda userid, start, end: self.get_leave_time_by_names(
+                userid, leave_names, start, end), userids, from_date, to_date,
+            max_workers, qps, checkpoint)
+
+    def _bulk_by_user(self, func, userids, from_date, to_date, max_workers, qps,
+                      checkpoint):
+        windows = self.split_date_range(from_date, to_date)
+        bucket = TokenBucket(qps) if qps else None
+
+        def fetch(task):
+            userid, (start, end) = task
+            if bucket is not None:
+                bucket.acquire()
+            return func(userid, start, end).get('result')
+
+        # 去重, 同一用户只请求一次
+        groups = ((userid, [(userid, window)
+                            for window in windows])
+                  for userid in dict.fromkeys(userids)
+                  if checkpoint is None or userid not in checkpoint)
+        try:
+            for userid, bulk in fan_out_grouped(fetch,
+                                                groups,
+                                                max_workers=max_workers):
+                yield userid, bulk
+                # 调用方处理完毕后才记录断点, 失败的用户在恢复时重试
+                if checkpoint is not None and bulk.success:
+                    checkpoint.add(userid)
+        finally:
+            if checkpoint is not None:
+                checkpoint.flush()
+
 
 class SnsApi(DingTalkBaseAPI):
 
@@ -192,8 +361,13 @@ class SnsApi(DingTalkBaseAPI):
         )
 
 
-class YiDaApi(DingTalkBaseAPI):
+class BaseYiDaApi(DingTalkBaseAPI):
+    """
+    宜搭接口, 逐条遍历由 YiDaApi 与 AsyncYiDaApi 分别实现.
+    """
     DATE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+    # 表单实例查询允许的最大每页条数
+    MAX_PAGE_SIZE = 100
 
     def search_form_datas(
             self,
@@ -251,6 +425,56 @@ class YiDaApi(DingTalkBaseAPI):
             data['modifiedToTimeGMT'] = modified_to_time_gmt
         return self._post('/v1.0/yida/forms/instances/search', data=data)
 
+    @staticmethod
+    def _check_page_kwargs(kwargs: t.Mapping[str, t.Any]):
+        # 分页参数由迭代器控制
+        keys = {'current_page', 'page_size'} & kwargs.keys()
+        if keys:
+            raise TypeError(
+                f'iter_form_datas 不接受分页参数: {", ".join(sorted(keys))}')
+
+
+class YiDaApi(BaseYiDaApi):
+
+    def iter_form_datas(self,
+                        app_type: str,
+                        system_token: str,
+                        user_id: str,
+                        form_uuid: str,
+                        start_page: int = 1,
+                        after_instance_id: str = None,
+                        prefetch: bool = True,
+                        **kwargs) -> t.Iterator[t.Any]:
+        """
+        逐条遍历宜搭表单实例, 按最大页大小惰性翻页, 读取到 totalCount 条后停止.
+        中断后可通过 (start_page, after_instance_id) 游标继续导出.
+        Args:
+            app_type: 应用ID
+            system_token: 应用秘钥
+            user_id: 用户的userid
+            form_uuid: 表单ID
+            start_page: 起始页号
+            after_instance_id: 上次处理到的表单实例ID, 跳过该实例及其之前的数据
+            prefetch: 是否在消费当前页时预取下一页
+            **kwargs: 其余查询条件, 同 search_form_datas, 不含分页参数
+
+        """
+        self._check_page_kwargs(kwargs)
+        paginator = Paginator(
+            lambda page: self.search_form_datas(app_type,
+                                                system_token,
+                                                user_id,
+                                                form_uuid,
+                                                current_page=page,
+                                                page_size=self.MAX_PAGE_SIZE,
+                                                **kwargs),
+            page_size=self.MAX_PAGE_SIZE,
+            get_items=lambda result: result.get('data') or [],
+            get_total=lambda result: result.get('totalCount'),
+            start_page=start_page,
+            prefetch=prefetch)
+        return paginator.items(after=after_instance_id, key='formInstanceId')
+
 
 class OAuth2(DingTalkBaseAPI):
 
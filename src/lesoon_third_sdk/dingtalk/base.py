@@ -4,7 +4,7 @@ import struct
 import time
 import typing as t
 
-from cryptography.hazmat.primitives import padding
+import requests
 from cryptography.hazmat.primitives.ciphers import algorithms
 from cryptography.hazmat.primitives.ciphers import Cipher
 from cryptography.hazmat.primitives.ciphers import modes
@@ -14,9 +14,20 @@ from lesoon_common import current_app
 from lesoon_common.exceptions import ConfigError
 from lesoon_common.utils.base import random_alpha_numeric
 
+from lesoon_third_sdk.core.breaker import CircuitBreakerGroup
+from lesoon_third_sdk.core.cache import ResponseCache
+from lesoon_third_sdk.core.coalesce import RequestCoalescer
+from lesoon_third_sdk.core.instrument import Instrumentation
+from lesoon_third_sdk.core.ratelimit import RateLimiter
+from lesoon_third_sdk.core.registry import ClientRegistry
+from lesoon_third_sdk.core.registry import RegistryMixin
+from lesoon_third_sdk.dingtalk.callback import CallbackPipeline
 from lesoon_third_sdk.dingtalk.client import AppKeyClient
 from lesoon_third_sdk.dingtalk.client import NewAppKeyClient
 
+# 回调消息, 依次为 msg_signature, timestamp, nonce, ciphertext
+CallbackMessage = t.Tuple[str, str, str, str]
+
 
 class DingtalkCallbackCrypto:
 
@@ -24,6 +35,10 @@ class DingtalkCallbackCrypto:
         self.app_key = app_key
         self.token = token
         self.aes_key = base64.b64decode(aes_key + '=')
+        # 密钥与 IV 固定, Cipher 可复用, 每条消息只需新建加/解密上下文
+        self._cipher = Cipher(algorithm=algorithms.AES(self.aes_key),
+                              mode=modes.CBC(self.aes_key[:16]))
+        self._app_key_bytes = app_key.encode()
 
     def generate_signature(self, nonce: str, timestamp: str, ciphertext: str):
         """
@@ -41,6 +56,25 @@ class DingtalkCallbackCrypto:
         sign_list = ''.join(sorted([nonce, timestamp, self.token, ciphertext]))
         return hashlib.sha1(sign_list.encode()).hexdigest()
 
+    def verify(self, msg_signature: str, timestamp: str, nonce: str,
+               ciphertext: str) -> bool:
+        """
+        校验钉钉消息签名
+
+        """
+        return self.generate_signature(nonce, timestamp,
+                                       ciphertext) == msg_signature
+
+    def verify_many(self,
+                    messages: t.Iterable[CallbackMessage]) -> t.List[bool]:
+        """
+        批量校验钉钉消息签名
+        Args:
+            messages: (msg_signature, timestamp, nonce, ciphertext) 列表
+
+        """
+        return [self.verify(*message) for message in messages]
+
     def decrypt(self, msg_signature: str, timestamp: str, nonce: str,
                 ciphertext: str):
         """
@@ -54,25 +88,54 @@ class DingtalkCallbackCrypto:
         Returns:
             msg: 解密数据
         """
-        sign = self.generate_signature(nonce, timestamp, ciphertext)
-        if sign != msg_signature:
+        if not self.verify(msg_signature, timestamp, nonce, ciphertext):
             raise ValueError('钉钉事件回调签名验证失败')
-        ciphertext = base64.b64decode(ciphertext)
-        cipher = Cipher(algorithm=algorithms.AES(self.aes_key),
-                        mode=modes.CBC(self.aes_key[:16]))
-
-        decryptor = cipher.decryptor()
-        decrypted_input = decryptor.update(ciphertext) + decryptor.finalize()
-        pad = int(decrypted_input[-1])
-        if pad > 32:
+        return self._decrypt(ciphertext)
+
+    def decrypt_many(self,
+                     messages: t.Iterable[CallbackMessage],
+                     skip_invalid: bool = False) -> t.List[t.Optional[str]]:
+        """
+        批量解密钉钉消息
+        Args:
+            messages: (msg_signature, timestamp, nonce, ciphertext) 列表
+            skip_invalid: 为 True 时校验或解密失败的消息返回 None, 否则抛出异常
+
+        Returns:
+            与 messages 顺序一致的解密数据
+
+        """
+        results: t.List[t.Optional[str]] = []
+        for message in messages:
+            try:
+                results.append(self.decrypt(*message))
+            except ValueError:
+                if not skip_invalid:
+                    raise
+                results.append(None)
+        return results
+
+    def _decrypt(self, ciphertext: str) -> str:
+        decryptor = self._cipher.decryptor()
+        decrypted = memoryview(
+            decryptor.update(base64.b64decode(ciphertext)) +
+            decryptor.finalize())
+        # 钉钉按 32 字节块做 PKCS7 填充, 本地 encrypt 按 16 字节填充, 均不超过 32
+        pad = decrypted[-1] if decrypted else 0
+        if not 1 <= pad <= 32:
             raise ValueError('Input is not padded or padding is corrupt')
-        decrypted_input = decrypted_input[:-pad]
-        msg_len = struct.unpack('!i', decrypted_input[16:20])[0]
+        decrypted = decrypted[:-pad]
+        try:
+            msg_len = struct.unpack_from('!i', decrypted, 16)[0]
+        except struct.error as e:
+            raise ValueError('钉钉消息长度不足') from e
+        if not 0 <= msg_len <= len(decrypted) - 20:
+            raise ValueError('钉钉消息长度不匹配')
 
-        if decrypted_input[(20 + msg_len):].decode() != self.app_key:
+        if decrypted[(20 + msg_len):] != self._app_key_bytes:
             raise ValueError('钉钉应用密钥不匹配!')
 
-        return decrypted_input[20:(20 + msg_len)].decode()
+        return bytes(decrypted[20:(20 + msg_len)]).decode()
 
     def encrypt(self, msg: str):
         """
@@ -82,17 +145,16 @@ class DingtalkCallbackCrypto:
             msg: 返回结果
 
         """
-        msg_len = struct.pack('!l', len(msg))
-        content = ''.join(
-            (random_alpha_numeric(16), msg, self.app_key)).encode()
-        content = content[:16] + msg_len + content[16:]
-        cipher = Cipher(algorithm=algorithms.AES(self.aes_key),
-                        mode=modes.CBC(self.aes_key[:16]))
-        padder = padding.PKCS7(algorithms.AES.block_size).padder()
-        padded_input = padder.update(content) + padder.finalize()
+        msg_bytes = msg.encode()
+        content = b''.join(
+            (random_alpha_numeric(16).encode(),
+             struct.pack('!l', len(msg_bytes)), msg_bytes, self._app_key_bytes))
+        # PKCS7 填充至 AES 块大小
+        pad = 16 - len(content) % 16
+        content += bytes((pad,)) * pad
 
-        encryptor = cipher.encryptor()
-        encrypted_input = encryptor.update(padded_input) + encryptor.finalize()
+        encryptor = self._cipher.encryptor()
+        encrypted_input = encryptor.update(content) + encryptor.finalize()
         return base64.encodebytes(encrypted_input).decode()
 
     def generate_response(self, msg: str):
@@ -110,7 +172,9 @@ class DingtalkCallbackCrypto:
         }
 
 
-class DingTalk:
+class DingTalk(RegistryMixin):
+    CLIENT_KINDS = ('client', 'new_client')
+
     # 此属性不作使用，只作展示使用
     _CONFIG = {
         'CORP_ID': '',
@@ -128,38 +192,77 @@ class DingTalk:
     def __init__(self,
                  app: Flask = None,
                  config: dict = None,
-                 storage: BaseStorage = None):
+                 storage: BaseStorage = None,
+                 rate_limiter: RateLimiter = None,
+                 registry: ClientRegistry = None,
+                 response_cache: ResponseCache = None,
+                 instrumentation: Instrumentation = None,
+                 circuit_breaker: CircuitBreakerGroup = None,
+                 coalescer: RequestCoalescer = None):
         self.config: t.Dict[str, t.Any] = config or {}
         self.storage = storage
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.registry = registry
+        self.instrumentation = instrumentation
+        self.circuit_breaker = circuit_breaker
+        self.coalescer = coalescer
         if app:
             self.init_app(app)
         if not self.config:
             raise ConfigError('缺乏启动配置')
 
     def init_app(self, app: Flask):
+        self.close_clients()
         self.config = app.config.get('DINGTALK', {})
 
+    def _client_key(self, kind: str) -> t.Tuple[t.Any, ...]:
+        return ('dingtalk', kind, self.config['CORP_ID'],
+                self.config['APP_KEY'], self.config['AGENT_ID'])
+
+    def _new_http(self) -> t.Optional[requests.Session]:
+        """
+        注册表持有的客户端使用独占的 Session, 移除时随客户端关闭;
+        未配置 registry 时沿用类级别共享的 Session 以复用长连接.
+
+        """
+        return requests.Session() if self.registry is not None else None
+
     @property
     def extra_config(self):
         return self.config['EXTRA']
 
     def create_client(self) -> AppKeyClient:
-        return AppKeyClient(
-            corp_id=self.config['CORP_ID'],
-            app_key=self.config['APP_KEY'],
-            app_secret=self.config['APP_SECRET'],
-            agent_id=self.config['AGENT_ID'],
-            storage=self.storage,
-        )
+        return self._get_client(
+            'client', lambda: AppKeyClient(
+                corp_id=self.config['CORP_ID'],
+                app_key=self.config['APP_KEY'],
+                app_secret=self.config['APP_SECRET'],
+                agent_id=self.config['AGENT_ID'],
+                storage=self.storage,
+                rate_limiter=self.rate_limiter,
+                instrumentation=self.instrumentation,
+                response_cache=self.response_cache,
+                circuit_breaker=self.circuit_breaker,
+                coalescer=self.coalescer,
+                http=self._new_http(),
+            ))
 
     def create_new_client(self) -> NewAppKeyClient:
-        return NewAppKeyClient(
-            corp_id=self.config['CORP_ID'],
-            app_key=self.config['APP_KEY'],
-            app_secret=self.config['APP_SECRET'],
-            agent_id=self.config['AGENT_ID'],
-            storage=self.storage,
-        )
+        return self._get_client(
+            'new_client', lambda: NewAppKeyClient(
+                corp_id=self.config['CORP_ID'],
+                app_key=self.config['APP_KEY'],
+                app_secret=self.config['APP_SECRET'],
+                agent_id=self.config['AGENT_ID'],
+                storage=self.storage,
+                rate_limiter=self.rate_limiter,
+                instrumentation=self.instrumentation,
+                response_cache=self.response_cache,
+                circuit_breaker=self.circuit_breaker,
+                coalescer=self.coalescer,
+                http=self._new_http(),
+            ))
 
     def create_callback_crypto(self) -> DingtalkCallbackCrypto:
         app_key = self.config['APP_KEY']
@@ -171,3 +274,10 @@ class DingTalk:
         return DingtalkCallbackCrypto(app_key=app_key,
                                       token=token,
                                       aes_key=aes_key)
+
+    def create_callback_pipeline(self, **kwargs) -> CallbackPipeline:
+        """
+        创建钉钉事件回调处理管道, 参数同 CallbackPipeline.
+
+        """
+        return CallbackPipeline(self.create_callback_crypto(), **kwargs)
@@ -0,0 +1,57 @@
+import typing as t
+
+from lesoon_third_sdk.core.cache import LRUCache
+from lesoon_third_sdk.core.cache import ResponseCache
+from lesoon_third_sdk.core.cache import StorageCache
+from lesoon_third_sdk.core.coalesce import RequestCoalescer
+
+# 变化较少的元数据接口默认缓存秒数
+METADATA_TTLS = {
+    # 花名册字段
+    '/topapi/smartwork/hrm/roster/meta/get': 3600,
+    # 考勤报表列
+    '/topapi/attendance/getattcolumns': 3600,
+    # 假期类型
+    '/topapi/attendance/vacation/type/list': 3600,
+    # 手机号 -> userid
+    '/topapi/v2/user/getbymobile': 600,
+}
+
+# 登录高峰时常被并发重复调用的用户查询接口
+COALESCE_ENDPOINTS = (
+    # 手机号 -> userid
+    '/topapi/v2/user/getbymobile',
+    # 个人通讯录信息
+    '/v1.0/contact/users/*',
+    # sns 临时授权码 -> 用户信息
+    '/sns/getuserinfo_bycode',
+)
+
+
+def create_response_cache(storage=None,
+                          ttls: dict = None,
+                          maxsize: int = 1024) -> ResponseCache:
+    """
+    创建钉钉元数据接口的响应缓存.
+    Args:
+        storage: BaseStorage, 为空时使用进程内 LRU 缓存
+        ttls: 接口路径通配 -> 缓存秒数, 默认为 METADATA_TTLS
+        maxsize: 进程内缓存的最大条目数
+
+    """
+    backend: t.Union[LRUCache, StorageCache] = \
+        StorageCache(storage, prefix='dingtalk:response') \
+        if storage is not None else LRUCache(maxsize)
+    return ResponseCache(METADATA_TTLS if ttls is None else ttls, backend)
+
+
+def create_request_coalescer(
+        endpoints: t.Iterable[str] = None) -> RequestCoalescer:
+    """
+    创建钉钉用户查询接口的并发请求合并器.
+    Args:
+        endpoints: 接口路径通配, 默认为 COALESCE_ENDPOINTS
+
+    """
+    return RequestCoalescer(
+        COALESCE_ENDPOINTS if endpoints is None else endpoints)
@@ -0,0 +1,251 @@
+import collections
+import hashlib
+import json
+import logging
+import queue
+import threading
+import time
+import typing as t
+
+logger = logging.getLogger(__name__)
+
+EventHandler = t.Callable[[t.Dict[str, t.Any]], t.Any]
+
+# 钉钉校验回调地址时推送的事件, 无需业务处理
+CHECK_URL_EVENT = 'check_url'
+# 未注册事件类型时使用的处理函数
+DEFAULT_HANDLER = '*'
+
+_COUNTERS = ('received', 'enqueued', 'duplicated', 'rejected', 'processed',
+             'failed', 'unhandled')
+
+
+class CallbackQueueFull(Exception):
+    """事件队列已满, 调用方应返回错误以便钉钉稍后重推."""
+
+
+def default_event_id(event: t.Dict[str, t.Any], plaintext: str) -> str:
+    """
+    事件去重标识, 优先使用事件自带的 id, 否则使用明文摘要(钉钉重推时明文不变).
+
+    """
+    for key in ('EventId', 'eventId', 'bizId'):
+        if event.get(key):
+            return str(event[key])
+    return hashlib.sha1(plaintext.encode()).hexdigest()
+
+
+class CallbackPipeline:
+    """
+    钉钉事件回调处理管道.
+    handle 在请求线程中仅做验签、解密、去重及入队, 随即返回加密的 success 应答;
+    业务处理由后台工作线程按事件类型分发执行, 未调用 start 时在首次入队前自动启动.
+    """
+
+    def __init__(self,
+                 crypto,
+                 workers: int = 4,
+                 maxsize: int = 1000,
+                 put_timeout: float = 0,
+                 dedup_window: float = 300,
+                 get_event_id: t.Callable[[t.Dict[str, t.Any], str],
+                                          str] = default_event_id,
+                 clock: t.Callable[[], float] = time.monotonic):
+        """
+        Args:
+            crypto: DingtalkCallbackCrypto
+            workers: 工作线程数
+            maxsize: 队列容量
+            put_timeout: 队列满时的最长等待秒数, 超时抛出 CallbackQueueFull
+            dedup_window: 去重时间窗口(秒), 0 为不去重
+            get_event_id: 生成事件去重标识
+            clock: 单调时钟
+
+        """
+        self.crypto = crypto
+        self.workers = workers
+        self.put_timeout = put_timeout
+        self.dedup_window = dedup_window
+        self.get_event_id = get_event_id
+        self.clock = clock
+        self.handlers: t.Dict[str, EventHandler] = {}
+        self._queue: 'queue.Queue[t.Optional[t.Tuple[str, dict, float]]]' = \
+            queue.Queue(maxsize)
+        self._seen: 't.OrderedDict[str, float]' = collections.OrderedDict()
+        self._seen_lock = threading.Lock()
+        self._threads: t.List[threading.Thread] = []
+        self._threads_lock = threading.Lock()
+        self._counters: t.Counter[str] = collections.Counter()
+        self._counters_lock = threading.Lock()
+        self._max_queue_size = 0
+        self._max_wait = 0.0
+
+    def register(self, event_type: str, handler: EventHandler):
+        self.handlers[event_type] = handler
+
+    def on(self, event_type: str = DEFAULT_HANDLER):
+        """
+        注册事件处理函数的装饰器.
+        Args:
+            event_type: 事件类型(EventType), 默认处理未注册类型的事件
+
+        """
+
+        def decorator(handler: EventHandler):
+            self.register(event_type, handler)
+            return handler
+
+        return decorator
+
+    def _incr(self, name: str, value: int = 1):
+        with self._counters_lock:
+            self._counters[name] += value
+
+    def _is_duplicate(self, event_id: str) -> bool:
+        if not self.dedup_window:
+            return False
+        now = self.clock()
+        with self._seen_lock:
+            while self._seen:
+                oldest_id, expires_at = next(iter(self._seen.items()))
+                if expires_at > now:
+                    break
+                self._seen.pop(oldest_id)
+            if event_id in self._seen:
+                return True
+            self._seen[event_id] = now + self.dedup_window
+            return False
+
+    def handle(self, msg_signature: str, timestamp: str, nonce: str,
+               encrypt: str) -> t.Dict[str, str]:
+        """
+        接收一次钉钉回调.
+        Args:
+            msg_signature: 消息签名
+            timestamp: 时间戳
+            nonce: 随机字符串
+            encrypt: 加密消息
+
+        Returns:
+            返回给钉钉的加密应答
+
+        Raises:
+            ValueError: 验签或解密失败
+            CallbackQueueFull: 队列已满
+
+        """
+        plaintext = self.crypto.decrypt(msg_signature, timestamp, nonce,
+                                        encrypt)
+        self._incr('received')
+        event = json.loads(plaintext)
+        event_type = event.get('EventType', '')
+        if event_type != CHECK_URL_EVENT:
+            event_id = self.get_event_id(event, plaintext)
+            if self._is_duplicate(event_id):
+                self._incr('duplicated')
+            else:
+                try:
+                    self._enqueue(event_type, event)
+                except CallbackQueueFull:
+                    # 未入队的事件需允许钉钉重推
+                    with self._seen_lock:
+                        self._seen.pop(event_id, None)
+                    raise
+        return self.crypto.generate_response('success')
+
+    def _enqueue(self, event_type: str, event: t.Dict[str, t.Any]):
+        if not self._threads:
+            self.start()
+        try:
+            self._queue.put((event_type, event, self.clock()),
+                            block=self.put_timeout > 0,
+                            timeout=self.put_timeout or None)
+        except queue.Full:
+            self._incr('rejected')
+            raise CallbackQueueFull('钉钉事件队列已满') from None
+        queue_size = self._queue.qsize()
+        with self._counters_lock:
+            self._counters['enqueued'] += 1
+            self._max_queue_size = max(self._max_queue_size, queue_size)
+
+    def _dispatch(self, event_type: str, event: t.Dict[str, t.Any]):
+        handler = self.handlers.get(event_type,
+                                    self.handlers.get(DEFAULT_HANDLER))
+        if handler is None:
+            logger.warning('未注册钉钉事件处理函数: %s', event_type)
+            self._incr('unhandled')
+            return
+        try:
+            handler(event)
+        except Exception:
+            logger.exception('钉钉事件处理失败: %s', event_type)
+            self._incr('failed')
+        else:
+            self._incr('processed')
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                event_type, event, enqueued_at = item
+                wait = self.clock() - enqueued_at
+                with self._counters_lock:
+                    self._max_wait = max(self._max_wait, wait)
+                self._dispatch(event_type, event)
+            finally:
+                self._queue.task_done()
+
+    def start(self):
+        """
+        启动工作线程.
+
+        """
+        with self._threads_lock:
+            if self._threads:
+                return
+            threads = [
+                threading.Thread(target=self._work,
+                                 name=f'dingtalk-callback-{i}',
+                                 daemon=True) for i in range(self.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            self._threads = threads
+
+    def stop(self, timeout: float = None):
+        """
+        处理完已入队的事件后停止工作线程.
+
+        """
+        with self._threads_lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def join(self):
+        """
+        等待已入队的事件处理完毕.
+
+        """
+        self._queue.join()
+
+    def metrics(self) -> t.Dict[str, t.Any]:
+        """
+        背压及处理指标.
+
+        """
+        with self._counters_lock:
+            counters = dict(self._counters)
+            max_queue_size, max_wait = self._max_queue_size, self._max_wait
+        return {
+            'queue_size': self._queue.qsize(),
+            'queue_maxsize': self._queue.maxsize,
+            'queue_high_watermark': max_queue_size,
+            'max_wait_seconds': max_wait,
+            'workers': len(self._threads),
+            **{name: counters.get(name, 0) for name in _COUNTERS},
+        }
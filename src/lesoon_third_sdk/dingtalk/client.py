@@ -1,95 +1,305 @@
 import inspect
 import logging
-import random
-import time
+import typing as t
 
+import requests
 from dingtalk.client import AppKeyClient as _Client
 from dingtalk.core.exceptions import DingTalkClientException
 
+from lesoon_third_sdk.core.breaker import CircuitBreaker
+from lesoon_third_sdk.core.breaker import CircuitBreakerGroup
+from lesoon_third_sdk.core.cache import ResponseCache
+from lesoon_third_sdk.core.coalesce import RequestCoalescer
+from lesoon_third_sdk.core.instrument import instrument
+from lesoon_third_sdk.core.instrument import Instrumentation
+from lesoon_third_sdk.core.instrument import record_response
+from lesoon_third_sdk.core.ratelimit import RateLimiter
+from lesoon_third_sdk.core.transport import AsyncHttpTransport
 from lesoon_third_sdk.dingtalk.api import AttendanceApi
 from lesoon_third_sdk.dingtalk.api import EmployeermApi
 from lesoon_third_sdk.dingtalk.api import OAuth2
 from lesoon_third_sdk.dingtalk.api import SnsApi
 from lesoon_third_sdk.dingtalk.api import UserApi
 from lesoon_third_sdk.dingtalk.api import YiDaApi
+from lesoon_third_sdk.dingtalk.retry import NEW_API_CLASSIFIER
+from lesoon_third_sdk.dingtalk.retry import OAPI_CLASSIFIER
+from lesoon_third_sdk.dingtalk.retry import RetryPolicy
+from lesoon_third_sdk.dingtalk.retry import RetryState
+from lesoon_third_sdk.dingtalk.token import TokenManager
 
 logger = logging.getLogger(__name__)
 
+# 由 _request 自身消费, 不会透传给 http.request 的参数
+_SUPER_PARAM_KEYS = frozenset(
+    {'api_base_url', 'result_processor', 'top_response_key'})
+# 新版接口携带 token 的请求头
+ACCESS_TOKEN_HEADER = 'x-acs-dingtalk-access-token'
+# http 后端类 -> 允许透传的请求参数
+_REQUEST_PARAM_KEYS: t.Dict[type, t.FrozenSet[str]] = {}
+
+
+def get_request_param_keys(http) -> t.FrozenSet[str]:
+    """
+    获取 http 后端允许的请求参数.
+    http.request 的函数签名按后端类只解析一次并缓存.
+    Args:
+        http: http 后端实例, 如 requests.Session
+
+    """
+    http_cls = type(http)
+    keys = _REQUEST_PARAM_KEYS.get(http_cls)
+    if keys is None:
+        keys = frozenset(inspect.signature(
+            http.request).parameters) | _SUPER_PARAM_KEYS
+        _REQUEST_PARAM_KEYS[http_cls] = keys
+    return keys
+
+
+def filter_request_kwargs(http, kwargs: dict) -> dict:
+    """
+    过滤掉 http 后端及 _request 均不接受的参数.
+    Args:
+        http: http 后端实例
+        kwargs: 请求参数
+
+    """
+    keys = get_request_param_keys(http)
+    if kwargs.keys() <= keys:
+        return kwargs
+    return {k: v for k, v in kwargs.items() if k in keys}
+
 
 class AppKeyClient(_Client):
+    # 默认沿用基类共享的 Session, 异步客户端替换为 AsyncHttpTransport
+    _http: t.Union[requests.Session, AsyncHttpTransport]
+    RETRY_CLASSIFIER = OAPI_CLASSIFIER
+
     sns = SnsApi()
     user = UserApi()
     employeerm = EmployeermApi()
     attendance = AttendanceApi()
 
-    def __init__(self, *args, agent_id: int, retry_times: int = 3, **kwargs):
+    def __init__(self,
+                 *args,
+                 agent_id: int,
+                 retry_times: int = 3,
+                 retry_policy: RetryPolicy = None,
+                 rate_limiter: RateLimiter = None,
+                 token_refresh_ahead: int = 0,
+                 token_storage_lock: bool = False,
+                 response_cache: ResponseCache = None,
+                 instrumentation: Instrumentation = None,
+                 circuit_breaker: CircuitBreakerGroup = None,
+                 coalescer: RequestCoalescer = None,
+                 http: requests.Session = None,
+                 **kwargs):
         super().__init__(*args, **kwargs)
+        if http is not None:
+            # 默认使用基类中类级别共享的 Session; 传入时实例独占, 可通过 ClientRegistry 关闭
+            self._http = http
         self.agent_id = agent_id
         self.retry_times = retry_times
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.instrumentation = instrumentation
+        self.circuit_breaker = circuit_breaker
+        self.coalescer = coalescer
+        self.token_manager = self._new_token_manager(token_refresh_ahead,
+                                                     token_storage_lock)
+        retry_policy = retry_policy or RetryPolicy(max_retries=retry_times)
+        if retry_policy.classifier is None:
+            retry_policy = retry_policy.copy(classifier=self.RETRY_CLASSIFIER)
+        self.retry_policy = retry_policy
+
+    def _new_token_manager(self, refresh_ahead, storage_lock):
+        return TokenManager(self,
+                            refresh_ahead=refresh_ahead,
+                            storage_lock=storage_lock)
+
+    @property
+    def access_token(self):
+        return self.token_manager.get()
 
     def request(self, method, uri, **kwargs):
-        method, uri_with_access_token, kwargs = self._handle_pre_request(
-            method, uri, kwargs)
+        if 'retry_times' in kwargs:
+            raise TypeError('不再支持按请求传入 retry_times, 请通过 retry_policy 配置重试')
+        if self.coalescer is None:
+            return self._cached_send(method, uri, **kwargs)
+        return self.coalescer.call(
+            method,
+            uri,
+            kwargs,
+            lambda: self._cached_send(method, uri, **kwargs),
+            scope=self.app_key)
+
+    def _cached_send(self, method, uri, **kwargs):
+        if self.response_cache is None:
+            return self._send(method, uri, **kwargs)
+        return self.response_cache.get_or_call(
+            method,
+            uri,
+            kwargs,
+            lambda: self._send(method, uri, **kwargs),
+            scope=self.app_key)
+
+    def _get_breaker(self, uri, kwargs) -> t.Optional[CircuitBreaker]:
+        if self.circuit_breaker is None:
+            return None
+        return self.circuit_breaker.get(
+            kwargs.get('api_base_url', self.API_BASE_URL), uri)
+
+    def _send(self, method, uri, **kwargs):
+        state = self.retry_policy.new_state()
+        breaker = self._get_breaker(uri, kwargs)
+        slot = None
         try:
-            # http.request函数签名所定义的参数
-            allow_request_param_key = set(
-                inspect.signature(self._http.request).parameters.keys())
-            super_param_key = {
-                'api_base_url', 'result_processor', 'top_response_key'
-            }
-            return self._request(
-                method, uri_with_access_token, **{
-                    k: v
-                    for k, v in kwargs.items()
-                    if k in allow_request_param_key | super_param_key
-                })
-        except DingTalkClientException as e:
-            return self._handle_request_except(e, self.request, method, uri,
-                                               **kwargs)
+            while True:
+                if breaker is not None:
+                    # 熔断时在获取 token 及限流前直接失败;
+                    # 每个逻辑请求只在首次发送前占用一次半开探测名额
+                    if state.attempts:
+                        breaker.raise_if_open()
+                    else:
+                        slot = breaker.before_call()
+                _method, uri_with_access_token, request_kwargs = \
+                    self._handle_pre_request(method, uri, dict(kwargs))
+                if self.rate_limiter:
+                    self.rate_limiter.acquire(uri, self.app_key)
+                try:
+                    with instrument(self.instrumentation,
+                                    'dingtalk',
+                                    method,
+                                    uri,
+                                    len(state.attempts),
+                                    get_errcode=self._get_errcode) as info:
+                        result = self._request(
+                            _method, uri_with_access_token,
+                            **filter_request_kwargs(self._http, request_kwargs))
+                except DingTalkClientException as e:
+                    code, result = self._get_retry_code(e)
+                    if breaker is not None:
+                        self._record_breaker(breaker, e, code, result)
+                    delay = self._get_retry_delay(state, code, result)
+                    if delay is None:
+                        # token 过期时基类会重新发起请求, 直接调用 _send 而不经过请求合并,
+                        # 否则会等待自身尚未完成的合并请求而死锁
+                        return self._handle_request_except(
+                            e, self._send, method, uri, **kwargs)
+                    if breaker is not None:
+                        # 已熔断时不再等待重试
+                        breaker.raise_if_open()
+                    if info is not None:
+                        self.instrumentation.on_retry(info, delay)
+                    self.retry_policy.sleep(delay)
+                except requests.RequestException:
+                    if breaker is not None:
+                        breaker.on_failure()
+                    raise
+                else:
+                    if breaker is not None:
+                        breaker.on_success()
+                    return result
+        finally:
+            # 未得出结果即中断(如限流超时、获取 token 失败)时归还探测名额
+            if breaker is not None:
+                breaker.release(slot)
 
-    def _handle_request_except(self, e, func, *args, **kwargs):
-        if self.auto_retry:
-            res = self._decode_result(e.response)
-            if e.errcode in (
-                    15,  # 钉钉远程调用异常
-            ) or (e.errcode == 88  # 鉴权异常
-                  and
-                  (res.sub_code in ('90001', '90002', '90003', '90004', '90005',
-                                    '90006') or '钉钉鉴权服务异常' in res.sub_msg)):
-                if 'retry_times' not in kwargs:
-                    kwargs['retry_times'] = self.retry_times
-                if kwargs['retry_times']:
-                    kwargs['retry_times'] -= 1
-                    time.sleep(random.randint(10, 20))
-                    return func(*args, **kwargs)
-        super()._handle_request_except(e, func, *args, **kwargs)
+    def _record_breaker(self, breaker: CircuitBreaker,
+                        e: DingTalkClientException, code, result):
+        """
+        服务端异常(5xx、连接失败)及可重试的错误码(如鉴权服务异常、requestTooFast)计为失败,
+        其余业务错误说明服务可用, 计为成功.
+
+        """
+        status_code = getattr(e.response, 'status_code', None)
+        classifier = self.retry_policy.classifier
+        if (status_code is None or status_code >= 500 or
+            (classifier is not None and classifier(code, result))):
+            breaker.on_failure()
+        else:
+            breaker.on_success()
+
+    def _decode_result(self, res):
+        record_response(res)
+        return super()._decode_result(res)
+
+    def _decode_error(self, e: DingTalkClientException):
+        """
+        解码异常中的响应, 结果保存在异常上, 每次失败只解码一次.
+
+        """
+        if not hasattr(e, 'decoded_result'):
+            e.decoded_result = self._decode_result(
+                e.response) if e.response is not None else None
+        return e.decoded_result
+
+    def _get_retry_code(self, e: DingTalkClientException):
+        """
+        获取用于判断重试的错误码及解码后的响应.
+
+        """
+        return e.errcode, self._decode_error(e)
+
+    def _get_errcode(self, e: Exception):
+        """
+        埋点记录的错误码, 与判断重试的错误码一致.
+
+        """
+        if isinstance(e, DingTalkClientException):
+            return self._get_retry_code(e)[0]
+        return getattr(e, 'errcode', None)
+
+    def _get_retry_delay(self, state: RetryState, code,
+                         result) -> t.Optional[float]:
+        if not self.auto_retry:
+            return None
+        return self.retry_policy.next_delay(state, code, result)
 
 
 class NewAppKeyClient(AppKeyClient):
     API_BASE_URL = 'https://api.dingtalk.com'
+    RETRY_CLASSIFIER = NEW_API_CLASSIFIER
 
     yida = YiDaApi()
     oath2 = OAuth2()
 
-    def _handle_pre_request(self, method, uri, kwargs):
+    def _handle_pre_request(self, method, uri, kwargs, access_token=None):
+        """
+        在请求头中注入 access_token, 已带有用户 token 的请求不覆盖.
+        Args:
+            access_token: 预先获取的 token, 为空时从 token_manager 获取
+
+        """
         if 'headers' not in kwargs:
             kwargs['headers'] = {}
-        if 'x-acs-dingtalk-access-token' not in kwargs['headers']:
-            kwargs['headers']['x-acs-dingtalk-access-token'] = self.access_token
+        if ACCESS_TOKEN_HEADER not in kwargs['headers']:
+            kwargs['headers'][ACCESS_TOKEN_HEADER] = \
+                access_token or self.access_token
         return method, uri, kwargs
 
+    def _get_retry_code(self, e: DingTalkClientException):
+        _, result = super()._get_retry_code(e)
+        code = result.get('code') if isinstance(result, dict) else None
+        return code, result
+
     def _handle_request_except(self, e, func, *args, **kwargs):
-        res = self._decode_result(e.response)
-        if self.auto_retry:
-            if res.code in ('failure.operation.requestTooFast'):
-                if 'retry_times' not in kwargs:
-                    kwargs['retry_times'] = self.retry_times
-                if kwargs['retry_times']:
-                    kwargs['retry_times'] -= 1
-                    time.sleep(random.randint(10, 20))
-                    return func(*args, **kwargs)
-        else:
-            raise DingTalkClientException(errcode=res.code,
-                                          errmsg=res.message,
-                                          request=e.request,
-                                          response=e.response)
+        """
+        不再重试时抛出异常.
+
+        """
+        raise self._get_final_exception(e)
+
+    def _get_final_exception(
+            self, e: DingTalkClientException) -> DingTalkClientException:
+        """
+        新版接口的错误码及信息在响应体的 code、message 中, 据此生成抛给调用方的异常.
+
+        """
+        result = self._decode_error(e)
+        if isinstance(result, dict) and result.get('code'):
+            return DingTalkClientException(errcode=result['code'],
+                                           errmsg=result.get('message'),
+                                           client=self,
+                                           request=e.request,
+                                           response=e.response)
+        return e
@@ -0,0 +1,152 @@
+import logging
+import random
+import time
+import typing as t
+from dataclasses import dataclass
+from dataclasses import field
+
+logger = logging.getLogger(__name__)
+
+# 钉钉鉴权服务异常的子错误码
+AUTH_SERVICE_SUB_CODES = ('90001', '90002', '90003', '90004', '90005', '90006')
+
+
+def _is_auth_service_error(result) -> bool:
+    if not isinstance(result, dict):
+        return False
+    return (result.get('sub_code') in AUTH_SERVICE_SUB_CODES or
+            '钉钉鉴权服务异常' in (result.get('sub_msg') or ''))
+
+
+class ErrorCodeClassifier:
+    """
+    按错误码判断请求是否可重试.
+    rules 的值可为 bool 或接收解码后响应的判定函数.
+    """
+
+    def __init__(self,
+                 rules: t.Dict[t.Any, t.Union[bool, t.Callable[[t.Any],
+                                                               bool]]] = None):
+        self.rules = dict(rules or {})
+
+    def __call__(self, code, result) -> bool:
+        rule = self.rules.get(code, False)
+        if callable(rule):
+            return bool(rule(result))
+        return bool(rule)
+
+
+# 旧版接口(oapi.dingtalk.com)
+OAPI_CLASSIFIER = ErrorCodeClassifier({
+    15: True,  # 钉钉远程调用异常
+    88: _is_auth_service_error,  # 鉴权异常
+})
+# 新版接口(api.dingtalk.com)
+NEW_API_CLASSIFIER = ErrorCodeClassifier({
+    'failure.operation.requestTooFast': True,
+})
+
+
+@dataclass
+class RetryAttempt:
+    attempt: int
+    code: t.Any
+    delay: float
+    elapsed: float
+
+
+@dataclass
+class RetryState:
+    started_at: float
+    attempts: t.List[RetryAttempt] = field(default_factory=list)
+
+
+class RetryPolicy:
+    """
+    带抖动的指数退避重试策略.
+    第 n 次重试的等待时间为 min(max_delay, base_delay * multiplier ** (n - 1)),
+    开启抖动时在 [0, 该值] 内随机取值; 累计耗时超出 deadline 后不再重试.
+    """
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 base_delay: float = 1.0,
+                 max_delay: float = 20.0,
+                 multiplier: float = 2.0,
+                 jitter: bool = True,
+                 deadline: t.Optional[float] = 60.0,
+                 classifier: t.Callable[[t.Any, t.Any], bool] = None,
+                 sleep: t.Callable[[float], t.Any] = time.sleep,
+                 clock: t.Callable[[], float] = time.monotonic,
+                 on_retry: t.Callable[[RetryAttempt], t.Any] = None):
+        """
+        Args:
+            max_retries: 最大重试次数
+            base_delay: 首次重试的基础等待秒数
+            max_delay: 单次等待的上限秒数
+            multiplier: 退避倍数
+            jitter: 是否在等待时间上加随机抖动
+            deadline: 总耗时预算(秒), None 为不限制
+            classifier: 判断错误码是否可重试, 签名为 (code, result) -> bool,
+                        为空时由客户端填充默认规则
+            sleep: 等待函数, 测试或异步调用方可注入不阻塞的实现
+            clock: 单调时钟
+            on_retry: 每次重试前的回调
+
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.classifier = classifier
+        self.sleep = sleep
+        self.clock = clock
+        self.on_retry = on_retry
+
+    def copy(self, **kwargs) -> 'RetryPolicy':
+        params = dict(vars(self))
+        params.update(kwargs)
+        return type(self)(**params)
+
+    def new_state(self) -> RetryState:
+        return RetryState(started_at=self.clock())
+
+    def compute_delay(self, attempt: int) -> float:
+        delay = min(self.max_delay,
+                    self.base_delay * self.multiplier**(attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def next_delay(self, state: RetryState, code, result) -> t.Optional[float]:
+        """
+        计算下一次重试前的等待时间并记录本次尝试.
+        Args:
+            state: 本次调用的重试状态
+            code: 错误码
+            result: 解码后的响应
+
+        Returns:
+            等待秒数, 不可重试时为 None
+
+        """
+        attempt = len(state.attempts) + 1
+        if attempt > self.max_retries or self.classifier is None:
+            return None
+        if not self.classifier(code, result):
+            return None
+        delay = self.compute_delay(attempt)
+        elapsed = self.clock() - state.started_at
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+        retry_attempt = RetryAttempt(attempt=attempt,
+                                     code=code,
+                                     delay=delay,
+                                     elapsed=elapsed)
+        state.attempts.append(retry_attempt)
+        logger.warning('第%s次重试, 错误码: %s, 等待%.2f秒', attempt, code, delay)
+        if self.on_retry:
+            self.on_retry(retry_attempt)
+        return delay
@@ -0,0 +1,258 @@
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+import typing as t
+import uuid
+
+from dingtalk.storage.cache import DingTalkCacheItem
+
+logger = logging.getLogger(__name__)
+
+
+class _TokenState:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+
+# 同一进程内按 token 存储键共享刷新状态, 多个客户端实例共用同一把锁
+_STATES: t.Dict[str, _TokenState] = {}
+_STATES_LOCK = threading.Lock()
+
+
+def _get_state(key: str) -> _TokenState:
+    state = _STATES.get(key)
+    if state is None:
+        with _STATES_LOCK:
+            state = _STATES.setdefault(key, _TokenState())
+    return state
+
+
+class BaseTokenManager:
+    """
+    TokenManager 与 AsyncTokenManager 共用的 token 存取逻辑.
+    """
+
+    def __init__(self,
+                 client,
+                 refresh_ahead: int = 0,
+                 clock: t.Callable[[], float] = time.time):
+        """
+        Args:
+            client: 钉钉客户端
+            refresh_ahead: 提前续期的秒数, 默认 0 为不提前续期
+            clock: 时钟
+
+        """
+        self.client = client
+        self.refresh_ahead = refresh_ahead
+        self.clock = clock
+        self.token_item = client.cache.access_token
+        self.expires_item = DingTalkCacheItem(client.cache,
+                                              'access_token_expires_at')
+
+    def _remaining(self) -> t.Optional[float]:
+        expires_at = self.expires_item.get()
+        if expires_at is None:
+            return None
+        return expires_at - self.clock()
+
+    def _should_refresh_ahead(self) -> bool:
+        if not self.refresh_ahead:
+            return False
+        remaining = self._remaining()
+        return remaining is not None and remaining <= self.refresh_ahead
+
+    def _get_valid_token(self, min_ttl: float) -> t.Optional[str]:
+        token = self.token_item.get()
+        if token is None or not min_ttl:
+            return token
+        remaining = self._remaining()
+        if remaining is not None and remaining <= min_ttl:
+            return None
+        return token
+
+    def _save(self, ret: t.Mapping[str, t.Any]) -> str:
+        """
+        保存 gettoken 的返回结果.
+
+        """
+        token = ret['access_token']
+        expires_in = int(ret.get('expires_in', 7200))
+        self.token_item.set(value=token, ttl=expires_in)
+        self.expires_item.set(value=self.clock() + expires_in, ttl=expires_in)
+        logger.info('刷新access_token: %s', self.token_item.key_name(None))
+        return token
+
+
+class TokenManager(BaseTokenManager):
+    """
+    access_token 管理.
+    同一应用并发刷新时只发起一次 gettoken 请求(线程间, 可选经 storage 锁跨进程);
+    设置 refresh_ahead 后, 剩余有效期不足 refresh_ahead 秒时在后台线程提前续期,
+    调用方继续使用当前 token.
+    """
+
+    def __init__(self,
+                 client,
+                 refresh_ahead: int = 0,
+                 storage_lock: bool = False,
+                 lock_ttl: int = 10,
+                 wait_interval: float = 0.05,
+                 clock: t.Callable[[], float] = time.time):
+        """
+        Args:
+            client: 钉钉客户端
+            refresh_ahead: 提前续期的秒数, 默认 0 为不提前续期
+            storage_lock: 是否通过客户端 storage 加锁, 使多进程只刷新一次
+            lock_ttl: storage 锁的过期秒数
+            wait_interval: 等待 storage 锁的轮询间隔
+            clock: 时钟
+
+        """
+        super().__init__(client, refresh_ahead=refresh_ahead, clock=clock)
+        self.storage_lock = storage_lock
+        self.lock_ttl = lock_ttl
+        self.wait_interval = wait_interval
+        self._state = _get_state(self.token_item.key_name(None))
+
+    def get(self) -> str:
+        token = self.token_item.get()
+        if token is None:
+            return self.refresh()
+        if self._should_refresh_ahead():
+            self._refresh_in_background()
+        return token
+
+    def refresh(self, min_ttl: float = 0) -> str:
+        """
+        刷新 token. 获取到锁后若其他线程/进程已刷新且剩余有效期大于 min_ttl, 直接返回.
+        Args:
+            min_ttl: 无需刷新的最小剩余有效期
+
+        """
+        with self._state.lock:
+            token = self._get_valid_token(min_ttl)
+            if token is not None:
+                return token
+            with self._lock_storage(min_ttl) as acquired:
+                token = self._get_valid_token(min_ttl)
+                if token is None and not acquired:
+                    # 等待 storage 锁超时, 持有者可能仍在刷新, 先沿用仍有效的 token
+                    token = self.token_item.get()
+                if token is None:
+                    token = self._fetch()
+            return token
+
+    def _fetch(self) -> str:
+        return self._save(self.client.get_access_token())
+
+    def _refresh_in_background(self):
+        with _STATES_LOCK:
+            if self._state.refreshing:
+                return
+            self._state.refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh(min_ttl=self.refresh_ahead)
+        except Exception:
+            logger.exception('后台刷新access_token失败')
+        finally:
+            self._state.refreshing = False
+
+    @contextlib.contextmanager
+    def _lock_storage(self, min_ttl: float = 0):
+        """
+        基于 BaseStorage 的跨进程锁, 返回是否获取到锁.
+        BaseStorage 没有原子操作, 写入后回读确认持有者, 锁在 lock_ttl 后自动过期.
+
+        """
+        if not self.storage_lock:
+            yield True
+            return
+        storage = self.client.storage
+        lock_key = f'{self.token_item.key_name(None)}:lock'
+        owner = uuid.uuid4().hex
+        deadline = self.clock() + self.lock_ttl
+        acquired = False
+        while self.clock() < deadline:
+            if storage.get(lock_key) is None:
+                storage.set(lock_key, owner, ttl=self.lock_ttl)
+                if storage.get(lock_key) == owner:
+                    acquired = True
+                    break
+            if self._get_valid_token(min_ttl) is not None:
+                # 其他进程已完成刷新
+                break
+            time.sleep(self.wait_interval)
+        try:
+            yield acquired
+        finally:
+            if acquired and storage.get(lock_key) == owner:
+                storage.delete(lock_key)
+
+
+class AsyncTokenManager(BaseTokenManager):
+    """
+    asyncio 客户端的 access_token 管理, 与 TokenManager 共用同一存储键.
+    同一客户端并发刷新时只发起一次 gettoken 请求;
+    设置 refresh_ahead 后, 剩余有效期不足 refresh_ahead 秒时在后台任务中提前续期.
+    不支持 storage 锁, 等待锁会阻塞事件循环.
+    """
+
+    def __init__(self,
+                 client,
+                 refresh_ahead: int = 0,
+                 clock: t.Callable[[], float] = time.time):
+        """
+        Args:
+            client: 异步钉钉客户端
+            refresh_ahead: 提前续期的秒数, 默认 0 为不提前续期
+            clock: 时钟
+
+        """
+        super().__init__(client, refresh_ahead=refresh_ahead, clock=clock)
+        self._lock: t.Optional[asyncio.Lock] = None
+        self._refresh_task: t.Optional[asyncio.Task] = None
+
+    async def get(self) -> str:
+        token = self.token_item.get()
+        if token is None:
+            return await self.refresh()
+        if self._should_refresh_ahead():
+            self._refresh_in_background()
+        return token
+
+    async def refresh(self, min_ttl: float = 0) -> str:
+        """
+        刷新 token, 同 TokenManager.refresh.
+        Args:
+            min_ttl: 无需刷新的最小剩余有效期
+
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            token = self._get_valid_token(min_ttl)
+            if token is None:
+                token = await self._fetch()
+            return token
+
+    async def _fetch(self) -> str:
+        return self._save(await self.client.get_access_token())
+
+    def _refresh_in_background(self):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.ensure_future(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh(min_ttl=self.refresh_ahead)
+        except Exception:
+            logger.exception('后台刷新access_token失败')
@@ -1 +1,2 @@
 from .base import SenseLink
+from .sync import IdentityRecordSync
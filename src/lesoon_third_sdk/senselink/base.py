@@ -3,23 +3,55 @@ import typing as t
 from flask import Flask
 from lesoon_common.exceptions import ConfigError
 
+from lesoon_third_sdk.core.breaker import CircuitBreakerGroup
+from lesoon_third_sdk.core.instrument import Instrumentation
+from lesoon_third_sdk.core.payload import PayloadLogConfig
+from lesoon_third_sdk.core.ratelimit import RateLimiter
+from lesoon_third_sdk.core.registry import ClientRegistry
+from lesoon_third_sdk.core.registry import RegistryMixin
+from lesoon_third_sdk.core.transport import HttpConfig
 from lesoon_third_sdk.senselink.client import SenseLinkClient
 
 
-class SenseLink:
+class SenseLink(RegistryMixin):
     # 此属性不作使用，只作展示使用
     _CONFIG = {'APP_KEY': '', 'APP_SECRET': ''}
 
-    def __init__(self, app: Flask = None, config: dict = None):
+    def __init__(self,
+                 app: Flask = None,
+                 config: dict = None,
+                 rate_limiter: RateLimiter = None,
+                 registry: ClientRegistry = None,
+                 http_config: HttpConfig = None,
+                 instrumentation: Instrumentation = None,
+                 log_config: PayloadLogConfig = None,
+                 circuit_breaker: CircuitBreakerGroup = None):
         self.config: t.Dict[str, t.Any] = config or {}
+        self.rate_limiter = rate_limiter
+        self.registry = registry
+        self.instrumentation = instrumentation
+        self.log_config = log_config
+        self.circuit_breaker = circuit_breaker
+        self.http_config = http_config
         if app:
             self.init_app(app)
         if not self.config:
             raise ConfigError('缺乏启动配置')
 
     def init_app(self, app: Flask):
+        self.close_clients()
         self.config = app.config.get('SENSELINK', {})
 
+    def _client_key(self, kind: str) -> t.Tuple[t.Any, ...]:
+        return ('senselink', kind, self.config['APP_KEY'])
+
     def create_client(self) -> SenseLinkClient:
-        return SenseLinkClient(app_key=self.config['APP_KEY'],
-                               app_secret=self.config['APP_SECRET'])
+        return self._get_client(
+            'client',
+            lambda: SenseLinkClient(app_key=self.config['APP_KEY'],
+                                    app_secret=self.config['APP_SECRET'],
+                                    rate_limiter=self.rate_limiter,
+                                    instrumentation=self.instrumentation,
+                                    log_config=self.log_config,
+                                    circuit_breaker=self.circuit_breaker,
+                                    http_config=self.http_config))
@@ -1,3 +1,4 @@
+from .aio import AsyncSenseLinkClient
 from .api import AttendanceApi
 from .api import CommonApi
 from .api import EventApi
@@ -0,0 +1,204 @@
+import asyncio
+import datetime
+import logging
+import typing as t
+
+import requests
+
+from lesoon_third_sdk.core.breaker import CircuitBreakerGroup
+from lesoon_third_sdk.core.cache import LRUCache
+from lesoon_third_sdk.core.concurrent import chunked
+from lesoon_third_sdk.core.decoder import JsonDecoder
+from lesoon_third_sdk.core.instrument import instrument
+from lesoon_third_sdk.core.instrument import Instrumentation
+from lesoon_third_sdk.core.pagination import AsyncPaginator
+from lesoon_third_sdk.core.payload import PayloadLogConfig
+from lesoon_third_sdk.core.ratelimit import RateLimiter
+from lesoon_third_sdk.core.transport import aiohttp
+from lesoon_third_sdk.core.transport import AsyncHttpTransport
+from lesoon_third_sdk.core.transport import HttpConfig
+from lesoon_third_sdk.senselink.client.api import BaseAttendanceApi
+from lesoon_third_sdk.senselink.client.api import BaseCommonApi
+from lesoon_third_sdk.senselink.client.api import BaseEventApi
+from lesoon_third_sdk.senselink.client.base import BaseSenseLinkClient
+from lesoon_third_sdk.senselink.exceptions import SenseLinkClientException
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCommonApi(BaseCommonApi):
+
+    async def aes_decrypt_bulk(
+            self,
+            ciphers: t.Iterable[str],
+            concurrency: int = 4,
+            cache: LRUCache = None) -> t.List[t.Optional[str]]:
+        """
+        批量解密任意数量的密文, 同 CommonApi.aes_decrypt_bulk.
+        Args:
+            ciphers: 需要解密的字符串集合
+            concurrency: 最大并发请求数
+            cache: 密文->明文的缓存, 命中时不再请求
+
+        """
+        ciphers = list(ciphers)
+        plains, pending = self._split_cached(ciphers, cache)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def decrypt(batch):
+            async with semaphore:
+                result = await self.aes_decrypt(batch)
+            return self._pair_plains(batch, result)
+
+        decrypted = []
+        batches = await asyncio.gather(
+            *(decrypt(batch)
+              for batch in chunked(pending, self.AES_DECRYPT_MAX_SIZE)),
+            return_exceptions=True)
+        for batch in batches:
+            # 被取消的批次返回 CancelledError, 它不是 Exception 的子类
+            if isinstance(batch, BaseException):
+                logger.error('批量解密失败: %r', batch)
+                continue
+            decrypted.extend(batch)
+        return self._merge_plains(ciphers, plains, decrypted, cache)
+
+
+class AsyncAttendanceApi(BaseAttendanceApi):
+
+    def iter_records(self,
+                     date_from: t.Union[str, datetime.datetime],
+                     date_to: t.Union[str, datetime.datetime],
+                     department_id: int = None,
+                     user_id: int = None,
+                     status: int = None,
+                     start_page: int = 1,
+                     after_id: t.Any = None,
+                     concurrency: int = 8) -> t.AsyncIterator[t.Any]:
+        """
+        逐条遍历员工考勤记录, 其余页在 concurrency 限制下并发获取.
+        参数同 AttendanceApi.iter_records.
+
+        """
+        paginator = AsyncPaginator(
+            lambda page: self.get_record(date_from,
+                                         date_to,
+                                         department_id=department_id,
+                                         user_id=user_id,
+                                         status=status,
+                                         page=page,
+                                         size=self.MAX_PAGE_SIZE),
+            page_size=self.MAX_PAGE_SIZE,
+            get_items=self._get_page_items,
+            get_total=self._get_page_total,
+            start_page=start_page,
+            concurrency=concurrency)
+        return paginator.items(after=after_id)
+
+
+class AsyncEventApi(BaseEventApi):
+
+    def iter_identity_records(self,
+                              date_time_from: t.Union[str, datetime.datetime],
+                              date_time_to: t.Union[str, datetime.datetime],
+                              order: int = 0,
+                              start_page: int = 1,
+                              after_id: t.Any = None,
+                              concurrency: int = 8) -> t.AsyncIterator[t.Any]:
+        """
+        逐条遍历某段时间内的识别记录, 其余页在 concurrency 限制下并发获取.
+        参数同 EventApi.iter_identity_records.
+
+        """
+        paginator = AsyncPaginator(
+            lambda page: self.list_identity_records(date_time_from,
+                                                    date_time_to,
+                                                    order=order,
+                                                    page=page,
+                                                    size=self.MAX_PAGE_SIZE),
+            page_size=self.MAX_PAGE_SIZE,
+            get_items=self._get_page_items,
+            get_total=self._get_page_total,
+            start_page=start_page,
+            concurrency=concurrency)
+        return paginator.items(after=after_id)
+
+
+class AsyncSenseLinkClient(BaseSenseLinkClient):
+    """
+    基于 asyncio 的 SenseLink 客户端.
+    接口与 SenseLinkClient 一致, 各接口方法返回协程;
+    签名与结果处理复用 BaseSenseLinkClient 的 _handle_pre_request 与 _handle_result.
+    """
+    common = AsyncCommonApi()
+    attendance = AsyncAttendanceApi()
+    event = AsyncEventApi()
+
+    def __init__(self,
+                 app_key: str,
+                 app_secret: str,
+                 timeout=None,
+                 auto_retry=True,
+                 rate_limiter: RateLimiter = None,
+                 http_config: HttpConfig = None,
+                 instrumentation: Instrumentation = None,
+                 log_config: PayloadLogConfig = None,
+                 json_decoder: JsonDecoder = None,
+                 circuit_breaker: CircuitBreakerGroup = None):
+        super().__init__(app_key,
+                         app_secret,
+                         timeout=timeout,
+                         auto_retry=auto_retry,
+                         rate_limiter=rate_limiter,
+                         instrumentation=instrumentation,
+                         log_config=log_config,
+                         json_decoder=json_decoder,
+                         circuit_breaker=circuit_breaker)
+        self._http = AsyncHttpTransport(http_config)
+
+    async def _request(self, method, url_or_endpoint, **kwargs):
+        url, kwargs, result_processor = self._prepare_request(
+            url_or_endpoint, kwargs)
+        res = await self._http.request(method=method, url=url, **kwargs)
+        return self._process_response(res, method, url, result_processor,
+                                      kwargs)
+
+    async def request(self, method, uri, **kwargs):
+        breaker = self._get_breaker(uri, kwargs)
+        # 熔断时在签名及限流前直接失败, 不消耗限流配额
+        slot = breaker.before_call() if breaker is not None else None
+        try:
+            method, uri_with_access_token, kwargs = self._handle_pre_request(
+                method, uri, kwargs)
+            if self.rate_limiter:
+                # 令牌桶为阻塞实现, 放到线程池中等待以免阻塞事件循环
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.rate_limiter.acquire, uri, self.app_key)
+            with instrument(self.instrumentation, 'senselink', method, uri):
+                result = await self._request(method, uri_with_access_token,
+                                             **kwargs)
+        except SenseLinkClientException as e:
+            self._record_breaker(breaker, e)
+            return self._handle_request_except(e, self.request, method, uri,
+                                               **kwargs)
+        except (requests.RequestException, aiohttp.ClientError,
+                asyncio.TimeoutError) as e:
+            self._record_breaker(breaker, e)
+            raise
+        else:
+            if breaker is not None:
+                breaker.on_success()
+            return result
+        finally:
+            # 被取消或响应解析失败时归还探测名额
+            if breaker is not None:
+                breaker.release(slot)
+
+    async def close(self):
+        await self._http.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
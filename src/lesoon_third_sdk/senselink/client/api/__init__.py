@@ -1,4 +1,7 @@
 from .attendance import AttendanceApi
+from .attendance import BaseAttendanceApi
 from .base import SenseLinkBaseAPI
+from .common import BaseCommonApi
 from .common import CommonApi
+from .event import BaseEventApi
 from .event import EventApi
@@ -1,10 +1,14 @@
 import datetime
 import typing as t
 
+from lesoon_third_sdk.core.pagination import Paginator
 from lesoon_third_sdk.senselink.client.api.base import SenseLinkBaseAPI
 
 
-class AttendanceApi(SenseLinkBaseAPI):
+class BaseAttendanceApi(SenseLinkBaseAPI):
+    """
+    考勤接口, 逐条遍历由 AttendanceApi 与 AsyncAttendanceApi 分别实现.
+    """
     DATE_FORMAT = '%Y-%m-%d'
 
     def get_record(self,
@@ -48,3 +52,43 @@ class AttendanceApi(SenseLinkBaseAPI):
         if status:
             params['status'] = status
         return self._get('/api/v3/attendance/record', params=params)
+
+
+class AttendanceApi(BaseAttendanceApi):
+
+    def iter_records(self,
+                     date_from: t.Union[str, datetime.datetime],
+                     date_to: t.Union[str, datetime.datetime],
+                     department_id: int = None,
+                     user_id: int = None,
+                     status: int = None,
+                     start_page: int = 1,
+                     after_id: t.Any = None,
+                     prefetch: bool = False) -> t.Iterator[t.Any]:
+        """
+        逐条遍历员工考勤记录, 按最大页大小惰性翻页.
+        Args:
+            date_from: 查询的开始日期
+            date_to: 查询的结束日期
+            department_id: 部门id
+            user_id: 员工id
+            status: 考勤状态
+            start_page: 起始页号, 用于断点续传
+            after_id: 断点续传时上次处理到的记录id, 跳过该记录及其之前的数据
+            prefetch: 是否在消费当前页时预取下一页
+
+        """
+        paginator = Paginator(
+            lambda page: self.get_record(date_from,
+                                         date_to,
+                                         department_id=department_id,
+                                         user_id=user_id,
+                                         status=status,
+                                         page=page,
+                                         size=self.MAX_PAGE_SIZE),
+            page_size=self.MAX_PAGE_SIZE,
+            get_items=self._get_page_items,
+            get_total=self._get_page_total,
+            start_page=start_page,
+            prefetch=prefetch)
+        return paginator.items(after=after_id)
@@ -2,10 +2,47 @@ import typing as t
 
 
 class SenseLinkBaseAPI:
+    """
+    接口分组基类.
+    作为客户端类属性声明时充当描述符, 首次通过客户端实例访问时才绑定该实例,
+    并缓存到实例的 __dict__ 中, 之后的访问不再经过描述符.
+    """
     API_BASE_URL: t.Optional[str] = None
+    # 分页接口允许的最大每页条数
+    MAX_PAGE_SIZE = 100
 
     def __init__(self, client=None):
         self._client = client
+        self._name: t.Optional[str] = None
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        api = type(self)(instance)
+        if self._name is not None:
+            instance.__dict__[self._name] = api
+        return api
+
+    @staticmethod
+    def _get_page_items(result) -> t.List[t.Any]:
+        """
+        取出分页接口返回的数据列表, 兼容 data 直接为列表或嵌套在 data.data/data.list 中.
+
+        """
+        data = result.get('data') if isinstance(result, dict) else None
+        if isinstance(data, dict):
+            data = data.get('data', data.get('list'))
+        return data or []
+
+    @staticmethod
+    def _get_page_total(result) -> t.Optional[int]:
+        data = result.get('data') if isinstance(result, dict) else None
+        if isinstance(data, dict):
+            return data.get('total')
+        return None
 
     def _get(self, url, params=None, **kwargs):
         if self.API_BASE_URL:
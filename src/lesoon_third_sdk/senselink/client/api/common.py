@@ -1,10 +1,23 @@
 import datetime
+import logging
 import typing as t
 
+from lesoon_third_sdk.core.cache import LRUCache
+from lesoon_third_sdk.core.concurrent import chunked
+from lesoon_third_sdk.core.concurrent import fan_out
 from lesoon_third_sdk.senselink.client.api.base import SenseLinkBaseAPI
 
+logger = logging.getLogger(__name__)
 
-class CommonApi(SenseLinkBaseAPI):
+_MISSING = object()
+
+
+class BaseCommonApi(SenseLinkBaseAPI):
+    """
+    通用接口, 批量解密由 CommonApi 与 AsyncCommonApi 分别实现.
+    """
+    # 单次解密允许的最大密文数
+    AES_DECRYPT_MAX_SIZE = 50
 
     def aes_decrypt(self, ciphers: t.List[str]):
         """
@@ -17,3 +30,79 @@ class CommonApi(SenseLinkBaseAPI):
 
         data = {'list': ciphers}
         return self._post('/api/v3/decrypt', data=data)
+
+    @staticmethod
+    def _split_cached(ciphers: t.List[str], cache: t.Optional[LRUCache]):
+        """
+        去重并从缓存中取出已知明文.
+
+        Returns:
+            已知的 密文->明文, 待解密的密文
+
+        """
+        plains: t.Dict[str, t.Optional[str]] = {}
+        pending = []
+        for cipher in dict.fromkeys(ciphers):
+            plain = cache.get(cipher,
+                              _MISSING) if cache is not None else _MISSING
+            if plain is _MISSING:
+                pending.append(cipher)
+            else:
+                plains[cipher] = plain
+        return plains, pending
+
+    @staticmethod
+    def _pair_plains(batch: t.List[str],
+                     result) -> t.List[t.Tuple[str, t.Optional[str]]]:
+        """
+        按顺序对应批次中的密文与解密结果, 数量不一致时无法对应, 整批视为失败.
+
+        """
+        data = result.get('data') if isinstance(result, dict) else None
+        if not isinstance(data, list):
+            data = []
+        if len(data) != len(batch):
+            raise ValueError(f'解密结果数量({len(data)})与密文数量({len(batch)})不一致')
+        return list(zip(batch, data))
+
+    @staticmethod
+    def _merge_plains(ciphers: t.List[str], plains: t.Dict[str,
+                                                           t.Optional[str]],
+                      decrypted: t.Iterable[t.Tuple[str, t.Optional[str]]],
+                      cache: t.Optional[LRUCache]) -> t.List[t.Optional[str]]:
+        for cipher, plain in decrypted:
+            plains[cipher] = plain
+            # 无法解密的密文不缓存, 下次仍重新请求
+            if cache is not None and plain is not None:
+                cache.set(cipher, plain)
+        return [plains.get(cipher) for cipher in ciphers]
+
+
+class CommonApi(BaseCommonApi):
+
+    def aes_decrypt_bulk(self,
+                         ciphers: t.Iterable[str],
+                         max_workers: int = 4,
+                         cache: LRUCache = None) -> t.List[t.Optional[str]]:
+        """
+        批量解密任意数量的密文.
+        密文去重后按 AES_DECRYPT_MAX_SIZE 分批并发解密, 结果按入参顺序返回,
+        无法解密或所在批次请求失败的密文对应 None.
+        Args:
+            ciphers: 需要解密的字符串集合
+            max_workers: 最大并发数
+            cache: 密文->明文的缓存, 命中时不再请求
+
+        """
+        ciphers = list(ciphers)
+        plains, pending = self._split_cached(ciphers, cache)
+
+        def decrypt(batch):
+            return self._pair_plains(batch, self.aes_decrypt(batch))
+
+        bulk = fan_out(decrypt,
+                       chunked(pending, self.AES_DECRYPT_MAX_SIZE),
+                       max_workers=max_workers)
+        for error in bulk.errors:
+            logger.error('批量解密失败: %r', error.exception)
+        return self._merge_plains(ciphers, plains, bulk.result, cache)
@@ -1,10 +1,14 @@
 import datetime
 import typing as t
 
+from lesoon_third_sdk.core.pagination import Paginator
 from lesoon_third_sdk.senselink.client.api.base import SenseLinkBaseAPI
 
 
-class EventApi(SenseLinkBaseAPI):
+class BaseEventApi(SenseLinkBaseAPI):
+    """
+    识别记录接口, 逐条遍历由 EventApi 与 AsyncEventApi 分别实现.
+    """
     DATE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 
     def list_identity_records(self,
@@ -38,3 +42,37 @@ class EventApi(SenseLinkBaseAPI):
             'size': size
         }
         return self._get('/api/v3/record/list', params=params)
+
+
+class EventApi(BaseEventApi):
+
+    def iter_identity_records(self,
+                              date_time_from: t.Union[str, datetime.datetime],
+                              date_time_to: t.Union[str, datetime.datetime],
+                              order: int = 0,
+                              start_page: int = 1,
+                              after_id: t.Any = None,
+                              prefetch: bool = False) -> t.Iterator[t.Any]:
+        """
+        逐条遍历某段时间内的识别记录, 按最大页大小惰性翻页.
+        Args:
+            date_time_from: 查询起始时间
+            date_time_to: 查询结束时间
+            order: 排序方式，0-按记录入库时间由近到远返回，1-按识别记录id升序
+            start_page: 起始页号, 用于断点续传
+            after_id: 断点续传时上次处理到的记录id, 跳过该记录及其之前的数据
+            prefetch: 是否在消费当前页时预取下一页
+
+        """
+        paginator = Paginator(
+            lambda page: self.list_identity_records(date_time_from,
+                                                    date_time_to,
+                                                    order=order,
+                                                    page=page,
+                                                    size=self.MAX_PAGE_SIZE),
+            page_size=self.MAX_PAGE_SIZE,
+            get_items=self._get_page_items,
+            get_total=self._get_page_total,
+            start_page=start_page,
+            prefetch=prefetch)
+        return paginator.items(after=after_id)
@@ -1,48 +1,85 @@
-import inspect
 import json
 import logging
 import time
+import typing as t
 from urllib.parse import urljoin
 
 import requests
-from dingtalk.core.utils import json_loads
 from lesoon_common.utils.safe import generate_md5
 
-from lesoon_third_sdk.senselink.client.api import SenseLinkBaseAPI
+from lesoon_third_sdk.core.breaker import CircuitBreaker
+from lesoon_third_sdk.core.breaker import CircuitBreakerGroup
+from lesoon_third_sdk.core.decoder import default_decoder
+from lesoon_third_sdk.core.decoder import JsonDecoder
+from lesoon_third_sdk.core.instrument import instrument
+from lesoon_third_sdk.core.instrument import Instrumentation
+from lesoon_third_sdk.core.instrument import record_response
+from lesoon_third_sdk.core.payload import LazyPayload
+from lesoon_third_sdk.core.payload import PayloadLogConfig
+from lesoon_third_sdk.core.ratelimit import RateLimiter
+from lesoon_third_sdk.core.transport import AsyncHttpTransport
+from lesoon_third_sdk.core.transport import HttpConfig
+from lesoon_third_sdk.core.transport import HttpTransport
+from lesoon_third_sdk.core.utils import get_path
 from lesoon_third_sdk.senselink.exceptions import SenseLinkClientException
 
 logger = logging.getLogger(__name__)
 
 
-def _is_api_endpoint(obj):
-    return isinstance(obj, SenseLinkBaseAPI)
-
-
 class BaseSenseLinkClient:
-    _http = requests.Session()
+    _http: t.Union[requests.Session, HttpTransport,
+                   AsyncHttpTransport] = requests.Session()
 
     API_BASE_URL = 'https://link.bi.sensetime.com'
-
-    def __new__(cls, *args, **kwargs):
-        self = super().__new__(cls)
-        api_endpoints = inspect.getmembers(self, _is_api_endpoint)
-        for name, api in api_endpoints:
-            api_cls = type(api)
-            api = api_cls(self)
-            setattr(self, name, api)
-        return self
+    # 响应含个人信息明文的接口, 开启 log_config 时不记录其响应数据
+    PII_ENDPOINTS = frozenset({'/api/v3/decrypt'})
 
     def __init__(self,
                  app_key: str,
                  app_secret: str,
                  timeout=None,
-                 auto_retry=True):
+                 auto_retry=True,
+                 rate_limiter: RateLimiter = None,
+                 http_config: HttpConfig = None,
+                 instrumentation: Instrumentation = None,
+                 log_config: PayloadLogConfig = None,
+                 json_decoder: JsonDecoder = None,
+                 circuit_breaker: CircuitBreakerGroup = None):
+        """
+        Args:
+            app_key: 应用key
+            app_secret: 应用秘钥
+            timeout: 请求超时
+            auto_retry: 是否自动重试
+            rate_limiter: 客户端限流器
+            http_config: http 传输层配置, 为空时使用类级别共享的 Session
+            instrumentation: 请求埋点钩子
+            log_config: 请求日志配置, 开启后延迟格式化并截断、脱敏、采样请求日志,
+                为空时完整记录请求参数及响应数据
+            json_decoder: 响应体解码器, 默认返回 ObjectDict
+            circuit_breaker: 按接口熔断, 5xx 响应、错误码及连接异常计为失败
+
+        """
+        if http_config is not None:
+            self._http = HttpTransport(http_config)
         self.app_key = app_key
         self.app_secret = app_secret
         self.timeout = timeout
         self.auto_retry = auto_retry
+        self.rate_limiter = rate_limiter
+        self.instrumentation = instrumentation
+        self.log_config = log_config
+        self.json_decoder = json_decoder or default_decoder
+        self.circuit_breaker = circuit_breaker
 
-    def _request(self, method, url_or_endpoint, **kwargs):
+    def _prepare_request(self, url_or_endpoint, kwargs):
+        """
+        拼接请求地址并序列化请求体, 同步及异步客户端共用.
+
+        Returns:
+            url, kwargs, result_processor
+
+        """
         if not url_or_endpoint.startswith(('http://', 'https://')):
             api_base_url = kwargs.pop('api_base_url', self.API_BASE_URL)
             url = urljoin(api_base_url, url_or_endpoint)
@@ -61,12 +98,21 @@ class BaseSenseLinkClient:
 
         kwargs['timeout'] = kwargs.get('timeout', self.timeout)
         result_processor = kwargs.pop('result_processor', None)
+        return url, kwargs, result_processor
+
+    def _request(self, method, url_or_endpoint, **kwargs):
+        url, kwargs, result_processor = self._prepare_request(
+            url_or_endpoint, kwargs)
         res = self._http.request(method=method, url=url, **kwargs)
+        return self._process_response(res, method, url, result_processor,
+                                      kwargs)
+
+    def _process_response(self, res, method, url, result_processor, kwargs):
+        record_response(res, kwargs.get('data'))
         try:
             res.raise_for_status()
         except requests.RequestException as reqe:
-            logger.error('\n【请求地址】: %s\n【请求参数】：%s \n%s\n【异常信息】：%s', url,
-                         kwargs.get('params', ''), kwargs.get('data', ''), reqe)
+            self._log_request(logging.ERROR, '异常信息', url, kwargs, reqe)
             raise SenseLinkClientException(errcode=None,
                                            errmsg=None,
                                            client=self,
@@ -76,14 +122,30 @@ class BaseSenseLinkClient:
         result = self._handle_result(res, method, url, result_processor,
                                      **kwargs)
 
-        logger.debug('\n【请求地址】: %s\n【请求参数】：%s \n%s\n【响应数据】：%s', url,
-                     kwargs.get('params', ''), kwargs.get('data', ''), result)
+        self._log_request(logging.DEBUG, '响应数据', url, kwargs, result)
         return result
 
+    def _log_request(self, level: int, title: str, url: str, kwargs: dict,
+                     result):
+        if not logger.isEnabledFor(level):
+            return
+        params, data = kwargs.get('params', ''), kwargs.get('data', '')
+        config = self.log_config
+        if config is not None:
+            if level < logging.WARNING and not config.sample():
+                return
+            if result is not None and (get_path(url) in self.PII_ENDPOINTS or
+                                       config.is_redacted_endpoint(url)):
+                result = f'<已脱敏: {type(result).__name__}>'
+            params, data, result = (LazyPayload(params, config),
+                                    LazyPayload(data, config),
+                                    LazyPayload(result, config))
+        logger.log(level, '\n【请求地址】: %s\n【请求参数】：%s \n%s\n【%s】：%s', url, params,
+                   data, title, result)
+
     def _decode_result(self, res):
         try:
-            result = json_loads(res.content.decode('utf-8', 'ignore'),
-                                strict=False)
+            result = self.json_decoder.loads(res.content)
         except (TypeError, ValueError):
             # Return origin response object if we can not decode it as JSON
             logger.debug('Can not decode response as JSON', exc_info=True)
@@ -109,9 +171,7 @@ class BaseSenseLinkClient:
             errcode = result['code']
             errmsg = result.get('message', errcode)
 
-            logger.error('\n【请求地址】: %s\n【请求参数】：%s \n%s\n【错误信息】：%s', url,
-                         kwargs.get('params', ''), kwargs.get('data', ''),
-                         result)
+            self._log_request(logging.ERROR, '错误信息', url, kwargs, result)
             raise SenseLinkClientException(errcode,
                                            errmsg,
                                            client=self,
@@ -136,14 +196,51 @@ class BaseSenseLinkClient:
     def _handle_request_except(self, e, func, *args, **kwargs):
         raise e
 
+    def _get_breaker(self, uri, kwargs) -> t.Optional[CircuitBreaker]:
+        if self.circuit_breaker is None:
+            return None
+        return self.circuit_breaker.get(
+            kwargs.get('api_base_url', self.API_BASE_URL), uri)
+
+    @staticmethod
+    def _record_breaker(breaker: t.Optional[CircuitBreaker], e: Exception):
+        if breaker is None:
+            return
+        # 业务错误说明服务可用, 不计入熔断; 响应体 code 为 5xx 时同样视为服务异常
+        response = getattr(e, 'response', None)
+        errcode = getattr(e, 'errcode', None)
+        if (response is None or response.status_code >= 500 or
+                isinstance(errcode, int) and 500 <= errcode < 600):
+            breaker.on_failure()
+        else:
+            breaker.on_success()
+
     def request(self, method, uri, **kwargs):
-        method, uri_with_access_token, kwargs = self._handle_pre_request(
-            method, uri, kwargs)
+        breaker = self._get_breaker(uri, kwargs)
+        # 熔断时在签名及限流前直接失败, 不消耗限流配额
+        slot = breaker.before_call() if breaker is not None else None
         try:
-            return self._request(method, uri_with_access_token, **kwargs)
+            method, uri_with_access_token, kwargs = self._handle_pre_request(
+                method, uri, kwargs)
+            if self.rate_limiter:
+                self.rate_limiter.acquire(uri, self.app_key)
+            with instrument(self.instrumentation, 'senselink', method, uri):
+                result = self._request(method, uri_with_access_token, **kwargs)
         except SenseLinkClientException as e:
+            self._record_breaker(breaker, e)
             return self._handle_request_except(e, self.request, method, uri,
                                                **kwargs)
+        except requests.RequestException as e:
+            self._record_breaker(breaker, e)
+            raise
+        else:
+            if breaker is not None:
+                breaker.on_success()
+            return result
+        finally:
+            # 未得出结果即中断(如响应解析失败)时归还探测名额
+            if breaker is not None:
+                breaker.release(slot)
 
     def get(self, uri, params=None, **kwargs):
         """
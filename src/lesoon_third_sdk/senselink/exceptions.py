@@ -23,7 +23,7 @@ class SenseLinkClientException(SenseLinkException):
                  client=None,
                  request=None,
                  response=None):
-        super(SenseLinkException, self).__init__(errcode, errmsg)
+        super().__init__(errcode, errmsg)
         self.client = client
         self.request = request
         self.response = response
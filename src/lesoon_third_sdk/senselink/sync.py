@@ -0,0 +1,199 @@
+import datetime
+import logging
+import typing as t
+
+from dingtalk.storage import BaseStorage
+from dingtalk.storage.memorystorage import MemoryStorage
+
+from lesoon_third_sdk.core.concurrent import chunked
+
+logger = logging.getLogger(__name__)
+
+RecordSink = t.Callable[[t.List[t.Dict[str, t.Any]]], t.Any]
+RecordTime = t.Callable[[t.Dict[str, t.Any]], t.Optional[datetime.datetime]]
+
+
+def sign_time(record: t.Dict[str, t.Any]) -> t.Optional[datetime.datetime]:
+    """
+    识别记录的识别时间(signTime, 毫秒时间戳), 缺失时返回 None.
+
+    """
+    if record.get('signTime') is None:
+        return None
+    return datetime.datetime.fromtimestamp(int(record['signTime']) / 1000)
+
+
+class IdentityRecordSync:
+    """
+    SenseLink 识别记录增量同步.
+    水位线记录已完成的查询窗口结束时间及该窗口返回的最大记录id, 保存在 storage 中.
+    每次同步从 窗口结束时间 - overlap 开始按记录id升序查询, 以容忍记录延迟入库;
+    重叠区间(记录时间不晚于上个窗口结束时间)内id不大于水位线的记录已同步过, 予以丢弃,
+    重叠区间之后的记录id可能小于水位线, 不做比较.
+    每批记录交由 sink 处理成功后才推进水位线, 窗口未完成时另存窗口内的记录id游标.
+    """
+
+    def __init__(self,
+                 client,
+                 sink: RecordSink,
+                 storage: BaseStorage = None,
+                 name: str = 'senselink:identity_records',
+                 batch_size: int = 100,
+                 overlap: datetime.timedelta = datetime.timedelta(minutes=5),
+                 max_window: datetime.timedelta = datetime.timedelta(days=1),
+                 initial_from: datetime.datetime = None,
+                 ttl: int = 86400 * 30,
+                 now: t.Callable[[], datetime.datetime] = datetime.datetime.now,
+                 record_time: RecordTime = sign_time):
+        """
+        Args:
+            client: SenseLinkClient
+            sink: 处理一批记录的函数
+            storage: 水位线存储, 默认为进程内存储
+            name: 水位线键名
+            batch_size: 每批交给 sink 的记录数
+            overlap: 查询窗口向前重叠的时长, 应大于记录入库的最大延迟
+            max_window: 单个查询窗口的最大时长, 长时间未同步时分段追赶
+            initial_from: 首次同步的起始时间, 默认为当日零点
+            ttl: 水位线保存秒数
+            now: 当前时间
+            record_time: 获取记录时间, 用于判断记录是否落在重叠区间,
+                返回 None 时按记录id与水位线比较
+
+        """
+        if max_window <= overlap:
+            raise ValueError('max_window 必须大于 overlap')
+        self.client = client
+        self.sink = sink
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.name = name
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.max_window = max_window
+        self.initial_from = initial_from
+        self.ttl = ttl
+        self.now = now
+        self.record_time = record_time
+
+    @property
+    def watermark(self) -> t.Dict[str, t.Any]:
+        """
+        当前水位线, 如 {'id': 1024, 'time': '2022-01-01 12:00:00'};
+        窗口未完成时包含 window, 如
+        {'from': '2022-01-01 11:55:00', 'to': '2022-01-01 12:10:00', 'id': 1100}.
+
+        """
+        return self.storage.get(self.name) or {}
+
+    def _format(self, time: datetime.datetime) -> str:
+        return time.strftime(self.client.event.DATE_TIME_FORMAT)
+
+    def _parse(self, time: str) -> datetime.datetime:
+        return datetime.datetime.strptime(time,
+                                          self.client.event.DATE_TIME_FORMAT)
+
+    def _parse_optional(self,
+                        time: t.Optional[str]) -> t.Optional[datetime.datetime]:
+        return self._parse(time) if time else None
+
+    def _save_watermark(self,
+                        record_id: t.Any,
+                        time: t.Optional[datetime.datetime],
+                        window: t.Tuple[datetime.datetime, datetime.datetime,
+                                        t.Any] = None):
+        watermark = {
+            'id': record_id,
+            'time': self._format(time) if time is not None else None
+        }
+        if window is not None:
+            window_from, window_to, window_id = window
+            watermark['window'] = {
+                'from': self._format(window_from),
+                'to': self._format(window_to),
+                'id': window_id
+            }
+        self.storage.set(self.name, watermark, self.ttl)
+
+    def _start_time(
+            self,
+            last_time: t.Optional[datetime.datetime]) -> datetime.datetime:
+        if last_time is not None:
+            return last_time - self.overlap
+        if self.initial_from is not None:
+            return self.initial_from
+        return datetime.datetime.combine(self.now().date(), datetime.time())
+
+    def _is_synced(self, record: t.Dict[str, t.Any], last_id: t.Any,
+                   last_time: t.Optional[datetime.datetime]) -> bool:
+        if last_id is None or record['id'] > last_id:
+            return False
+        if last_time is None:
+            return True
+        record_time = self.record_time(record)
+        # 查询时间精确到秒, 结束时间包含该秒内的记录(如默认结束时间 23:59:59)
+        return record_time is None or \
+            record_time.replace(microsecond=0) <= last_time
+
+    def reset(self):
+        """
+        清除水位线, 下次从 initial_from 重新同步.
+
+        """
+        self.storage.delete(self.name)
+
+    def _query(self, start: datetime.datetime, end: datetime.datetime,
+               last_id: t.Any, last_time: t.Optional[datetime.datetime],
+               window_id: t.Any, max_id: t.List[t.Any]):
+        for record in self.client.event.iter_identity_records(start,
+                                                              end,
+                                                              order=1):
+            # 记录按id升序返回, 最后一条即本窗口的最大记录id
+            max_id[:] = [record['id']]
+            if window_id is not None and record['id'] <= window_id:
+                continue
+            if not self._is_synced(record, last_id, last_time):
+                yield record
+
+    def run(self) -> int:
+        """
+        同步一次截至当前时间的新记录.
+
+        Returns:
+            交给 sink 的记录数
+
+        """
+        watermark = self.watermark
+        last_id = watermark.get('id')
+        last_time = self._parse_optional(watermark.get('time'))
+        window = watermark.get('window')
+        start = self._parse(window['from']) if window \
+            else self._start_time(last_time)
+        # 查询时间精确到秒
+        until = self.now().replace(microsecond=0)
+        total = 0
+        while start < until:
+            end: datetime.datetime
+            if window:
+                # 上次中断的窗口按原时间范围重新查询, 跳过游标之前已处理的记录
+                end, window_id = self._parse(window['to']), window['id']
+                window = None
+            else:
+                end, window_id = min(start + self.max_window, until), None
+            max_id: t.List[t.Any] = []
+            records = self._query(start, end, last_id, last_time, window_id,
+                                  max_id)
+            for batch in chunked(records, self.batch_size):
+                self.sink(batch)
+                window_id = batch[-1]['id']
+                total += len(batch)
+                self._save_watermark(last_id, last_time,
+                                     (start, end, window_id))
+            if max_id:
+                last_id = max_id[0] if last_id is None else max(
+                    last_id, max_id[0])
+            last_time = end
+            self._save_watermark(last_id, last_time)
+            # 下一窗口同样重叠, 由水位线去重
+            start = end - self.overlap if end < until else until
+        logger.info('SenseLink识别记录同步完成: %s 条, 水位线 %s', total, last_id)
+        return total
@@ -1,4 +1,12 @@
+import logging
+import typing as t
+
 from wechatpy.client.base import BaseWeChatAPI
+from wechatpy.exceptions import WeChatClientException
+
+from lesoon_third_sdk.wechat.cache import WechatOAuth2Cache
+
+logger = logging.getLogger(__name__)
 
 
 class WechatOAuth2(BaseWeChatAPI):
@@ -8,7 +16,8 @@ class WechatOAuth2(BaseWeChatAPI):
                               code: str,
                               grant_type: str = 'authorization_code'):
         """
-        通过 code 获取access_token的接口。
+        通过 code 获取access_token的接口, 开启缓存时按 openid 缓存换取到的 token。
+        code 只能使用一次, 之后通过 get_cached_access_token 按 openid 获取。
 
         Args:
             code: 临时授权码
@@ -21,12 +30,57 @@ class WechatOAuth2(BaseWeChatAPI):
             'code': code,
             'grant_type': grant_type
         }
-        return self._get('sns/oauth2/access_token', params=params)
+        result = self._get('sns/oauth2/access_token', params=params)
+        if self._cache is not None:
+            self._cache.set_token(result)
+        return result
+
+    def refresh_access_token(self, refresh_token: str):
+        """
+        通过 refresh_token 刷新 access_token, 开启缓存时同时更新缓存.
+        https://developers.weixin.qq.com/doc/oplatform/Mobile_App/WeChat_Login/Authorized_API_call_UnionID.html
+        Args:
+            refresh_token: 填写通过 access_token 获取到的 refresh_token 参数
+
+        """
+        params = {
+            'appid': self._client.appid,
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token
+        }
+        result = self._get('sns/oauth2/refresh_token', params=params)
+        if self._cache is not None:
+            self._cache.set_token(result, refreshed=True)
+        return result
+
+    def get_cached_access_token(self, openid: str) -> t.Optional[dict]:
+        """
+        获取缓存的用户 access_token, 即将过期时通过 refresh_token 续期.
+        Args:
+            openid: 普通用户的标识
+
+        Returns:
+            未开启缓存、无缓存或 refresh_token 已失效时为 None
+
+        """
+        cache = self._cache
+        if cache is None:
+            return None
+        token = cache.get_token(openid)
+        if token is None or not cache.needs_refresh(token):
+            return token
+        try:
+            return self.refresh_access_token(token['refresh_token'])
+        except WeChatClientException as e:
+            logger.info('刷新用户access_token失败: %s, %s', openid, e)
+            cache.delete_token(openid)
+            return None
 
     def get_user_info(self,
-                      access_token: str,
+                      access_token: t.Optional[str],
                       openid: str,
-                      lang: str = 'zh_CN'):
+                      lang: str = None,
+                      max_age: float = None):
         """
         此接口用于获取用户个人信息。开发者可通过 OpenID 来获取用户基本信息。
         特别需要注意的是，如果开发者拥有多个移动应用、网站应用和公众帐号，
@@ -36,10 +90,31 @@ class WechatOAuth2(BaseWeChatAPI):
         Args:
             access_token:  调用凭证
             openid: 普通用户的标识，对当前开发者帐号唯一
-            lang: 国家地区语言版本，zh_CN 简体，zh_TW 繁体，en 英语，默认为en
+            lang: 国家地区语言版本，zh_CN 简体，zh_TW 繁体，en 英语，为空时不传, 微信默认为en
+            max_age: 开启缓存时可接受的用户信息最大缓存秒数, 为空时使用缓存的 profile_ttl;
+                access_token 为空时使用缓存的 token
 
         Returns:
 
         """
+        cache = self._cache
+        if cache is not None:
+            profile = cache.get_profile(openid, lang=lang, max_age=max_age)
+            if profile is not None:
+                return profile
+            if not access_token:
+                token = self.get_cached_access_token(openid)
+                if token is None:
+                    raise ValueError(f'用户 {openid} 没有可用的 access_token')
+                access_token = token['access_token']
         params = {'access_token': access_token, 'openid': openid}
-        return self._get('sns/userinfo', params=params)
+        if lang:
+            params['lang'] = lang
+        result = self._get('sns/userinfo', params=params)
+        if cache is not None:
+            cache.set_profile(result, lang=lang)
+        return result
+
+    @property
+    def _cache(self) -> t.Optional[WechatOAuth2Cache]:
+        return getattr(self._client, 'oauth2_cache', None)
@@ -4,23 +4,46 @@ from flask import Flask
 from lesoon_common import current_app
 from lesoon_common.exceptions import ConfigError
 
+from lesoon_third_sdk.core.instrument import Instrumentation
+from lesoon_third_sdk.core.ratelimit import RateLimiter
+from lesoon_third_sdk.core.registry import ClientRegistry
+from lesoon_third_sdk.core.registry import RegistryMixin
+from lesoon_third_sdk.wechat.cache import WechatOAuth2Cache
 from lesoon_third_sdk.wechat.client import WeChatClient
 
 
-class Wechat:
+class Wechat(RegistryMixin):
     # 此属性不作使用，只作展示使用
     _CONFIG = {'APP_ID': '', 'APP_SECRET': ''}
 
-    def __init__(self, app: Flask = None, config: dict = None):
+    def __init__(self,
+                 app: Flask = None,
+                 config: dict = None,
+                 rate_limiter: RateLimiter = None,
+                 registry: ClientRegistry = None,
+                 instrumentation: Instrumentation = None,
+                 oauth2_cache: WechatOAuth2Cache = None):
         self.config: t.Dict[str, t.Any] = config or {}
+        self.rate_limiter = rate_limiter
+        self.registry = registry
+        self.instrumentation = instrumentation
+        self.oauth2_cache = oauth2_cache
         if app:
             self.init_app(app)
         if not self.config:
             raise ConfigError('缺乏启动配置')
 
     def init_app(self, app: Flask):
+        self.close_clients()
         self.config = app.config.get('WECHAT', {})
 
+    def _client_key(self, kind: str) -> t.Tuple[t.Any, ...]:
+        return ('wechat', kind, self.config['APP_ID'])
+
     def create_client(self) -> WeChatClient:
-        return WeChatClient(appid=self.config['APP_ID'],
-                            secret=self.config['APP_SECRET'])
+        return self._get_client(
+            'client', lambda: WeChatClient(appid=self.config['APP_ID'],
+                                           secret=self.config['APP_SECRET'],
+                                           rate_limiter=self.rate_limiter,
+                                           instrumentation=self.instrumentation,
+                                           oauth2_cache=self.oauth2_cache))
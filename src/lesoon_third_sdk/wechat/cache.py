@@ -0,0 +1,139 @@
+import time
+import typing as t
+
+from lesoon_third_sdk.core.cache import LRUCache
+from lesoon_third_sdk.core.cache import StorageCache
+
+# refresh_token 有效期为 30 天
+REFRESH_TOKEN_TTL = 30 * 86400
+
+
+class WechatOAuth2Cache:
+    """
+    微信网页授权的 token 及用户信息缓存.
+    code 换取 token 成功后按 openid 缓存至 refresh_token 过期, 续期不延长 refresh_token 的有效期;
+    access_token 剩余有效期不足 refresh_ahead 秒时由 WechatOAuth2 通过 refresh_token 续期;
+    用户信息按 openid 及 unionid 缓存 profile_ttl 秒.
+    缓存的对象可能被多次返回, 调用方不应修改.
+    """
+
+    def __init__(self,
+                 backend: t.Union[LRUCache, StorageCache] = None,
+                 profile_ttl: float = 3600,
+                 refresh_ahead: float = 300,
+                 refresh_token_ttl: float = REFRESH_TOKEN_TTL,
+                 clock: t.Callable[[], float] = time.time):
+        """
+        Args:
+            backend: 缓存后端, 默认为容量 1024 的 LRUCache
+            profile_ttl: 用户信息的缓存秒数
+            refresh_ahead: access_token 提前续期的秒数
+            refresh_token_ttl: refresh_token 的有效期
+            clock: 时钟, 过期时间会写入缓存, 需为跨进程一致的墙上时间
+
+        """
+        self.backend = backend if backend is not None else LRUCache()
+        self.profile_ttl = profile_ttl
+        self.refresh_ahead = refresh_ahead
+        self.refresh_token_ttl = refresh_token_ttl
+        self.clock = clock
+
+    def get_token(self, openid: str) -> t.Optional[t.Dict[str, t.Any]]:
+        """
+        获取缓存的 token, 结果中的 expires_in 为剩余有效秒数, 已过期时为 0.
+
+        """
+        item = self.backend.get(f'token:{openid}')
+        if item is None:
+            return None
+        token = dict(item)
+        token.pop('refresh_expires_at', None)
+        token['expires_in'] = max(0,
+                                  int(token.pop('expires_at') - self.clock()))
+        return token
+
+    def needs_refresh(self, token: t.Mapping[str, t.Any]) -> bool:
+        return token['expires_in'] <= self.refresh_ahead
+
+    def set_token(self, result: t.Mapping[str, t.Any], refreshed: bool = False):
+        """
+        缓存 access_token/refresh_token 接口的结果.
+        Args:
+            result: 含 access_token、expires_in、refresh_token、openid 的响应
+            refreshed: 是否为 refresh_token 续期的结果, 续期时沿用原 refresh_token 的过期时间
+
+        """
+        openid = result['openid']
+        now = self.clock()
+        refresh_expires_at = None
+        if refreshed:
+            cached = self.backend.get(f'token:{openid}')
+            if cached is not None:
+                refresh_expires_at = cached.get('refresh_expires_at')
+        if refresh_expires_at is None:
+            refresh_expires_at = now + self.refresh_token_ttl
+        item = dict(result)
+        item['expires_at'] = now + int(item.get('expires_in', 7200))
+        item['refresh_expires_at'] = refresh_expires_at
+        self.backend.set(f'token:{openid}', item,
+                         max(1, int(refresh_expires_at - now)))
+
+    def delete_token(self, openid: str):
+        self.backend.delete(f'token:{openid}')
+
+    def get_profile(self,
+                    openid: str = None,
+                    unionid: str = None,
+                    lang: str = None,
+                    max_age: float = None) -> t.Optional[t.Dict[str, t.Any]]:
+        """
+        获取缓存的用户信息.
+        Args:
+            openid: 用户在当前应用的标识
+            unionid: 用户在开放平台的标识, openid 为空时使用
+            lang: 语言版本, 为空时为未指定语言的请求结果
+            max_age: 可接受的最大缓存秒数, 为空时使用 profile_ttl
+
+        """
+        key = f'profile:{openid}' if openid else f'profile:union:{unionid}'
+        item = self.backend.get(self._profile_key(key, lang))
+        if item is None:
+            return None
+        fetched_at, profile = item
+        if max_age is None:
+            max_age = self.profile_ttl
+        if self.clock() - fetched_at > max_age:
+            return None
+        return profile
+
+    def set_profile(self, profile: t.Mapping[str, t.Any], lang: str = None):
+        item = (self.clock(), profile)
+        self.backend.set(
+            self._profile_key(f'profile:{profile["openid"]}', lang), item,
+            self.profile_ttl)
+        if profile.get('unionid'):
+            self.backend.set(
+                self._profile_key(f'profile:union:{profile["unionid"]}', lang),
+                item, self.profile_ttl)
+
+    @staticmethod
+    def _profile_key(key: str, lang: t.Optional[str]) -> str:
+        # 未指定语言时由微信按默认语言返回, 与指定语言的结果分开缓存
+        return f'{key}:{lang}' if lang else key
+
+
+def create_oauth2_cache(session=None,
+                        maxsize: int = 1024,
+                        **kwargs) -> WechatOAuth2Cache:
+    """
+    创建微信网页授权缓存.
+    Args:
+        session: wechatpy 的 SessionStorage(如 RedisStorage), 为空时使用进程内 LRU 缓存
+        maxsize: 进程内缓存的最大条目数
+        **kwargs: 其余参数同 WechatOAuth2Cache
+
+    """
+    backend: t.Union[LRUCache, StorageCache] = \
+        StorageCache(session, prefix='wechat:oauth2') \
+        if session is not None else LRUCache(maxsize)
+    return WechatOAuth2Cache(backend, **kwargs)
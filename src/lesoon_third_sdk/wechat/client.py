@@ -1,9 +1,15 @@
 import logging
 
-from dingtalk.core.utils import json_loads
 from wechatpy.client import WeChatClient as _Client
 
+from lesoon_third_sdk.core.decoder import default_decoder
+from lesoon_third_sdk.core.decoder import JsonDecoder
+from lesoon_third_sdk.core.instrument import instrument
+from lesoon_third_sdk.core.instrument import Instrumentation
+from lesoon_third_sdk.core.instrument import record_response
+from lesoon_third_sdk.core.ratelimit import RateLimiter
 from lesoon_third_sdk.wechat.api import WechatOAuth2
+from lesoon_third_sdk.wechat.cache import WechatOAuth2Cache
 
 logger = logging.getLogger(__name__)
 
@@ -11,10 +17,30 @@ logger = logging.getLogger(__name__)
 class WeChatClient(_Client):
     oauth2 = WechatOAuth2()
 
+    def __init__(self,
+                 *args,
+                 rate_limiter: RateLimiter = None,
+                 instrumentation: Instrumentation = None,
+                 json_decoder: JsonDecoder = None,
+                 oauth2_cache: WechatOAuth2Cache = None,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.instrumentation = instrumentation
+        self.json_decoder = json_decoder or default_decoder
+        self.oauth2_cache = oauth2_cache
+
+    def _request(self, method, url_or_endpoint, **kwargs):
+        if self.rate_limiter:
+            self.rate_limiter.acquire(url_or_endpoint, self.appid)
+        with instrument(self.instrumentation, 'wechat', method,
+                        url_or_endpoint):
+            return super()._request(method, url_or_endpoint, **kwargs)
+
     def _decode_result(self, res):
+        record_response(res)
         try:
-            result = json_loads(res.content.decode('utf-8', 'ignore'),
-                                strict=False)
+            result = self.json_decoder.loads(res.content)
         except (TypeError, ValueError):
             # Return origin response object if we can not decode it as JSON
             logger.debug('Can not decode response as JSON', exc_info=True)
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# 复用基准测试的平台桩服务
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'benchmarks'))
+
+from _stub import Faults  # noqa: E402
+from _stub import platform_handler  # noqa: E402
+from _stub import StubServer  # noqa: E402
+
+
+@pytest.fixture
+def faults():
+    return Faults()
+
+
+@pytest.fixture
+def stub(faults):
+    """
+    模拟钉钉、SenseLink 及微信接口的本地桩服务, 通过 faults 调整注入的故障.
+    """
+    with StubServer(platform_handler(faults, total=250)) as server:
+        yield server
@@ -0,0 +1,284 @@
+import asyncio
+
+import pytest
+from dingtalk.core.exceptions import DingTalkClientException
+
+from lesoon_third_sdk.core.breaker import CircuitBreaker
+from lesoon_third_sdk.core.breaker import CircuitBreakerGroup
+from lesoon_third_sdk.core.breaker import CircuitOpenError
+from lesoon_third_sdk.core.ratelimit import RateLimiter
+from lesoon_third_sdk.core.ratelimit import RateLimitRule
+from lesoon_third_sdk.core.ratelimit import RateLimitTimeout
+from lesoon_third_sdk.dingtalk.client import NewAppKeyClient
+from lesoon_third_sdk.dingtalk.retry import RetryPolicy
+from lesoon_third_sdk.senselink.client import SenseLinkClient
+from lesoon_third_sdk.senselink.client.aio import AsyncSenseLinkClient
+from lesoon_third_sdk.senselink.exceptions import SenseLinkClientException
+
+SEARCH_URI = '/v1.0/yida/forms/instances/search'
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.on_failure()
+
+
+def test_transitions(clock):
+    breaker = CircuitBreaker('api',
+                             failure_threshold=2,
+                             recovery_timeout=10,
+                             clock=clock)
+    assert breaker.before_call() is None
+    breaker.on_failure()
+    assert breaker.state == 'closed'
+    breaker.on_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.retry_after == 10
+    clock.now = 10
+    assert breaker.state == 'half_open'
+    assert breaker.before_call() is not None
+    # 半开状态下只放行一个探测请求
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.on_failure()
+    assert breaker.state == 'open'
+    clock.now = 20
+    breaker.before_call()
+    breaker.on_success()
+    assert breaker.snapshot() == {
+        'state': 'closed',
+        'failures': 0,
+        'retry_after': 0
+    }
+
+
+def test_release_returns_probe_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1,
+                             recovery_timeout=10,
+                             clock=clock)
+    open_breaker(breaker)
+    clock.now = 10
+    slot = breaker.before_call()
+    breaker.release(slot)
+    assert breaker.before_call() == slot
+
+
+def test_release_ignores_stale_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1,
+                             recovery_timeout=10,
+                             clock=clock)
+    open_breaker(breaker)
+    clock.now = 10
+    stale = breaker.before_call()
+    breaker.on_failure()
+    clock.now = 20
+    breaker.before_call()
+    # 上一半开周期的名额不能释放当前周期的探测名额
+    breaker.release(stale)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_group_keys_by_host_and_template(clock):
+    group = CircuitBreakerGroup(clock=clock)
+    assert group.get('https://api.dingtalk.com', '/v1.0/contact/users/1') is \
+        group.get('https://api.dingtalk.com', '/v1.0/contact/users/2')
+    assert group.get('https://api.dingtalk.com', SEARCH_URI) is not \
+        group.get('https://oapi.dingtalk.com', SEARCH_URI)
+
+
+def test_group_health(clock):
+    group = CircuitBreakerGroup(failure_threshold=1,
+                                recovery_timeout=10,
+                                clock=clock)
+    open_breaker(group.get('https://api.dingtalk.com', SEARCH_URI))
+    group.get('https://oapi.dingtalk.com', '/gettoken')
+    assert group.health() == {
+        f'api.dingtalk.com{SEARCH_URI}': {
+            'state': 'open',
+            'failures': 1,
+            'retry_after': 10
+        },
+        'oapi.dingtalk.com/gettoken': {
+            'state': 'closed',
+            'failures': 0,
+            'retry_after': 0
+        },
+    }
+    assert not group.healthy
+
+
+@pytest.fixture
+def dingtalk_client(stub, clock):
+    client = NewAppKeyClient(corp_id='corp',
+                             app_key='key',
+                             app_secret='secret',
+                             agent_id=1,
+                             retry_policy=RetryPolicy(max_retries=0),
+                             circuit_breaker=CircuitBreakerGroup(
+                                 failure_threshold=1,
+                                 recovery_timeout=10,
+                                 clock=clock))
+    client.API_BASE_URL = stub.url
+    return client
+
+
+def search(client):
+    return client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+
+
+def test_dingtalk_probe_slot_released_on_rate_limit_timeout(
+        dingtalk_client, faults, clock):
+    faults.error_rate = 1.0
+    with pytest.raises(DingTalkClientException):
+        search(dingtalk_client)
+    with pytest.raises(CircuitOpenError):
+        search(dingtalk_client)
+    faults.error_rate = 0
+    clock.now = 10
+    limiter = RateLimiter([RateLimitRule('/v1.0/yida/*', 1)], timeout=0)
+    limiter.acquire(SEARCH_URI, 'key')
+    dingtalk_client.rate_limiter = limiter
+    with pytest.raises(RateLimitTimeout):
+        search(dingtalk_client)
+    dingtalk_client.rate_limiter = None
+    assert search(dingtalk_client)['totalCount'] == 250
+    breaker = dingtalk_client.circuit_breaker.get(dingtalk_client.API_BASE_URL,
+                                                  SEARCH_URI)
+    assert breaker.state == 'closed'
+
+
+def half_open_senselink(client, clock):
+    breaker = client.circuit_breaker.get(client.API_BASE_URL,
+                                         '/api/v3/record/list')
+    open_breaker(breaker)
+    clock.now = 10
+    return breaker
+
+
+def senselink_breaker(clock):
+    return CircuitBreakerGroup(failure_threshold=1,
+                               recovery_timeout=10,
+                               clock=clock)
+
+
+def test_senselink_probe_slot_released_on_unexpected_error(
+        stub, clock, monkeypatch):
+    client = SenseLinkClient('key',
+                             'secret',
+                             circuit_breaker=senselink_breaker(clock))
+    client.API_BASE_URL = stub.url
+    breaker = half_open_senselink(client, clock)
+
+    def broken(*args, **kwargs):
+        raise ValueError('invalid json')
+
+    monkeypatch.setattr(client, '_request', broken)
+    with pytest.raises(ValueError):
+        client.get('/api/v3/record/list')
+    monkeypatch.undo()
+    client.get('/api/v3/record/list')
+    assert breaker.state == 'closed'
+
+
+def test_senselink_error_code_counts_as_failure(stub, faults, clock):
+    faults.error_rate = 1.0
+    client = SenseLinkClient('key',
+                             'secret',
+                             auto_retry=False,
+                             circuit_breaker=senselink_breaker(clock))
+    client.API_BASE_URL = stub.url
+    # http 200 但响应体 code 为 500, 同样视为服务异常
+    with pytest.raises(SenseLinkClientException) as exc_info:
+        client.get('/api/v3/record/list')
+    assert exc_info.value.errcode == 500
+    assert str(exc_info.value) == 'Error code: 500, message: 服务异常'
+    breaker = client.circuit_breaker.get(client.API_BASE_URL,
+                                         '/api/v3/record/list')
+    assert breaker.state == 'open'
+
+
+def test_async_senselink_probe_slot_released_on_cancel(clock):
+    client = AsyncSenseLinkClient('key',
+                                  'secret',
+                                  circuit_breaker=senselink_breaker(clock))
+    breaker = half_open_senselink(client, clock)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    client._request = hang
+
+    async def run():
+        task = asyncio.ensure_future(client.get('/api/v3/record/list'))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.state == 'half_open'
+    assert breaker.before_call() is not None
+
+
+def fail_fast_limiter(pattern):
+    return RateLimiter([RateLimitRule(pattern, 1)], timeout=0)
+
+
+def test_dingtalk_open_breaker_skips_token_and_rate_limit(
+        dingtalk_client, clock, monkeypatch):
+    breaker = dingtalk_client.circuit_breaker.get(dingtalk_client.API_BASE_URL,
+                                                  SEARCH_URI)
+    open_breaker(breaker)
+    limiter = dingtalk_client.rate_limiter = fail_fast_limiter('/v1.0/yida/*')
+    fetched = []
+    monkeypatch.setattr(dingtalk_client.token_manager, 'get',
+                        lambda: fetched.append(True))
+    with pytest.raises(CircuitOpenError):
+        search(dingtalk_client)
+    assert fetched == []
+    # 熔断的请求未消耗限流配额
+    limiter.acquire(SEARCH_URI, 'key')
+
+
+def test_senselink_open_breaker_skips_rate_limit(clock):
+    limiter = fail_fast_limiter('/api/v3/*')
+    client = SenseLinkClient('key',
+                             'secret',
+                             rate_limiter=limiter,
+                             circuit_breaker=senselink_breaker(clock))
+    open_breaker(
+        client.circuit_breaker.get(client.API_BASE_URL, '/api/v3/record/list'))
+    with pytest.raises(CircuitOpenError):
+        client.get('/api/v3/record/list')
+    limiter.acquire('/api/v3/record/list', 'key')
+
+
+def test_async_senselink_open_breaker_skips_rate_limit(clock):
+    limiter = fail_fast_limiter('/api/v3/*')
+    client = AsyncSenseLinkClient('key',
+                                  'secret',
+                                  rate_limiter=limiter,
+                                  circuit_breaker=senselink_breaker(clock))
+    open_breaker(
+        client.circuit_breaker.get(client.API_BASE_URL, '/api/v3/record/list'))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(client.get('/api/v3/record/list'))
+    limiter.acquire('/api/v3/record/list', 'key')
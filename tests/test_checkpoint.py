@@ -0,0 +1,36 @@
+from dingtalk.storage.memorystorage import MemoryStorage
+
+from lesoon_third_sdk.core.checkpoint import Checkpoint
+
+
+def test_checkpoint_flushes_every_n_items():
+    storage = MemoryStorage()
+    checkpoint = Checkpoint(storage, 'job', flush_every=2)
+    checkpoint.add('a')
+    assert storage.get('job') is None
+    checkpoint.add('b')
+    assert sorted(storage.get('job')) == ['a', 'b']
+    checkpoint.add('c')
+    checkpoint.flush()
+    assert sorted(storage.get('job')) == ['a', 'b', 'c']
+
+
+def test_checkpoint_resumes_from_storage():
+    storage = MemoryStorage()
+    checkpoint = Checkpoint(storage, 'job')
+    checkpoint.add('a')
+    checkpoint.flush()
+    resumed = Checkpoint(storage, 'job')
+    assert 'a' in resumed and 'b' not in resumed
+    assert len(resumed) == 1
+    assert len(Checkpoint(storage, 'other')) == 0
+
+
+def test_checkpoint_clear():
+    storage = MemoryStorage()
+    checkpoint = Checkpoint(storage, 'job')
+    checkpoint.add('a')
+    checkpoint.flush()
+    checkpoint.clear()
+    assert 'a' not in checkpoint
+    assert storage.get('job') is None
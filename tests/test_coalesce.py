@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lesoon_third_sdk.core.coalesce import RequestCoalescer
+
+URI = '/topapi/v2/user/getbymobile'
+
+
+@pytest.fixture
+def coalescer():
+    return RequestCoalescer([URI, '/v1.0/contact/users/*'])
+
+
+def key(coalescer, kwargs=None, method='POST', uri=URI, scope='app'):
+    return coalescer.make_key(method, uri, kwargs or {}, scope)
+
+
+def test_key_ignores_signature_params(coalescer):
+    assert key(coalescer, {'params': {'timestamp': 1, 'sign': 'a', 'q': 1}}) \
+        == key(coalescer, {'params': {'timestamp': 2, 'sign': 'b', 'q': 1}})
+
+
+BASE_KWARGS = {
+    'params': {
+        'q': 1
+    },
+    'data': {
+        'mobile': '13800000000'
+    },
+    'headers': {
+        'x-acs-dingtalk-access-token': 'user-a'
+    }
+}
+
+
+@pytest.mark.parametrize('changed, options', [
+    ({}, {
+        'scope': 'other-app'
+    }),
+    ({}, {
+        'method': 'GET'
+    }),
+    ({
+        'params': {
+            'q': 2
+        }
+    }, {}),
+    ({
+        'data': {
+            'mobile': '13800000001'
+        }
+    }, {}),
+    ({
+        'headers': {
+            'x-acs-dingtalk-access-token': 'user-b'
+        }
+    }, {}),
+])
+def test_key_isolation(coalescer, changed, options):
+    assert key(coalescer, BASE_KWARGS) != key(coalescer, {
+        **BASE_KWARGS,
+        **changed
+    }, **options)
+
+
+def test_key_user_paths_not_shared(coalescer):
+    assert key(coalescer, uri='/v1.0/contact/users/me') != key(
+        coalescer, uri='/v1.0/contact/users/123')
+
+
+def test_unmatched_uri_not_coalesced(coalescer):
+    assert key(coalescer, uri='/topapi/user/get') is None
+    calls = []
+    for _ in range(2):
+        coalescer.call('POST', '/topapi/user/get', {},
+                       lambda: calls.append(True))
+    assert len(calls) == 2
+    assert coalescer.stats() == {'leaders': 0, 'followers': 0}
+
+
+def run_concurrently(coalescer, n, func, kwargs_of=lambda i: {}):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def leader_func():
+        calls.append(True)
+        started.set()
+        release.wait(5)
+        return func()
+
+    with ThreadPoolExecutor(n) as executor:
+        first = executor.submit(coalescer.call, 'POST', URI, kwargs_of(0),
+                                leader_func, 'app')
+        assert started.wait(5)
+        rest = [
+            executor.submit(coalescer.call, 'POST', URI, kwargs_of(i),
+                            leader_func, 'app') for i in range(1, n)
+        ]
+        # 等待其余调用加入或发起请求
+        while coalescer.leaders + coalescer.followers < n:
+            time.sleep(0.01)
+        release.set()
+        futures = [first] + rest
+        return calls, futures
+
+
+def test_call_shares_inflight_request(coalescer):
+    result = {'userid': 'u1'}
+    calls, futures = run_concurrently(coalescer, 4, lambda: result)
+    assert [f.result() for f in futures] == [result] * 4
+    assert len(calls) == 1
+    assert coalescer.stats() == {'leaders': 1, 'followers': 3}
+    # 结束后不缓存结果
+    coalescer.call('POST', URI, {}, lambda: calls.append(True), 'app')
+    assert len(calls) == 2
+
+
+def test_call_isolates_different_keys(coalescer):
+    calls, futures = run_concurrently(
+        coalescer,
+        3,
+        lambda: 'ok',
+        kwargs_of=lambda i: {'data': {
+            'mobile': str(i)
+        }})
+    assert [f.result() for f in futures] == ['ok'] * 3
+    assert len(calls) == 3
+
+
+def test_call_propagates_exception_to_followers(coalescer):
+
+    def fail():
+        raise RuntimeError('boom')
+
+    _, futures = run_concurrently(coalescer, 3, fail)
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+
+
+def test_acall_shares_request_and_survives_cancel(coalescer):
+    calls = []
+
+    async def request():
+        calls.append(True)
+        await asyncio.sleep(0.05)
+        return 'ok'
+
+    async def run():
+        tasks = [
+            asyncio.ensure_future(
+                coalescer.acall('POST', URI, {}, request, 'app'))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        tasks[0].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == ['ok', 'ok']
+    assert len(calls) == 1
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from lesoon_third_sdk.core.concurrent import chunked
+from lesoon_third_sdk.core.concurrent import fan_out
+from lesoon_third_sdk.core.concurrent import fan_out_grouped
+
+
+def test_fan_out_grouped_keeps_task_order_within_group():
+    release = threading.Event()
+
+    def work(task):
+        # 组内首个任务最后完成
+        if task == ('a', 0):
+            release.wait(5)
+        elif task == ('a', 1):
+            release.set()
+        return task
+
+    groups = [('a', [('a', 0), ('a', 1)]), ('b', [('b', 0)])]
+    results = dict(fan_out_grouped(work, groups, max_workers=3))
+    assert results['a'].result == [('a', 0), ('a', 1)]
+    assert results['b'].result == [('b', 0)]
+
+
+def test_fan_out_grouped_records_failed_tasks():
+
+    def work(task):
+        if task == 2:
+            raise ValueError(task)
+        return task
+
+    (key, bulk), = fan_out_grouped(work, [('g', [1, 2, 3])])
+    assert key == 'g'
+    assert bulk.result == [1, 3]
+    assert not bulk.success
+    assert bulk.errors[0].chunk == [2]
+    assert isinstance(bulk.errors[0].exception, ValueError)
+
+
+def test_fan_out_grouped_yields_empty_group():
+    (key, bulk), = fan_out_grouped(lambda task: task, [('g', [])])
+    assert key == 'g'
+    assert bulk.success and bulk.result == []
+
+
+def test_fan_out_grouped_bounds_pending_groups():
+    pulled = []
+
+    def groups():
+        for key in range(10):
+            pulled.append(key)
+            yield key, [key]
+
+    results = fan_out_grouped(lambda task: task,
+                              groups(),
+                              max_workers=1,
+                              max_pending=2)
+    next(results)
+    assert len(pulled) == 2
+    results.close()
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+    with pytest.raises(ValueError):
+        list(chunked([1], 0))
+
+
+def test_fan_out_merges_in_chunk_order():
+    release = threading.Event()
+
+    def work(chunk):
+        # 首个分块最后完成
+        if chunk[0] == 0:
+            release.wait(5)
+        else:
+            release.set()
+        return [item * 10 for item in chunk]
+
+    bulk = fan_out(work, chunked(range(5), 2), max_workers=3)
+    assert bulk.success
+    assert bulk.result == [0, 10, 20, 30, 40]
+
+
+def test_fan_out_records_failed_chunk():
+
+    def work(chunk):
+        if 2 in chunk:
+            raise ValueError(chunk)
+        return chunk
+
+    bulk = fan_out(work, chunked(range(5), 2))
+    assert bulk.result == [0, 1, 4]
+    assert not bulk.success
+    assert [error.chunk for error in bulk.errors] == [[2, 3]]
+    assert isinstance(bulk.errors[0].exception, ValueError)
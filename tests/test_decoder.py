@@ -0,0 +1,77 @@
+import types
+
+import pytest
+from dingtalk.core.utils import ObjectDict
+
+from lesoon_third_sdk.core import decoder as decoder_module
+from lesoon_third_sdk.core.decoder import JsonDecoder
+
+BACKENDS = ['auto', 'json']
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_object_dict(backend):
+    result = JsonDecoder(backend).loads(b'{"a": {"b": 1}, "c": [{"d": 2}]}')
+    assert isinstance(result, ObjectDict)
+    assert result.a.b == 1
+    assert result.c[0].d == 2
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_plain_dict(backend):
+    result = JsonDecoder(backend, object_dict=False).loads(b'{"a": {"b": 1}}')
+    assert type(result) is dict
+    assert type(result['a']) is dict
+
+
+@pytest.mark.parametrize('object_dict', [True, False])
+def test_invalid_utf8_ignored(object_dict):
+    decoder = JsonDecoder(object_dict=object_dict)
+    assert decoder.loads(b'{"name": "a\xffb"}') == {'name': 'ab'}
+
+
+@pytest.mark.parametrize('object_dict', [True, False])
+def test_control_characters_allowed(object_dict):
+    decoder = JsonDecoder(object_dict=object_dict)
+    assert decoder.loads(b'{"name": "a\tb\nc"}') == {'name': 'a\tb\nc'}
+
+
+def test_str_content():
+    assert JsonDecoder(object_dict=False).loads('{"name": "员工"}') == {
+        'name': '员工'
+    }
+
+
+def test_falls_back_to_json_when_orjson_fails(monkeypatch):
+    calls = []
+
+    def loads(content):
+        calls.append(content)
+        raise ValueError('unexpected character')
+
+    monkeypatch.setattr(decoder_module, 'orjson',
+                        types.SimpleNamespace(loads=loads))
+    decoder = JsonDecoder(object_dict=False)
+    assert decoder.use_orjson
+    assert decoder.loads(b'{"a": 1}') == {'a': 1}
+    assert calls == [b'{"a": 1}']
+
+
+def test_without_orjson(monkeypatch):
+    monkeypatch.setattr(decoder_module, 'orjson', None)
+    decoder = JsonDecoder(object_dict=False)
+    assert not decoder.use_orjson
+    assert decoder.loads(b'{"a": 1}') == {'a': 1}
+    with pytest.raises(ImportError):
+        JsonDecoder('orjson', object_dict=False)
+
+
+def test_json_backend_skips_orjson():
+    assert not JsonDecoder('json', object_dict=False).use_orjson
+    # 返回 ObjectDict 时 orjson 不支持 object_hook
+    assert not JsonDecoder('orjson').use_orjson
+
+
+def test_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        JsonDecoder('ujson')
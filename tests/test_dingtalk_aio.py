@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from dingtalk.core.exceptions import DingTalkClientException
+
+from lesoon_third_sdk.core.breaker import CircuitBreakerGroup
+from lesoon_third_sdk.core.breaker import CircuitOpenError
+from lesoon_third_sdk.dingtalk.aio import AsyncNewAppKeyClient
+from lesoon_third_sdk.dingtalk.api import YiDaApi
+from lesoon_third_sdk.dingtalk.retry import RetryPolicy
+from lesoon_third_sdk.dingtalk.token import AsyncTokenManager
+
+
+def new_client(stub, **kwargs):
+    kwargs.setdefault('retry_policy',
+                      RetryPolicy(max_retries=2, base_delay=0, jitter=False))
+    client = AsyncNewAppKeyClient(corp_id='corp',
+                                  app_key='key',
+                                  app_secret='secret',
+                                  agent_id=1,
+                                  **kwargs)
+    client.API_BASE_URL = stub.url
+    return client
+
+
+def run(stub, func, **kwargs):
+
+    async def main():
+        async with new_client(stub, **kwargs) as client:
+            return await func(client)
+
+    return asyncio.run(main())
+
+
+def search(client):
+    return client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+
+
+def test_search_form_datas(stub):
+    result = run(stub, search)
+    assert result['totalCount'] == 250
+
+
+def test_iter_form_datas(stub):
+
+    async def collect(client):
+        return [
+            item async for item in client.yida.iter_form_datas(
+                'APP', 'token', 'user', 'FORM', concurrency=2)
+        ]
+
+    assert len(run(stub, collect)) == 250
+
+
+def test_http_error_raises(stub, faults):
+    faults.error_rate = 1.0
+    with pytest.raises(DingTalkClientException) as exc_info:
+        run(stub, search)
+    assert exc_info.value.errcode == 'ServiceUnavailable'
+
+
+def test_too_fast_retries_exhausted_raises(stub, faults):
+    faults.too_fast_rate = 1.0
+    with pytest.raises(DingTalkClientException) as exc_info:
+        run(stub, search)
+    assert exc_info.value.errcode == 'failure.operation.requestTooFast'
+
+
+def test_probe_slot_released_on_cancel(stub):
+    now = [0.0]
+    group = CircuitBreakerGroup(failure_threshold=1,
+                                recovery_timeout=10,
+                                clock=lambda: now[0])
+
+    async def cancel_probe(client):
+        breaker = group.get(client.API_BASE_URL,
+                            '/v1.0/yida/forms/instances/search')
+        breaker.before_call()
+        breaker.on_failure()
+        now[0] = 10
+        # 先取得 token, 使探测请求卡在发送阶段
+        await client.token_manager.get()
+
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        request = client._request
+        client._request = hang
+        task = asyncio.ensure_future(search(client))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert breaker.state == 'half_open'
+        client._request = request
+        result = await search(client)
+        assert breaker.state == 'closed'
+        return result
+
+    assert run(stub, cancel_probe, circuit_breaker=group)['totalCount'] == 250
+
+
+def test_open_breaker_skips_token(stub, monkeypatch):
+    group = CircuitBreakerGroup(failure_threshold=1)
+
+    async def open_circuit(client):
+        breaker = group.get(client.API_BASE_URL,
+                            '/v1.0/yida/forms/instances/search')
+        breaker.before_call()
+        breaker.on_failure()
+        fetched = []
+
+        async def get():
+            fetched.append(True)
+
+        monkeypatch.setattr(client.token_manager, 'get', get)
+        with pytest.raises(CircuitOpenError):
+            await search(client)
+        return fetched
+
+    assert run(stub, open_circuit, circuit_breaker=group) == []
+
+
+def test_async_api_groups_do_not_inherit_sync_methods(stub):
+    client = new_client(stub)
+    assert isinstance(client.token_manager, AsyncTokenManager)
+    assert not isinstance(client.yida, YiDaApi)
+    # 同步的 access_token 属性不可用, 避免误用返回的协程
+    assert not hasattr(client, 'access_token')
@@ -0,0 +1,181 @@
+import datetime
+
+import pytest
+from dingtalk.core.exceptions import DingTalkClientException
+from dingtalk.storage.memorystorage import MemoryStorage
+
+from lesoon_third_sdk.core.checkpoint import Checkpoint
+from lesoon_third_sdk.dingtalk.client import AppKeyClient
+
+
+@pytest.fixture
+def client(stub):
+    client = AppKeyClient(corp_id='corp',
+                          app_key='key',
+                          app_secret='secret',
+                          agent_id=1)
+    client.API_BASE_URL = stub.url
+    return client
+
+
+def fake_report(calls, fail=()):
+
+    def get_report(userid, names, from_date, to_date):
+        calls.append((userid, from_date, to_date))
+        if (userid, from_date) in fail:
+            raise DingTalkClientException(errcode=15, errmsg='钉钉远程调用异常')
+        return {'result': {'userid': userid, 'from_date': from_date}}
+
+    return get_report
+
+
+def whole_days(first, last):
+    return (datetime.datetime.combine(first, datetime.time.min),
+            datetime.datetime.combine(last, datetime.time(23, 59, 59)))
+
+
+def test_split_date_range_aligns_whole_days(client):
+    windows = client.attendance.split_date_range('2024-01-15 08:30:00',
+                                                 '2024-03-01 10:00:00')
+    assert windows == [
+        whole_days(datetime.date(2024, 1, 15), datetime.date(2024, 2, 14)),
+        whole_days(datetime.date(2024, 2, 15), datetime.date(2024, 3, 1)),
+    ]
+
+
+def test_split_date_range_single_day(client):
+    day = datetime.datetime(2024, 1, 15, 12)
+    assert client.attendance.split_date_range(
+        day, day, max_days=7) == [whole_days(day.date(), day.date())]
+
+
+def test_get_column_val_bulk_yields_each_user_once(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(client.attendance, 'get_column_val', fake_report(calls))
+    results = dict(
+        client.attendance.get_column_val_bulk(['a', 'b', 'a'], ['col'],
+                                              '2024-01-01 00:00:00',
+                                              '2024-02-10 00:00:00',
+                                              max_workers=2))
+    assert sorted(results) == ['a', 'b']
+    assert len(calls) == 4
+    for userid, bulk in results.items():
+        assert bulk.success
+        # 各窗口的结果按时间顺序排列
+        assert bulk.result == [{
+            'userid': userid,
+            'from_date': datetime.datetime(2024, 1, 1)
+        }, {
+            'userid': userid,
+            'from_date': datetime.datetime(2024, 2, 1)
+        }]
+
+
+def test_get_leave_time_by_names_bulk(client):
+    results = dict(
+        client.attendance.get_leave_time_by_names_bulk(['a', 'b'], ['年假'],
+                                                       '2024-01-01 00:00:00',
+                                                       '2024-01-10 00:00:00'))
+    assert sorted(results) == ['a', 'b']
+    assert all(
+        bulk.success and bulk.result == [{}] for bulk in results.values())
+
+
+def test_bulk_checkpoint_skips_done_users_and_retries_failed(
+        client, monkeypatch):
+    storage = MemoryStorage()
+    calls = []
+    monkeypatch.setattr(
+        client.attendance, 'get_leave_time_by_names',
+        fake_report(calls, fail={('b', datetime.datetime(2024, 2, 1))}))
+    checkpoint = Checkpoint(storage, 'attendance')
+    results = dict(
+        client.attendance.get_leave_time_by_names_bulk(['a', 'b'], ['年假'],
+                                                       '2024-01-01 00:00:00',
+                                                       '2024-02-10 00:00:00',
+                                                       checkpoint=checkpoint))
+    assert results['a'].success
+    assert not results['b'].success
+    assert len(results['b'].errors) == 1
+    assert results['b'].result == [{
+        'userid': 'b',
+        'from_date': datetime.datetime(2024, 1, 1)
+    }]
+    # 中断后恢复时只重试失败的用户
+    assert storage.get('attendance') == ['a']
+    calls.clear()
+    monkeypatch.setattr(client.attendance, 'get_leave_time_by_names',
+                        fake_report(calls))
+    checkpoint = Checkpoint(storage, 'attendance')
+    resumed = dict(
+        client.attendance.get_leave_time_by_names_bulk(['a', 'b'], ['年假'],
+                                                       '2024-01-01 00:00:00',
+                                                       '2024-02-10 00:00:00',
+                                                       checkpoint=checkpoint))
+    assert list(resumed) == ['b']
+    assert {userid for userid, _, _ in calls} == {'b'}
+    assert 'a' in checkpoint and 'b' in checkpoint
+
+
+def test_bulk_checkpoint_records_user_when_caller_moves_on(client, monkeypatch):
+    storage = MemoryStorage()
+    monkeypatch.setattr(client.attendance, 'get_column_val', fake_report([]))
+    checkpoint = Checkpoint(storage, 'attendance')
+    results = client.attendance.get_column_val_bulk(['a', 'b', 'c'], ['col'],
+                                                    '2024-01-01 00:00:00',
+                                                    '2024-01-10 00:00:00',
+                                                    max_workers=1,
+                                                    checkpoint=checkpoint)
+    first, _ = next(results)
+    second, _ = next(results)
+    results.close()
+    # 调用方取下一个结果时才记录上一个用户, 处理中被中断的用户在恢复时重新获取
+    assert storage.get('attendance') == [first]
+    assert second != first
+
+
+def test_list_v2_bulk_chunks_and_keeps_order(client, monkeypatch):
+    chunks = []
+    list_v2 = client.employeerm.list_v2
+
+    def recording_list_v2(userid_list, *args, **kwargs):
+        chunks.append(list(userid_list))
+        return list_v2(userid_list, *args, **kwargs)
+
+    monkeypatch.setattr(client.employeerm, 'list_v2', recording_list_v2)
+    userids = [str(i) for i in range(250)]
+    bulk = client.employeerm.list_v2_bulk(userids, chunk_size=500)
+    assert bulk.success
+    # chunk_size 不超过接口上限
+    assert sorted(len(chunk) for chunk in chunks) == [50, 100, 100]
+    assert [item['userid'] for item in bulk.result] == userids
+
+
+def test_list_v2_bulk_records_failed_chunk(client, monkeypatch):
+    list_v2 = client.employeerm.list_v2
+
+    def failing_list_v2(userid_list, *args, **kwargs):
+        if '2' in userid_list:
+            raise DingTalkClientException(errcode=15, errmsg='钉钉远程调用异常')
+        return list_v2(userid_list, *args, **kwargs)
+
+    monkeypatch.setattr(client.employeerm, 'list_v2', failing_list_v2)
+    bulk = client.employeerm.list_v2_bulk([str(i) for i in range(5)],
+                                          chunk_size=2)
+    assert [item['userid'] for item in bulk.result] == ['0', '1', '4']
+    assert [error.chunk for error in bulk.errors] == [['2', '3']]
+    assert isinstance(bulk.errors[0].exception, DingTalkClientException)
+
+
+def test_listdimission_bulk_chunks(client, monkeypatch):
+    chunks = []
+
+    def listdimission(userid_list):
+        chunks.append(list(userid_list))
+        return {'result': [{'userid': userid} for userid in userid_list]}
+
+    monkeypatch.setattr(client.employeerm, 'listdimission', listdimission)
+    userids = [str(i) for i in range(120)]
+    bulk = client.employeerm.listdimission_bulk(userids, chunk_size=100)
+    assert sorted(len(chunk) for chunk in chunks) == [20, 50, 50]
+    assert [item['userid'] for item in bulk.result] == userids
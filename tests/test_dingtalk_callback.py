@@ -0,0 +1,83 @@
+import base64
+import json
+import os
+import threading
+
+import pytest
+
+from lesoon_third_sdk.dingtalk.base import DingtalkCallbackCrypto
+from lesoon_third_sdk.dingtalk.callback import CallbackPipeline
+from lesoon_third_sdk.dingtalk.callback import CallbackQueueFull
+
+
+@pytest.fixture
+def crypto():
+    aes_key = base64.b64encode(os.urandom(32)).decode().rstrip('=')
+    return DingtalkCallbackCrypto('app-key', 'token', aes_key)
+
+
+def callback(crypto, event):
+    ciphertext = crypto.encrypt(json.dumps(event))
+    return (crypto.generate_signature('nonce', '1',
+                                      ciphertext), '1', 'nonce', ciphertext)
+
+
+def test_handle_starts_workers_lazily(crypto):
+    pipeline = CallbackPipeline(crypto, workers=2)
+    events = []
+    pipeline.register('user_add_org', events.append)
+    assert pipeline.metrics()['workers'] == 0
+    pipeline.handle(*callback(crypto, {
+        'EventType': 'user_add_org',
+        'EventId': '1'
+    }))
+    pipeline.join()
+    assert [event['EventId'] for event in events] == ['1']
+    assert pipeline.metrics()['workers'] == 2
+    pipeline.stop()
+    assert pipeline.metrics()['workers'] == 0
+
+
+def test_handle_deduplicates_and_skips_check_url(crypto):
+    pipeline = CallbackPipeline(crypto)
+    events = []
+    pipeline.on()(events.append)
+    for event_id in ('1', '1', '2'):
+        pipeline.handle(*callback(crypto, {
+            'EventType': 'user_add_org',
+            'EventId': event_id
+        }))
+    pipeline.handle(*callback(crypto, {'EventType': 'check_url'}))
+    pipeline.join()
+    pipeline.stop()
+    metrics = pipeline.metrics()
+    assert sorted(event['EventId'] for event in events) == ['1', '2']
+    assert metrics['received'] == 4
+    assert metrics['duplicated'] == 1
+    assert metrics['processed'] == 2
+
+
+def test_queue_full_allows_redelivery(crypto):
+    pipeline = CallbackPipeline(crypto, workers=1, maxsize=1)
+    started, release = threading.Event(), threading.Event()
+
+    def block(event):
+        started.set()
+        release.wait(5)
+
+    pipeline.on()(block)
+    pipeline.handle(*callback(crypto, {'EventType': 'a', 'EventId': '1'}))
+    assert started.wait(5)
+    pipeline.handle(*callback(crypto, {'EventType': 'a', 'EventId': '2'}))
+    with pytest.raises(CallbackQueueFull):
+        pipeline.handle(*callback(crypto, {'EventType': 'a', 'EventId': '3'}))
+    release.set()
+    pipeline.join()
+    # 未入队的事件不计入去重, 重推时可再次入队
+    pipeline.handle(*callback(crypto, {'EventType': 'a', 'EventId': '3'}))
+    pipeline.join()
+    pipeline.stop()
+    metrics = pipeline.metrics()
+    assert metrics['rejected'] == 1
+    assert metrics['processed'] == 3
+    assert metrics['queue_high_watermark'] == 1
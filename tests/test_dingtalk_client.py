@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+from dingtalk.core.exceptions import DingTalkClientException
+
+from lesoon_third_sdk.dingtalk.cache import create_request_coalescer
+from lesoon_third_sdk.dingtalk.client import AppKeyClient
+from lesoon_third_sdk.dingtalk.client import NewAppKeyClient
+from lesoon_third_sdk.dingtalk.retry import RetryPolicy
+
+
+@pytest.fixture
+def client(stub):
+    client = NewAppKeyClient(corp_id='corp',
+                             app_key='key',
+                             app_secret='secret',
+                             agent_id=1,
+                             retry_policy=RetryPolicy(max_retries=2,
+                                                      base_delay=0,
+                                                      jitter=False))
+    client.API_BASE_URL = stub.url
+    return client
+
+
+def test_search_form_datas(client):
+    result = client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+    assert result['totalCount'] == 250
+    assert len(result['data']) == 10
+
+
+def test_http_error_raises(client, faults):
+    faults.error_rate = 1.0
+    with pytest.raises(DingTalkClientException) as exc_info:
+        client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+    assert exc_info.value.errcode == 'ServiceUnavailable'
+
+
+def test_too_fast_retries_exhausted_raises(client, faults):
+    faults.too_fast_rate = 1.0
+    with pytest.raises(DingTalkClientException) as exc_info:
+        client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+    assert exc_info.value.errcode == 'failure.operation.requestTooFast'
+
+
+def test_iter_form_datas_propagates_error(client, faults):
+    faults.error_rate = 1.0
+    with pytest.raises(DingTalkClientException):
+        list(client.yida.iter_form_datas('APP', 'token', 'user', 'FORM'))
+
+
+def test_error_response_decoded_once(client, faults, monkeypatch):
+    faults.error_rate = 1.0
+    calls = []
+    decode = client._decode_result
+
+    def counting_decode(res):
+        if res.status_code >= 400:
+            calls.append(res)
+        return decode(res)
+
+    monkeypatch.setattr(client, '_decode_result', counting_decode)
+    with pytest.raises(DingTalkClientException):
+        client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+    assert len(calls) == 1
+
+
+def test_retry_times_kwarg_rejected(client):
+    with pytest.raises(TypeError):
+        client.post('/v1.0/yida/forms/instances/search', {}, retry_times=1)
+
+
+def test_coalesced_request_retries_expired_token(stub, monkeypatch):
+    client = AppKeyClient(corp_id='corp',
+                          app_key='key',
+                          app_secret='secret',
+                          agent_id=1,
+                          coalescer=create_request_coalescer())
+    client.API_BASE_URL = stub.url
+    request = client._request
+    calls = []
+
+    def expire_once(method, url, **kwargs):
+        if url == '/gettoken':
+            return request(method, url, **kwargs)
+        calls.append(url)
+        if len(calls) == 1:
+            raise DingTalkClientException(errcode=40014,
+                                          errmsg='不合法的access_token',
+                                          client=client)
+        return request(method, url, **kwargs)
+
+    monkeypatch.setattr(client, '_request', expire_once)
+    results = []
+    thread = threading.Thread(
+        target=lambda: results.append(client.user.get_by_mobile('138')),
+        daemon=True)
+    thread.start()
+    thread.join(5)
+    # 重新获取 token 后的重试不应等待自身的合并请求
+    assert not thread.is_alive()
+    assert results == [{'errcode': 0, 'errmsg': 'ok', 'result': {}}]
+    assert len(calls) == 2
@@ -0,0 +1,64 @@
+import base64
+import os
+
+import pytest
+
+from lesoon_third_sdk.dingtalk.base import DingtalkCallbackCrypto
+
+
+@pytest.fixture
+def crypto():
+    aes_key = base64.b64encode(os.urandom(32)).decode().rstrip('=')
+    return DingtalkCallbackCrypto('app-key', 'token', aes_key)
+
+
+def sign(crypto, ciphertext):
+    return (crypto.generate_signature('nonce', '1',
+                                      ciphertext), '1', 'nonce', ciphertext)
+
+
+def encrypt_raw(crypto, raw: bytes) -> str:
+    encryptor = crypto._cipher.encryptor()
+    return base64.b64encode(encryptor.update(raw) +
+                            encryptor.finalize()).decode()
+
+
+def test_decrypt_round_trip(crypto):
+    message = sign(crypto, crypto.encrypt('{"EventType": "check_url"}'))
+    assert crypto.decrypt(*message) == '{"EventType": "check_url"}'
+
+
+@pytest.mark.parametrize(
+    'raw',
+    [
+        # 填充字节为 0
+        b'\x00' * 32,
+        # 填充字节超过 32
+        b'\x21' * 32,
+        # 去除填充后不足以读取消息长度
+        b'a' * 15 + b'\x01',
+        # 消息长度超出实际内容
+        b'a' * 16 + b'\x00\x00\x00\xff' + b'a' * 11 + b'\x01',
+        # 消息长度为负数
+        b'a' * 16 + b'\xff\xff\xff\xff' + b'a' * 11 + b'\x01',
+    ])
+def test_decrypt_corrupt_plaintext_raises_value_error(crypto, raw):
+    with pytest.raises(ValueError):
+        crypto.decrypt(*sign(crypto, encrypt_raw(crypto, raw)))
+
+
+def test_decrypt_many_skips_invalid(crypto):
+    valid = sign(crypto, crypto.encrypt('ok'))
+    messages = [
+        valid,
+        sign(crypto, encrypt_raw(crypto, b'\x00' * 32)),
+        sign(crypto, encrypt_raw(crypto, b'a' * 15 + b'\x01')),
+        sign(crypto, 'not base64!'),
+        sign(crypto,
+             base64.b64encode(b'short').decode()),
+        ('bad-signature',) + valid[1:],
+    ]
+    assert crypto.decrypt_many(messages,
+                               skip_invalid=True) == ['ok'] + [None] * 5
+    with pytest.raises(ValueError):
+        crypto.decrypt_many(messages)
@@ -0,0 +1,103 @@
+import pytest
+from dingtalk.core.exceptions import DingTalkClientException
+
+from lesoon_third_sdk.core.instrument import HistogramAggregator
+from lesoon_third_sdk.core.instrument import RequestInfo
+from lesoon_third_sdk.dingtalk.client import NewAppKeyClient
+from lesoon_third_sdk.dingtalk.retry import RetryPolicy
+
+KEY = ('dingtalk', 'POST', '/v1.0/yida/forms/instances/search')
+
+
+def new_info(latency, **kwargs):
+    return RequestInfo(client='dingtalk',
+                       method='GET',
+                       endpoint='/topapi/user/{id}',
+                       latency=latency,
+                       **kwargs)
+
+
+@pytest.fixture
+def aggregator():
+    return HistogramAggregator(buckets=(0.1, 0.01, 1))
+
+
+@pytest.fixture
+def client(stub, aggregator):
+    client = NewAppKeyClient(corp_id='corp',
+                             app_key='key',
+                             app_secret='secret',
+                             agent_id=1,
+                             retry_policy=RetryPolicy(max_retries=2,
+                                                      base_delay=0,
+                                                      jitter=False),
+                             instrumentation=aggregator)
+    client.API_BASE_URL = stub.url
+    return client
+
+
+def test_histogram_buckets(aggregator):
+    # 桶上界包含在内, 超出最大上界的计入 +Inf
+    for latency in (0.005, 0.01, 0.05, 0.5, 3):
+        aggregator.after_response(new_info(latency, bytes_in=10, bytes_out=2))
+    data = aggregator.snapshot()[('dingtalk', 'GET', '/topapi/user/{id}')]
+    assert data['buckets'] == {0.01: 2, 0.1: 1, 1: 1, float('inf'): 1}
+    assert data['count'] == 5
+    assert data['sum'] == pytest.approx(3.565)
+    assert data['bytes_in'] == 50
+    assert data['bytes_out'] == 10
+    assert data['errors'] == {}
+
+
+def test_requests_aggregated(client, aggregator):
+    client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+    client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+    data = aggregator.snapshot()[KEY]
+    assert data['count'] == 2
+    assert data['retries'] == 0
+    assert data['bytes_in'] > 0 and data['bytes_out'] > 0
+
+
+def test_retries_and_errcode_labels(client, aggregator, faults):
+    faults.too_fast_rate = 1.0
+    with pytest.raises(DingTalkClientException):
+        client.yida.search_form_datas('APP', 'token', 'user', 'FORM')
+    data = aggregator.snapshot()[KEY]
+    # 首次请求及两次重试均失败, 重试钩子只在重试前调用
+    assert data['count'] == 3
+    assert data['retries'] == 2
+    assert data['errors'] == {'failure.operation.requestTooFast': 3}
+
+
+def test_to_prometheus(aggregator):
+    aggregator.after_response(new_info(0.05))
+    aggregator.after_response(
+        new_info(2,
+                 errcode='a"b',
+                 exception=DingTalkClientException(errcode='a"b',
+                                                   errmsg='error')))
+    aggregator.on_retry(new_info(0), 1)
+    labels = 'client="dingtalk",method="GET",endpoint="/topapi/user/{id}"'
+    name = 'lesoon_third_sdk_request_duration_seconds'
+    lines = aggregator.to_prometheus().splitlines()
+    assert lines[:2] == [
+        f'# HELP {name} SDK http request latency.', f'# TYPE {name} histogram'
+    ]
+    assert lines[2:8] == [
+        f'{name}_bucket{{{labels},le="0.01"}} 0',
+        f'{name}_bucket{{{labels},le="0.1"}} 1',
+        f'{name}_bucket{{{labels},le="1.0"}} 1',
+        f'{name}_bucket{{{labels},le="+Inf"}} 2',
+        f'{name}_sum{{{labels}}} 2.05',
+        f'{name}_count{{{labels}}} 2',
+    ]
+    assert f'lesoon_third_sdk_request_retries_total{{{labels}}} 1' in lines
+    assert ('lesoon_third_sdk_request_errors_total'
+            f'{{{labels},errcode="a\\"b"}} 1') in lines
+    assert '# TYPE lesoon_third_sdk_request_errors_total counter' in lines
+
+
+def test_reset(aggregator):
+    aggregator.after_response(new_info(0.05))
+    aggregator.reset()
+    assert aggregator.snapshot() == {}
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+
+import pytest
+
+from lesoon_third_sdk.core.pagination import AsyncPaginator
+from lesoon_third_sdk.core.pagination import Paginator
+from lesoon_third_sdk.dingtalk.client import NewAppKeyClient
+
+TOTAL = 25
+PAGE_SIZE = 10
+
+
+def fetch_page(page):
+    start = (page - 1) * PAGE_SIZE
+    return {
+        'total': TOTAL,
+        'data': [{
+            'id': i
+        } for i in range(start, min(start + PAGE_SIZE, TOTAL))]
+    }
+
+
+def make_paginator(start_page=1, prefetch=False):
+    return Paginator(fetch_page,
+                     page_size=PAGE_SIZE,
+                     get_items=lambda result: result['data'],
+                     get_total=lambda result: result['total'],
+                     start_page=start_page,
+                     prefetch=prefetch)
+
+
+async def async_fetch_page(page):
+    return fetch_page(page)
+
+
+def collect_async(start_page=1, after=None):
+
+    async def collect():
+        paginator = AsyncPaginator(async_fetch_page,
+                                   page_size=PAGE_SIZE,
+                                   get_items=lambda result: result['data'],
+                                   get_total=lambda result: result['total'],
+                                   start_page=start_page,
+                                   concurrency=2)
+        return [item['id'] async for item in paginator.items(after=after)]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_paginator_reads_all_pages(prefetch):
+    ids = [item['id'] for item in make_paginator(prefetch=prefetch)]
+    assert ids == list(range(TOTAL))
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_paginator_resume_after_cursor(prefetch):
+    paginator = make_paginator(start_page=2, prefetch=prefetch)
+    ids = [item['id'] for item in paginator.items(after=13)]
+    assert ids == list(range(14, TOTAL))
+
+
+def test_paginator_resume_cursor_type_mismatch():
+    ids = [
+        item['id'] for item in make_paginator(start_page=2).items(after='13')
+    ]
+    assert ids == list(range(14, TOTAL))
+
+
+def test_paginator_missing_cursor_yields_everything(caplog):
+    with caplog.at_level(logging.WARNING):
+        ids = [
+            item['id'] for item in make_paginator(start_page=2).items(after=999)
+        ]
+    assert ids == list(range(10, TOTAL))
+    assert '未找到断点记录' in caplog.text
+
+
+def test_async_paginator_resume():
+    assert collect_async() == list(range(TOTAL))
+    assert collect_async(start_page=2, after=13) == list(range(14, TOTAL))
+    assert collect_async(start_page=2, after=999) == list(range(10, TOTAL))
+
+
+@pytest.mark.parametrize('key', ['current_page', 'page_size'])
+def test_iter_form_datas_rejects_page_kwargs(key):
+    client = NewAppKeyClient(corp_id='corp',
+                             app_key='key',
+                             app_secret='secret',
+                             agent_id=1)
+    with pytest.raises(TypeError):
+        client.yida.iter_form_datas('APP', 'token', 'user', 'FORM', **{key: 1})
+
+
+def test_iter_form_datas_resume(stub):
+    client = NewAppKeyClient(corp_id='corp',
+                             app_key='key',
+                             app_secret='secret',
+                             agent_id=1)
+    client.API_BASE_URL = stub.url
+    items = list(
+        client.yida.iter_form_datas('APP',
+                                    'token',
+                                    'user',
+                                    'FORM',
+                                    start_page=2,
+                                    after_instance_id='FINST-00000149'))
+    assert items[0]['formInstanceId'] == 'FINST-00000150'
+    assert len(items) == 100
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from lesoon_third_sdk.core.payload import format_payload
+from lesoon_third_sdk.core.payload import PayloadLogConfig
+from lesoon_third_sdk.core.payload import REDACTED
+
+
+@pytest.fixture
+def config():
+    return PayloadLogConfig()
+
+
+@pytest.mark.parametrize('key', [
+    'appSecret', 'APPSECRET', 'app_secret', 'secretKey', 'secret_key', 'sign',
+    'signature', 'Signature', 'Access_Token', 'Mobile'
+])
+def test_dict_keys_redacted_case_insensitive(config, key):
+    payload = {key: 'sensitive', 'userId': 1}
+    assert json.loads(format_payload(payload, config)) == {
+        key: REDACTED,
+        'userId': 1
+    }
+
+
+def test_nested_dict_redacted(config):
+    payload = {'data': [{'appKey': 'key', 'SecretKey': 'sensitive'}]}
+    assert json.loads(format_payload(payload, config)) == {
+        'data': [{
+            'appKey': 'key',
+            'SecretKey': REDACTED
+        }]
+    }
+
+
+@pytest.mark.parametrize('text', [
+    'app_key=key&SIGN=sensitive&timestamp=1',
+    '{"appKey": "key", "AppSecret": "sensitive"}',
+    'msg_signature=sensitive&nonce=n',
+])
+def test_text_redacted_case_insensitive(config, text):
+    formatted = format_payload(text, config)
+    assert 'sensitive' not in formatted
+    assert REDACTED in formatted
+
+
+def test_custom_redact_keys():
+    config = PayloadLogConfig(redact_keys=frozenset({'Token'}))
+    assert json.loads(format_payload({'TOKEN': 'sensitive'}, config)) == {
+        'TOKEN': REDACTED
+    }
+    assert 'sensitive' not in format_payload('token=sensitive', config)
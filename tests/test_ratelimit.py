@@ -0,0 +1,104 @@
+import pytest
+from dingtalk.storage.memorystorage import MemoryStorage
+
+from lesoon_third_sdk.core.ratelimit import RateLimiter
+from lesoon_third_sdk.core.ratelimit import RateLimitRule
+from lesoon_third_sdk.core.ratelimit import RateLimitTimeout
+from lesoon_third_sdk.core.ratelimit import StorageTokenBucket
+from lesoon_third_sdk.core.ratelimit import TokenBucket
+
+
+class FakeClock:
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_token_bucket_burst_then_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=4, clock=clock, sleep=clock.sleep)
+    assert all(bucket.try_acquire() for _ in range(4))
+    assert not bucket.try_acquire()
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_acquire_waits_for_refill(clock):
+    bucket = TokenBucket(rate=10, clock=clock, sleep=clock.sleep)
+    for _ in range(10):
+        assert bucket.acquire()
+    assert clock.sleeps == []
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.1)]
+
+
+def test_token_bucket_acquire_timeout(clock):
+    bucket = TokenBucket(rate=1, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire()
+    assert not bucket.acquire(timeout=0.5)
+    assert sum(clock.sleeps) == pytest.approx(0.5)
+
+
+def test_token_bucket_rejects_tokens_over_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+    with pytest.raises(ValueError):
+        bucket.acquire(3)
+    with pytest.raises(ValueError):
+        bucket.try_acquire(3)
+
+
+def test_storage_token_bucket_honours_rate(clock):
+    storage = MemoryStorage()
+    bucket = StorageTokenBucket(storage,
+                                'bucket',
+                                rate=2,
+                                capacity=2,
+                                clock=clock,
+                                sleep=clock.sleep)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    # 按 rate 补充, 而不是每秒重置为 capacity
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_storage_token_bucket_shared_between_instances(clock):
+    storage = MemoryStorage()
+    buckets = [
+        StorageTokenBucket(storage, 'bucket', rate=1, clock=clock)
+        for _ in range(2)
+    ]
+    assert buckets[0].try_acquire()
+    assert not buckets[1].try_acquire()
+
+
+def test_rate_limiter_matches_rules_and_times_out():
+    limiter = RateLimiter([RateLimitRule('/topapi/attendance/*', 1)], timeout=0)
+    limiter.acquire('/topapi/attendance/list', 'app')
+    # 未命中规则的接口不限流
+    limiter.acquire('/topapi/user/get', 'app')
+    limiter.acquire('/topapi/user/get', 'app')
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire('/topapi/attendance/list', 'app')
+    # 不同应用的配额相互独立
+    limiter.acquire('/topapi/attendance/list', 'other')
+
+
+def test_rate_limiter_accepts_rule_tuples():
+    limiter = RateLimiter([('/topapi/*', 5, 2)])
+    assert limiter.rules == [RateLimitRule('/topapi/*', 5, 2)]
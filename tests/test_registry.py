@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+import requests
+
+from lesoon_third_sdk.core.registry import ClientRegistry
+from lesoon_third_sdk.core.registry import RegistryMixin
+from lesoon_third_sdk.dingtalk import DingTalk
+from lesoon_third_sdk.dingtalk.aio import AsyncNewAppKeyClient
+from lesoon_third_sdk.dingtalk.client import NewAppKeyClient
+from lesoon_third_sdk.wechat.client import WeChatClient
+
+
+def new_client(cls=NewAppKeyClient, app_key='key', **kwargs):
+    return cls(corp_id='corp',
+               app_key=app_key,
+               app_secret='secret',
+               agent_id=1,
+               **kwargs)
+
+
+def new_extension(registry=None):
+    return DingTalk(config={
+        'CORP_ID': 'corp',
+        'APP_KEY': 'key',
+        'APP_SECRET': 'secret',
+        'AGENT_ID': 1
+    },
+                    registry=registry)
+
+
+def test_get_or_create_reuses_client():
+    registry = ClientRegistry()
+    first = registry.get_or_create('a', new_client)
+    assert registry.get_or_create('a', new_client) is first
+    assert registry.get_or_create('b', new_client) is not first
+    assert len(registry) == 2
+
+
+def test_clients_share_class_session_by_default():
+    extension = new_extension()
+    first, second = extension.create_client(), extension.create_client()
+    assert first is not second
+    assert first._http is second._http
+    assert '_http' not in vars(first)
+
+
+def test_registry_clients_own_session(monkeypatch):
+    registry = ClientRegistry()
+    extension = new_extension(registry)
+    client = extension.create_client()
+    assert extension.create_client() is client
+    assert client._http is not new_client()._http
+    closed = []
+    monkeypatch.setattr(client._http, 'close', lambda: closed.append(True))
+    extension.close_clients()
+    assert closed == [True]
+    assert len(registry) == 0
+
+
+@pytest.mark.parametrize('factory', [
+    lambda: new_client(http=requests.Session()),
+    lambda: WeChatClient(appid='app', secret='secret')
+])
+def test_remove_closes_own_session(factory, monkeypatch):
+    registry = ClientRegistry()
+    client = registry.get_or_create('a', factory)
+    other = factory()
+    # 客户端独占 Session, 关闭时不影响其它实例
+    assert client._http is not other._http
+    closed = []
+    monkeypatch.setattr(client._http, 'close', lambda: closed.append(True))
+    registry.remove('a')
+    assert closed == [True]
+    assert 'a' not in registry
+
+
+def test_async_client_closed_by_aclear():
+
+    async def run():
+        registry = ClientRegistry()
+        client = registry.get_or_create(
+            'a', lambda: new_client(AsyncNewAppKeyClient))
+        session = client._http.session
+        await registry.aclear()
+        return session
+
+    assert asyncio.run(run()).closed
+
+
+def test_async_client_closed_by_sync_clear_in_loop():
+
+    async def run():
+        registry = ClientRegistry()
+        client = registry.get_or_create(
+            'a', lambda: new_client(AsyncNewAppKeyClient))
+        session = client._http.session
+        registry.clear()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return session
+
+    assert asyncio.run(run()).closed
+
+
+def test_async_client_closed_by_sync_clear_without_loop():
+    registry = ClientRegistry()
+    client = registry.get_or_create('a',
+                                    lambda: new_client(AsyncNewAppKeyClient))
+    closed = []
+
+    async def close():
+        closed.append(True)
+
+    client._http.close = close
+    registry.clear()
+    assert closed == [True]
+
+
+def test_registry_mixin_requires_client_key():
+
+    class Extension(RegistryMixin):
+        pass
+
+    with pytest.raises(TypeError):
+        Extension()
@@ -0,0 +1,112 @@
+import pytest
+from dingtalk.storage.memorystorage import MemoryStorage
+
+from lesoon_third_sdk.core.cache import LRUCache
+from lesoon_third_sdk.core.cache import ResponseCache
+from lesoon_third_sdk.core.cache import StorageCache
+
+COLUMNS = '/topapi/attendance/getattcolumns'
+VACATIONS = '/topapi/attendance/vacation/type/list'
+
+
+class Counter:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {'result': self.calls}
+
+
+def make_cache(backend=None):
+    return ResponseCache({COLUMNS: 3600, VACATIONS: 60}, backend)
+
+
+def get(cache, uri, func, params=None, scope='app'):
+    return cache.get_or_call('GET', uri, {'params': params}, func, scope=scope)
+
+
+def shared_backend(storage):
+    return StorageCache(storage, prefix='dingtalk:response')
+
+
+@pytest.fixture(params=['lru', 'storage'])
+def backend_factory(request):
+    if request.param == 'lru':
+        return lambda: LRUCache()
+    storage = MemoryStorage()
+    return lambda: shared_backend(storage)
+
+
+def test_hit_miss_and_unmatched_uri():
+    cache, func = make_cache(), Counter()
+    assert get(cache, COLUMNS, func) == get(cache, COLUMNS, func)
+    assert func.calls == 1
+    get(cache, COLUMNS, func, params={'userid': 'other'})
+    get(cache, '/topapi/user/get', func)
+    get(cache, '/topapi/user/get', func)
+    assert func.calls == 4
+    assert cache.stats() == {'hits': 1, 'misses': 2}
+
+
+def test_scope_isolation():
+    cache, func = make_cache(), Counter()
+    get(cache, COLUMNS, func, scope='a')
+    get(cache, COLUMNS, func, scope='b')
+    assert func.calls == 2
+
+
+def test_none_result_not_cached():
+    cache, calls = make_cache(), []
+    get(cache, COLUMNS, lambda: calls.append(True))
+    get(cache, COLUMNS, lambda: calls.append(True))
+    assert len(calls) == 2
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache, func = make_cache(LRUCache(clock=lambda: now[0])), Counter()
+    get(cache, VACATIONS, func)
+    now[0] = 59
+    get(cache, VACATIONS, func)
+    assert func.calls == 1
+    now[0] = 61
+    get(cache, VACATIONS, func)
+    assert func.calls == 2
+
+
+def test_invalidate_pattern(backend_factory):
+    cache = make_cache(backend_factory())
+    columns, vacations = Counter(), Counter()
+    get(cache, COLUMNS, columns)
+    get(cache, VACATIONS, vacations)
+    cache.invalidate(COLUMNS)
+    assert get(cache, COLUMNS, columns) == {'result': 2}
+    # 其它通配的缓存不受影响
+    assert get(cache, VACATIONS, vacations) == {'result': 1}
+    assert get(cache, COLUMNS, columns) == {'result': 2}
+
+
+def test_invalidate_all(backend_factory):
+    cache = make_cache(backend_factory())
+    columns, vacations = Counter(), Counter()
+    get(cache, COLUMNS, columns)
+    get(cache, VACATIONS, vacations)
+    cache.invalidate()
+    get(cache, COLUMNS, columns)
+    get(cache, VACATIONS, vacations)
+    assert (columns.calls, vacations.calls) == (2, 2)
+
+
+def test_invalidate_shared_between_instances():
+    storage = MemoryStorage()
+    first = make_cache(shared_backend(storage))
+    second = make_cache(shared_backend(storage))
+    func = Counter()
+    get(first, COLUMNS, func)
+    get(second, COLUMNS, func)
+    assert func.calls == 1
+    first.invalidate(COLUMNS)
+    get(second, COLUMNS, func)
+    assert func.calls == 2
@@ -0,0 +1,140 @@
+import pytest
+from dingtalk.core.exceptions import DingTalkClientException
+
+from lesoon_third_sdk.dingtalk.client import AppKeyClient
+from lesoon_third_sdk.dingtalk.retry import ErrorCodeClassifier
+from lesoon_third_sdk.dingtalk.retry import NEW_API_CLASSIFIER
+from lesoon_third_sdk.dingtalk.retry import OAPI_CLASSIFIER
+from lesoon_third_sdk.dingtalk.retry import RetryPolicy
+
+ALWAYS = ErrorCodeClassifier({15: True})
+
+
+class FakeClock:
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_compute_delay_backoff():
+    policy = RetryPolicy(base_delay=1, max_delay=5, multiplier=2, jitter=False)
+    assert [policy.compute_delay(n) for n in range(1, 6)] == [1, 2, 4, 5, 5]
+
+
+def test_compute_delay_jitter_within_bound():
+    policy = RetryPolicy(base_delay=1, max_delay=5, multiplier=2)
+    delays = [policy.compute_delay(3) for _ in range(100)]
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_next_delay_stops_after_max_retries():
+    attempts = []
+    policy = RetryPolicy(max_retries=2,
+                         base_delay=1,
+                         jitter=False,
+                         classifier=ALWAYS,
+                         on_retry=attempts.append)
+    state = policy.new_state()
+    assert policy.next_delay(state, 15, None) == 1
+    assert policy.next_delay(state, 15, None) == 2
+    assert policy.next_delay(state, 15, None) is None
+    assert [(a.attempt, a.code, a.delay) for a in attempts] == [(1, 15, 1),
+                                                                (2, 15, 2)]
+    assert state.attempts == attempts
+
+
+def test_next_delay_requires_retryable_code():
+    policy = RetryPolicy(jitter=False, classifier=ALWAYS)
+    assert policy.next_delay(policy.new_state(), 40014, None) is None
+    # 未配置 classifier 时不重试
+    assert RetryPolicy().next_delay(RetryPolicy().new_state(), 15, None) is None
+
+
+def test_next_delay_deadline_cutoff():
+    clock = FakeClock()
+    policy = RetryPolicy(base_delay=4,
+                         multiplier=1,
+                         jitter=False,
+                         deadline=10,
+                         classifier=ALWAYS,
+                         clock=clock)
+    state = policy.new_state()
+    clock.now += 5
+    assert policy.next_delay(state, 15, None) == 4
+    assert state.attempts[0].elapsed == 5
+    # 已耗时 7 秒, 再等待 4 秒将超出 10 秒的预算
+    clock.now += 2
+    assert policy.next_delay(state, 15, None) is None
+    assert len(state.attempts) == 1
+
+
+def test_next_delay_without_deadline():
+    clock = FakeClock()
+    policy = RetryPolicy(jitter=False,
+                         deadline=None,
+                         classifier=ALWAYS,
+                         clock=clock)
+    state = policy.new_state()
+    clock.now += 3600
+    assert policy.next_delay(state, 15, None) == 1
+
+
+@pytest.mark.parametrize('code, result, expected', [
+    (15, {}, True),
+    (88, {
+        'sub_code': '90002'
+    }, True),
+    (88, {
+        'sub_code': '60011',
+        'sub_msg': '钉钉鉴权服务异常, 请稍后重试'
+    }, True),
+    (88, {
+        'sub_code': '60011',
+        'sub_msg': '无权限'
+    }, False),
+    (88, None, False),
+    (40014, {}, False),
+])
+def test_oapi_classifier(code, result, expected):
+    assert OAPI_CLASSIFIER(code, result) is expected
+
+
+def test_new_api_classifier():
+    assert NEW_API_CLASSIFIER('failure.operation.requestTooFast', {})
+    assert not NEW_API_CLASSIFIER('ServiceUnavailable', {})
+
+
+def test_copy_keeps_hooks():
+    sleeps = []
+    policy = RetryPolicy(max_retries=5, sleep=sleeps.append)
+    copied = policy.copy(classifier=ALWAYS)
+    assert copied.max_retries == 5
+    assert copied.sleep == sleeps.append
+    assert copied.classifier is ALWAYS
+    assert policy.classifier is None
+
+
+def test_client_uses_injected_sleep_and_hooks(stub, faults):
+    faults.error_rate = 1.0
+    sleeps, attempts = [], []
+    client = AppKeyClient(corp_id='corp',
+                          app_key='key',
+                          app_secret='secret',
+                          agent_id=1,
+                          retry_policy=RetryPolicy(max_retries=2,
+                                                   base_delay=0.5,
+                                                   jitter=False,
+                                                   sleep=sleeps.append,
+                                                   on_retry=attempts.append))
+    client.API_BASE_URL = stub.url
+    # 未指定 classifier 时使用客户端的默认规则
+    assert client.retry_policy.classifier is OAPI_CLASSIFIER
+    with pytest.raises(DingTalkClientException) as exc_info:
+        client.attendance.get_att_columns()
+    assert exc_info.value.errcode == 15
+    assert sleeps == [0.5, 1.0]
+    assert [attempt.code for attempt in attempts] == [15, 15]
@@ -0,0 +1,34 @@
+from lesoon_third_sdk.core.transport import HttpConfig
+from lesoon_third_sdk.core.transport import HttpTransport
+from lesoon_third_sdk.senselink.client import SenseLinkClient
+from lesoon_third_sdk.senselink.client.api import CommonApi
+
+
+def test_api_group_bound_lazily():
+    client = SenseLinkClient('key', 'secret')
+    assert isinstance(SenseLinkClient.common, CommonApi)
+    assert 'common' not in vars(client)
+    common = client.common
+    # 首次访问后缓存在实例上, 不再经过描述符
+    assert vars(client)['common'] is common
+    assert client.common is common
+    assert common._client is client
+    assert SenseLinkClient('key', 'secret').common is not common
+
+
+def test_shared_session_by_default():
+    first = SenseLinkClient('key', 'secret')
+    second = SenseLinkClient('key', 'secret')
+    assert first._http is second._http
+    assert '_http' not in vars(first)
+
+
+def test_http_config_uses_own_transport(stub):
+    client = SenseLinkClient('key',
+                             'secret',
+                             http_config=HttpConfig(per_thread=True))
+    client.API_BASE_URL = stub.url
+    assert isinstance(client._http, HttpTransport)
+    assert client._http is not SenseLinkClient('key', 'secret')._http
+    assert client.get('/api/v3/record/list', params={'page': 1})
+    assert client._http.session_count == 1
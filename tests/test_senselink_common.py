@@ -0,0 +1,123 @@
+import asyncio
+import logging
+
+import pytest
+
+from lesoon_third_sdk.core.cache import LRUCache
+from lesoon_third_sdk.senselink.client import SenseLinkClient
+from lesoon_third_sdk.senselink.client.aio import AsyncSenseLinkClient
+from lesoon_third_sdk.senselink.client.api.common import BaseCommonApi
+
+
+class FakeDecrypt:
+    """
+    以 'plain-' 前缀模拟解密, 批次中含 'bad' 时请求失败,
+    含 'short' 时少返回一条结果, 'unknown' 无法解密.
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, batch):
+        self.batches.append(list(batch))
+        if 'bad' in batch:
+            raise RuntimeError('decrypt failed')
+        data = [
+            None if cipher == 'unknown' else 'plain-' + cipher
+            for cipher in batch
+        ]
+        return {'data': data[:-1] if 'short' in batch else data}
+
+
+@pytest.fixture(autouse=True)
+def small_batch(monkeypatch):
+    monkeypatch.setattr(BaseCommonApi, 'AES_DECRYPT_MAX_SIZE', 2)
+
+
+def test_aes_decrypt_bulk_logs_failed_batches(monkeypatch, caplog):
+    client = SenseLinkClient('key', 'secret')
+    fake = FakeDecrypt()
+    monkeypatch.setattr(client.common, 'aes_decrypt', fake)
+    with caplog.at_level(logging.ERROR):
+        plains = client.common.aes_decrypt_bulk(['a', 'b', 'bad', 'c'],
+                                                max_workers=1)
+    assert plains == ['plain-a', 'plain-b', None, None]
+    assert '批量解密失败' in caplog.text
+
+
+def test_aes_decrypt_bulk_uses_empty_cache(monkeypatch):
+    client = SenseLinkClient('key', 'secret')
+    fake = FakeDecrypt()
+    monkeypatch.setattr(client.common, 'aes_decrypt', fake)
+    cache = LRUCache(maxsize=16)
+    assert len(cache) == 0
+    assert client.common.aes_decrypt_bulk(
+        ['a', 'b'], cache=cache) == ['plain-a', 'plain-b']
+    assert client.common.aes_decrypt_bulk(
+        ['a', 'b'], cache=cache) == ['plain-a', 'plain-b']
+    assert fake.batches == [['a', 'b']]
+
+
+def test_aes_decrypt_bulk_rejects_mismatched_batch(monkeypatch, caplog):
+    client = SenseLinkClient('key', 'secret')
+    monkeypatch.setattr(client.common, 'aes_decrypt', FakeDecrypt())
+    with caplog.at_level(logging.ERROR):
+        plains = client.common.aes_decrypt_bulk(['a', 'b', 'short', 'c'],
+                                                max_workers=1)
+    # 结果条数不一致时无法确定对应关系, 整批视为失败
+    assert plains == ['plain-a', 'plain-b', None, None]
+    assert '不一致' in caplog.text
+
+
+def test_aes_decrypt_bulk_does_not_cache_missing_plain(monkeypatch):
+    client = SenseLinkClient('key', 'secret')
+    fake = FakeDecrypt()
+    monkeypatch.setattr(client.common, 'aes_decrypt', fake)
+    cache = LRUCache(maxsize=16)
+    assert client.common.aes_decrypt_bulk(['a', 'unknown'],
+                                          cache=cache) == ['plain-a', None]
+    assert client.common.aes_decrypt_bulk(['a', 'unknown'],
+                                          cache=cache) == ['plain-a', None]
+    assert fake.batches == [['a', 'unknown'], ['unknown']]
+
+
+def test_async_aes_decrypt_bulk_logs_failed_batches(monkeypatch, caplog):
+    client = AsyncSenseLinkClient('key', 'secret')
+    fake = FakeDecrypt()
+
+    async def aes_decrypt(batch):
+        return fake(batch)
+
+    monkeypatch.setattr(client.common, 'aes_decrypt', aes_decrypt)
+    with caplog.at_level(logging.ERROR):
+        plains = asyncio.run(
+            client.common.aes_decrypt_bulk(['a', 'b', 'bad', 'c']))
+    assert plains == ['plain-a', 'plain-b', None, None]
+    assert '批量解密失败' in caplog.text
+
+
+def test_async_aes_decrypt_bulk_rejects_mismatched_batch(monkeypatch):
+    client = AsyncSenseLinkClient('key', 'secret')
+    fake = FakeDecrypt()
+
+    async def aes_decrypt(batch):
+        return fake(batch)
+
+    monkeypatch.setattr(client.common, 'aes_decrypt', aes_decrypt)
+    plains = asyncio.run(
+        client.common.aes_decrypt_bulk(['a', 'b', 'short', 'c']))
+    assert plains == ['plain-a', 'plain-b', None, None]
+
+
+def test_async_aes_decrypt_bulk_skips_cancelled_batch(monkeypatch):
+    client = AsyncSenseLinkClient('key', 'secret')
+    fake = FakeDecrypt()
+
+    async def aes_decrypt(batch):
+        if 'c' in batch:
+            raise asyncio.CancelledError()
+        return fake(batch)
+
+    monkeypatch.setattr(client.common, 'aes_decrypt', aes_decrypt)
+    plains = asyncio.run(client.common.aes_decrypt_bulk(['a', 'b', 'c', 'd']))
+    assert plains == ['plain-a', 'plain-b', None, None]
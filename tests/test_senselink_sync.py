@@ -0,0 +1,135 @@
+import datetime
+
+import pytest
+
+from lesoon_third_sdk.senselink.client.api.event import EventApi
+from lesoon_third_sdk.senselink.sync import IdentityRecordSync
+from lesoon_third_sdk.senselink.sync import sign_time
+
+DAY = datetime.datetime(2022, 1, 1)
+
+
+def at(hour, minute=0):
+    return DAY.replace(hour=hour, minute=minute)
+
+
+class FakeEvent:
+    DATE_TIME_FORMAT = EventApi.DATE_TIME_FORMAT
+
+    def __init__(self):
+        self.records = []
+        self.queries = []
+
+    def add(self, record_id, time):
+        self.records.append({
+            'id': record_id,
+            'signTime': int(time.timestamp() * 1000)
+        })
+
+    def iter_identity_records(self, start, end, order=0):
+        assert order == 1
+        self.queries.append((start, end))
+        # 查询时间精确到秒, 包含结束时间所在的一整秒
+        end = end + datetime.timedelta(seconds=1)
+        return iter(
+            sorted((r for r in self.records if start <= sign_time(r) < end),
+                   key=lambda r: r['id']))
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.event = FakeEvent()
+
+
+class Sink:
+
+    def __init__(self, fail_on=()):
+        self.batches = []
+        self.calls = 0
+        self.fail_on = set(fail_on)
+
+    def __call__(self, batch):
+        self.calls += 1
+        if self.calls in self.fail_on:
+            raise RuntimeError('sink failed')
+        self.batches.append([record['id'] for record in batch])
+
+    @property
+    def ids(self):
+        return [record_id for batch in self.batches for record_id in batch]
+
+
+@pytest.fixture
+def now():
+    return [at(12)]
+
+
+def make_sync(client, sink, now, **kwargs):
+    kwargs.setdefault('initial_from', at(11))
+    return IdentityRecordSync(client, sink, now=lambda: now[0], **kwargs)
+
+
+def test_overlap_dedupe_keeps_lower_ids_outside_overlap(now):
+    client, sink = FakeClient(), Sink()
+    sync = make_sync(client, sink, now)
+    client.event.add(1, at(11, 10))
+    client.event.add(5, at(11, 58))
+    assert sync.run() == 2
+    assert sync.watermark == {'id': 5, 'time': '2022-01-01 12:00:00'}
+    # id 小于水位线但时间在上个窗口之后的记录
+    client.event.add(3, at(12, 5))
+    # 延迟入库、落在重叠区间的记录
+    client.event.add(7, at(11, 57))
+    now[0] = at(12, 10)
+    assert sync.run() == 2
+    assert sink.ids == [1, 5, 3, 7]
+    assert client.event.queries[-1] == (at(11, 55), at(12, 10))
+
+
+def test_catch_up_in_windows(now):
+    client, sink = FakeClient(), Sink()
+    sync = make_sync(client,
+                     sink,
+                     now,
+                     initial_from=at(9),
+                     max_window=datetime.timedelta(hours=1))
+    for i in range(18):
+        client.event.add(i + 1, at(9) + datetime.timedelta(minutes=10 * i))
+    assert sync.run() == 18
+    assert sink.ids == list(range(1, 19))
+    assert client.event.queries == [(at(9), at(10)), (at(9, 55), at(10, 55)),
+                                    (at(10, 50), at(11, 50)),
+                                    (at(11, 45), at(12))]
+
+
+def test_resume_interrupted_window(now):
+    client, sink = FakeClient(), Sink(fail_on={2})
+    sync = make_sync(client, sink, now, batch_size=2)
+    for i in range(1, 6):
+        client.event.add(i, at(11, i))
+    with pytest.raises(RuntimeError):
+        sync.run()
+    assert sync.watermark['window'] == {
+        'from': '2022-01-01 11:00:00',
+        'to': '2022-01-01 12:00:00',
+        'id': 2
+    }
+    now[0] = at(12, 30)
+    assert sync.run() == 3
+    assert sink.batches == [[1, 2], [3, 4], [5]]
+    # 中断的窗口按原时间范围重新查询, 之后从该窗口结束时间继续
+    assert client.event.queries[-2:] == [(at(11), at(12)),
+                                         (at(11, 55), at(12, 30))]
+    assert sync.watermark == {'id': 5, 'time': '2022-01-01 12:30:00'}
+
+
+def test_reset(now):
+    client, sink = FakeClient(), Sink()
+    sync = make_sync(client, sink, now)
+    client.event.add(1, at(11, 10))
+    sync.run()
+    sync.reset()
+    assert sync.watermark == {}
+    sync.run()
+    assert sink.ids == [1, 1]
@@ -0,0 +1,85 @@
+import time
+import uuid
+
+import pytest
+
+from lesoon_third_sdk.dingtalk.client import AppKeyClient
+from lesoon_third_sdk.dingtalk.token import TokenManager
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # 刷新状态按 token 存储键进程内共享, 每个用例使用独立的 app_key
+    client = AppKeyClient(corp_id='corp',
+                          app_key=uuid.uuid4().hex,
+                          app_secret='secret',
+                          agent_id=1)
+    client.fetches = []
+
+    def get_access_token():
+        client.fetches.append(True)
+        return {
+            'access_token': f'token-{len(client.fetches)}',
+            'expires_in': 7200
+        }
+
+    monkeypatch.setattr(client, 'get_access_token', get_access_token)
+    return client
+
+
+def store_token(manager, token, remaining):
+    manager.token_item.set(value=token, ttl=7200)
+    manager.expires_item.set(value=time.time() + remaining, ttl=7200)
+
+
+def test_refresh_ahead_disabled_by_default(client, monkeypatch):
+    manager = client.token_manager
+    assert manager.refresh_ahead == 0
+    store_token(manager, 'old', remaining=10)
+    monkeypatch.setattr(manager, '_refresh_in_background',
+                        lambda: pytest.fail('不应提前续期'))
+    assert manager.get() == 'old'
+    assert client.fetches == []
+
+
+def test_refresh_ahead_opt_in(client, monkeypatch):
+    manager = TokenManager(client, refresh_ahead=300)
+    store_token(manager, 'old', remaining=10)
+    scheduled = []
+    monkeypatch.setattr(manager, '_refresh_in_background',
+                        lambda: scheduled.append(True))
+    assert manager.get() == 'old'
+    assert scheduled == [True]
+
+
+def test_fetch_when_missing(client):
+    assert client.token_manager.get() == 'token-1'
+    assert client.token_manager.get() == 'token-1'
+    assert len(client.fetches) == 1
+
+
+def hold_storage_lock(manager):
+    lock_key = f'{manager.token_item.key_name(None)}:lock'
+    manager.client.storage.set(lock_key, 'other', ttl=60)
+
+
+def test_storage_lock_timeout_reuses_stored_token(client):
+    manager = TokenManager(client,
+                           refresh_ahead=300,
+                           storage_lock=True,
+                           lock_ttl=0.1,
+                           wait_interval=0.01)
+    store_token(manager, 'old', remaining=10)
+    hold_storage_lock(manager)
+    assert manager.refresh(min_ttl=300) == 'old'
+    assert client.fetches == []
+
+
+def test_storage_lock_timeout_fetches_without_token(client):
+    manager = TokenManager(client,
+                           storage_lock=True,
+                           lock_ttl=0.1,
+                           wait_interval=0.01)
+    hold_storage_lock(manager)
+    assert manager.refresh() == 'token-1'
+    assert len(client.fetches) == 1
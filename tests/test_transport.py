@@ -0,0 +1,82 @@
+import threading
+
+import requests
+
+from lesoon_third_sdk.core.transport import HttpConfig
+from lesoon_third_sdk.core.transport import HttpTransport
+
+
+def test_shared_session_across_threads():
+    transport = HttpTransport()
+    sessions = []
+    threads = [
+        threading.Thread(target=lambda: sessions.append(transport.session))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(session is transport.session for session in sessions)
+    assert transport.session_count == 1
+
+
+def test_per_thread_sessions():
+    transport = HttpTransport(HttpConfig(per_thread=True))
+    sessions = []
+    threads = [
+        threading.Thread(target=lambda: sessions.append(transport.session))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(session) for session in sessions}) == 3
+    assert transport.session is transport.session
+    assert transport.session_count == 4
+
+
+def test_session_pool_config():
+    transport = HttpTransport(
+        HttpConfig(pool_maxsize=32, max_retries=2, keep_alive=False))
+    adapter = transport.session.get_adapter('https://api.dingtalk.com')
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.total == 2
+    assert transport.session.headers['Connection'] == 'close'
+
+
+def test_request_timeout(stub, monkeypatch):
+    transport = HttpTransport(HttpConfig(connect_timeout=1, read_timeout=5))
+    timeouts = []
+    request = requests.Session.request
+
+    def recording_request(session, *args, **kwargs):
+        timeouts.append(kwargs.get('timeout'))
+        return request(session, *args, **kwargs)
+
+    monkeypatch.setattr(requests.Session, 'request', recording_request)
+    assert transport.request('GET', f'{stub.url}/gettoken').ok
+    transport.request('GET', f'{stub.url}/gettoken', timeout=3)
+    assert timeouts == [(1, 5), 3]
+    assert HttpConfig().timeout is None
+
+
+def test_close(monkeypatch):
+    closed = []
+    monkeypatch.setattr(requests.Session, 'close',
+                        lambda session: closed.append(session))
+    shared = HttpTransport()
+    session = shared.session
+    shared.close()
+    assert closed == [session]
+    # 共享模式关闭后仍复用同一个 Session, 连接按需重新建立
+    assert shared.session is session
+
+    closed.clear()
+    transport = HttpTransport(HttpConfig(per_thread=True))
+    first = transport.session
+    transport.close()
+    assert closed == [first]
+    assert transport.session_count == 0
+    assert transport.session is not first
@@ -0,0 +1,138 @@
+import pytest
+from wechatpy.session.memorystorage import MemoryStorage
+
+from lesoon_third_sdk.core.cache import LRUCache
+from lesoon_third_sdk.wechat.cache import create_oauth2_cache
+from lesoon_third_sdk.wechat.cache import REFRESH_TOKEN_TTL
+from lesoon_third_sdk.wechat.cache import WechatOAuth2Cache
+from lesoon_third_sdk.wechat.client import WeChatClient
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    return WechatOAuth2Cache(LRUCache(clock=clock), clock=clock)
+
+
+def new_client(stub, oauth2_cache):
+    # 预置应用 access_token, 避免请求 cgi-bin/token
+    client = WeChatClient(appid='app',
+                          secret='secret',
+                          access_token='app-token',
+                          oauth2_cache=oauth2_cache)
+    client.oauth2.API_BASE_URL = f'{stub.url}/'
+    client.requests = []
+    get = client.oauth2._get
+
+    def spy(url, **kwargs):
+        client.requests.append((url, kwargs.get('params')))
+        return get(url, **kwargs)
+
+    client.oauth2._get = spy
+    return client
+
+
+@pytest.fixture
+def client(stub, cache):
+    return new_client(stub, cache)
+
+
+def urls(client):
+    return [url for url, _ in client.requests]
+
+
+def test_code_exchanged_every_time(client):
+    token = client.oauth2.get_user_access_token('c1')
+    assert token['openid'] == 'openid-c1'
+    client.oauth2.get_user_access_token('c1')
+    assert urls(client) == ['sns/oauth2/access_token'] * 2
+
+
+def test_cached_token_by_openid(client, cache):
+    client.oauth2.get_user_access_token('c1')
+    token = client.oauth2.get_cached_access_token('openid-c1')
+    assert token['access_token'] == 'stub-access-c1'
+    assert token['expires_in'] == 7200
+    assert 'refresh_expires_at' not in token
+    assert client.oauth2.get_cached_access_token('unknown') is None
+    assert urls(client) == ['sns/oauth2/access_token']
+
+
+def test_refresh_keeps_refresh_token_expiry(client, cache, clock):
+    client.oauth2.get_user_access_token('c1')
+    clock.now += 7200 - 100
+    token = client.oauth2.get_cached_access_token('openid-c1')
+    assert token['access_token'] == 'stub-access-stub-refresh-c1'
+    assert urls(client)[-1] == 'sns/oauth2/refresh_token'
+    item = cache.backend.get('token:openid-c1')
+    assert item['refresh_expires_at'] == 1000 + REFRESH_TOKEN_TTL
+    # refresh_token 过期后缓存失效, 不因续期而延长
+    clock.now = 1000 + REFRESH_TOKEN_TTL
+    assert client.oauth2.get_cached_access_token('openid-c1') is None
+
+
+def test_refresh_failure_drops_token(client, cache, clock, faults):
+    client.oauth2.get_user_access_token('c1')
+    clock.now += 7200
+    faults.error_rate = 1.0
+    assert client.oauth2.get_cached_access_token('openid-c1') is None
+    assert cache.get_token('openid-c1') is None
+
+
+def test_user_info_sends_lang_and_caches_per_lang(client, clock):
+    client.oauth2.get_user_access_token('c1')
+    profile = client.oauth2.get_user_info(None, 'openid-c1', lang='en')
+    assert profile['openid'] == 'openid-c1'
+    url, params = client.requests[-1]
+    assert url == 'sns/userinfo'
+    assert params == {
+        'access_token': 'stub-access-c1',
+        'openid': 'openid-c1',
+        'lang': 'en'
+    }
+    assert client.oauth2.get_user_info(None, 'openid-c1', lang='en') == profile
+    client.oauth2.get_user_info(None, 'openid-c1', lang='zh_CN')
+    assert urls(client).count('sns/userinfo') == 2
+    clock.now += 60
+    client.oauth2.get_user_info(None, 'openid-c1', lang='en', max_age=30)
+    assert urls(client).count('sns/userinfo') == 3
+
+
+def test_user_info_omits_lang_by_default(client):
+    client.oauth2.get_user_access_token('c1')
+    profile = client.oauth2.get_user_info(None, 'openid-c1')
+    _, params = client.requests[-1]
+    assert params == {'access_token': 'stub-access-c1', 'openid': 'openid-c1'}
+    assert client.oauth2.get_user_info(None, 'openid-c1') == profile
+    assert urls(client).count('sns/userinfo') == 1
+    # 指定语言的结果与未指定语言的结果分开缓存
+    client.oauth2.get_user_info(None, 'openid-c1', lang='en')
+    assert urls(client).count('sns/userinfo') == 2
+
+
+def test_user_info_without_token_raises(client):
+    with pytest.raises(ValueError):
+        client.oauth2.get_user_info(None, 'openid-unknown')
+
+
+def test_session_backed_cache(stub):
+    session = MemoryStorage()
+    first = new_client(stub, create_oauth2_cache(session))
+    second = new_client(stub, create_oauth2_cache(session))
+    first.oauth2.get_user_access_token('c1')
+    token = second.oauth2.get_cached_access_token('openid-c1')
+    assert token['access_token'] == 'stub-access-c1'
+    assert second.requests == []